@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 import json
@@ -14,6 +14,12 @@ from routes.personas import personas_bp
 from routes.schedules import schedules_bp
 from routes.admin import admin_bp
 from routes.upload import upload_bp
+from routes.metrics import metrics_bp
+from services.log_pipeline import setup_logging, init_access_log
+from services.metrics import init_request_metrics
+from services.job_stats import track_job_transitions
+from services.job_feed import start_job_feed
+from services.process_roles import get_background_role
 
 # Load environment variables
 load_dotenv()
@@ -25,15 +31,8 @@ app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'buzzsnip-dev-key')
 # Enable CORS for frontend
 CORS(app, origins=['http://localhost:3000'])
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/app.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (queued, written in batches to logs/backend.log)
+setup_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +43,7 @@ app.register_blueprint(personas_bp, url_prefix='/api/personas')
 app.register_blueprint(schedules_bp, url_prefix='/api/schedules')
 app.register_blueprint(admin_bp, url_prefix='/api/admin')
 app.register_blueprint(upload_bp, url_prefix='/api')
+app.register_blueprint(metrics_bp, url_prefix='/api')
 
 # Health check endpoint
 @app.route('/api/health', methods=['GET'])
@@ -70,15 +70,12 @@ def internal_error(error):
 def bad_request(error):
     return jsonify({'error': 'Bad request'}), 400
 
-# Request logging middleware
-@app.before_request
-def log_request_info():
-    logger.info(f"{request.method} {request.url} - {request.remote_addr}")
+# One access log line per request
+init_access_log(app)
 
-@app.after_request
-def log_response_info(response):
-    logger.info(f"Response: {response.status_code}")
-    return response
+# Per-route latency histograms and job transition counts for /api/metrics
+init_request_metrics(app)
+track_job_transitions()
 
 if __name__ == '__main__':
     # Create necessary directories
@@ -87,6 +84,11 @@ if __name__ == '__main__':
     os.makedirs('uploads', exist_ok=True)
     os.makedirs('generated', exist_ok=True)
     
+    # Start the schedule runner, the AI services worker pool and the upload workers
+    # unless another server process already runs them
+    start_job_feed()
+    get_background_role().elect()
+    
     # Start the Flask app
     app.run(
         host='0.0.0.0',
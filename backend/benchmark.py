@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+BuzzSnip Backend Benchmark
+Measures the backend's own latency and throughput, apart from the model runtime
+
+    python benchmark.py                                  dev server (run.py), default data sizes
+    python benchmark.py --server serve --workers 4       gunicorn workers (run.py serve)
+    python benchmark.py --jobs 100000 --posts 10000 --ai-latency 2
+    python benchmark.py --compare benchmark_results/<earlier run>.json
+
+The server runs against a synthetic data tree in a temporary directory
+(--jobs, --posts, --uploads, --personas, --schedules) and a local mock AI
+services server (mock_ai_services.py, --ai-latency). Each endpoint gets
+--warmup requests, then --requests requests from --concurrency client
+processes.
+p50/p95/p99 latency, requests/sec and errors per endpoint are written to
+--output as JSON, along with the settings and git commit, so runs can be
+compared over time.
+"""
+
+import os
+import sys
+import math
+import json
+import time
+import queue
+import socket
+import uuid
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+import logging
+from datetime import datetime, timedelta
+import requests
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BENCH_ADMIN_EMAIL = 'bench.admin@buzzsnip.local'
+BENCH_ADMIN_PASSWORD = uuid.uuid4().hex
+BENCH_UPLOAD_VIDEO = 'bench_upload.mp4'
+
+JOB_TYPES = ['automated', 'audio', 'face', 'video']
+PLATFORMS = ['youtube', 'instagram']
+THEMES = ['gadget_reviews', 'ai_tips', 'coding_hacks', 'workout_tips', 'motivation']
+
+SERVER_START_TIMEOUT = 60
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles (ms) and throughput for one endpoint"""
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'max_ms': ms(ordered[-1]) if ordered else None
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def server_environment(workdir, args, ai_url):
+    """Environment for the backend process: every path inside workdir, mock AI services"""
+    env = dict(os.environ)
+    env.update({
+        'DATA_DIR': os.path.join(workdir, 'data'),
+        'UPLOADS_DIR': os.path.join(workdir, 'uploads'),
+        'GENERATED_DIR': os.path.join(workdir, 'generated'),
+        'LOGS_DIR': os.path.join(workdir, 'logs'),
+        'JOB_STORE_PATH': os.path.join(workdir, 'data', 'jobs.db'),
+        'JOB_STORE_BACKEND': args.job_store,
+        'AI_SERVICES_URL': ai_url,
+        'ADMIN_EMAIL': BENCH_ADMIN_EMAIL,
+        'ADMIN_PASSWORD': BENCH_ADMIN_PASSWORD,
+        'FLASK_HOST': '127.0.0.1',
+        'FLASK_PORT': str(args.port),
+        'FLASK_DEBUG': 'false',
+        # Model swaps cost time, as they would on a GPU
+        'FAKE_MODEL_LOAD_SECONDS_PER_GB': str(args.model_load_seconds_per_gb),
+        # Mock uploads: measure the queueing, not a platform
+        'YOUTUBE_UPLOAD_URL': '',
+        'INSTAGRAM_UPLOAD_URL': ''
+    })
+    return env
+
+def seed_data(args):
+    """Write the synthetic data tree through the backend's own stores
+
+    Called after the DATA_DIR environment points into the work directory,
+    so the services imported here write there. Returns the seeded job ids
+    and persona ids for the request mix.
+    """
+    from config import Config
+    from services import job_store
+    from services.json_store import write_json_atomic
+    from services.persona_registry import get_default_personas, PERSONAS_FILE
+    from services.schedule_store import get_default_schedules, SCHEDULES_FILE
+    from services.upload_store import new_upload_id, save_upload_record
+    from services.upload_queue import record_status
+    from services.platform_upload import idempotency_key, video_fingerprint
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+
+    def timestamp(max_days_ago=90):
+        return (now - timedelta(seconds=rng.randint(0, max_days_ago * 86400))).isoformat()
+
+    # Personas
+    templates = get_default_personas()
+    personas = []
+    for i in range(args.personas):
+        persona = dict(templates[i % len(templates)])
+        persona.update({'id': f"bench_persona_{i}", 'name': f"Bench Persona {i}"})
+        personas.append(persona)
+    persona_ids = [p['id'] for p in personas] or ['bench_persona_0']
+    write_json_atomic(PERSONAS_FILE, personas)
+
+    # Schedules, all active, none due while the benchmark runs
+    template = get_default_schedules()[0]
+    schedules = []
+    for i in range(args.schedules):
+        schedule = dict(template)
+        schedule.update({
+            'id': f"bench_schedule_{i}",
+            'name': f"Bench Schedule {i}",
+            'persona_id': rng.choice(persona_ids),
+            'theme': rng.choice(THEMES),
+            'next_run': (now + timedelta(days=365)).isoformat()
+        })
+        schedules.append(schedule)
+    write_json_atomic(SCHEDULES_FILE, schedules)
+
+    # Jobs, all finished so the worker pool stays idle
+    job_ids = []
+    batch = []
+    store = job_store.get_job_store()
+    for i in range(args.jobs):
+        job_type = rng.choice(JOB_TYPES)
+        created_at = timestamp()
+        completed = rng.random() < 0.9
+        persona_id = rng.choice(persona_ids)
+        job = {
+            'job_id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'type': job_type,
+            'source': rng.choice(['manual', 'scheduled']),
+            'status': 'completed' if completed else 'failed',
+            'persona_id': persona_id,
+            'request': {'persona_id': persona_id, 'theme': rng.choice(THEMES), 'duration': 30},
+            'created_at': created_at,
+            'updated_at': created_at,
+            'completed_at': created_at,
+            'progress': 100 if completed else 10
+        }
+        if completed:
+            job['result'] = {f"{job_type}_url": f"/generated/{job['job_id']}.mp4"}
+        else:
+            job['error'] = 'AI services unavailable'
+        job_ids.append(job['job_id'])
+        batch.append(job)
+        if len(batch) == 1000:
+            store.save_many(batch)
+            batch = []
+    if batch:
+        store.save_many(batch)
+
+    # Posts
+    posts_dir = os.path.join(Config.DATA_DIR, 'posts')
+    os.makedirs(posts_dir, exist_ok=True)
+    for i in range(args.posts):
+        post_id = f"post_{i:07d}"
+        post = {
+            'id': post_id,
+            'title': f"Bench post {i}",
+            'persona_id': rng.choice(persona_ids),
+            'status': rng.choice(['published', 'published', 'published', 'scheduled', 'failed']),
+            'platforms': rng.sample(PLATFORMS, rng.randint(1, len(PLATFORMS))),
+            'duration': rng.choice([15, 30, 60]),
+            'views': rng.randint(0, 100000),
+            'engagement': {'likes': rng.randint(0, 5000), 'comments': rng.randint(0, 500), 'shares': rng.randint(0, 200)},
+            'created_at': timestamp()
+        }
+        with open(os.path.join(posts_dir, f"{post_id}.json"), 'w') as f:
+            json.dump(post, f)
+
+    # Video the upload scenario sends (uploads must be generated or uploaded files)
+    os.makedirs(Config.GENERATED_DIR, exist_ok=True)
+    with open(os.path.join(Config.GENERATED_DIR, BENCH_UPLOAD_VIDEO), 'wb') as f:
+        f.write(os.urandom(64 * 1024))
+
+    # Finished uploads
+    for i in range(args.uploads):
+        video_url = f"/generated/bench_video_{i}.mp4"
+        title = f"Bench upload {i}"
+        platforms = rng.sample(PLATFORMS, rng.randint(1, len(PLATFORMS)))
+        video_hash = video_fingerprint(video_url)
+        results = {
+            platform: {
+                'status': 'done',
+                'success': True,
+                'platform': platform,
+                'idempotency_key': idempotency_key(video_hash, platform, title),
+                'completed_at': timestamp()
+            }
+            for platform in platforms
+        }
+        save_upload_record({
+            'id': new_upload_id(),
+            'video_url': video_url,
+            'title': title,
+            'description': '',
+            'tags': [],
+            'thumbnail_style': 'modern',
+            'platforms': platforms,
+            'video_hash': video_hash,
+            'results': results,
+            'status': record_status(results),
+            'uploaded_at': timestamp()
+        })
+
+    return job_ids, persona_ids
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_process(name, command, env, workdir, health_url):
+    """Start a server process logging to <workdir>/<name>.out and wait until health_url answers"""
+    output = open(os.path.join(workdir, f"{name}.out"), 'w')
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=output, stderr=subprocess.STDOUT)
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with {process.returncode}, see {output.name}")
+        try:
+            if requests.get(health_url, timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+
+    stop_process(process)
+    raise RuntimeError(f"{name} did not answer {health_url} within {SERVER_START_TIMEOUT}s, see {output.name}")
+
+def stop_process(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def start_mock_ai(args, workdir):
+    """Start mock_ai_services.py on a free port, returns (process, url)"""
+    port = free_port()
+    command = [sys.executable, 'mock_ai_services.py', '--port', str(port),
+               '--latency', str(args.ai_latency), '--jitter', str(args.ai_jitter)]
+    url = f"http://127.0.0.1:{port}"
+    return start_process('mock_ai_services', command, dict(os.environ), workdir, f"{url}/health"), url
+
+def start_backend(args, env, workdir):
+    """Start run.py (or run.py serve), returns (process, base url)"""
+    command = [sys.executable, 'run.py']
+    if args.server == 'serve':
+        command += ['serve', '--workers', str(args.workers), '--bind', f"127.0.0.1:{args.port}",
+                    '--pidfile', os.path.join(workdir, 'server.pid')]
+    base_url = f"http://127.0.0.1:{args.port}"
+    return start_process('server', command, env, workdir, f"{base_url}/api/health"), base_url
+
+def build_scenarios(job_ids, persona_ids):
+    """Endpoint name -> request(session, base_url, rng) for the request mix"""
+
+    def job_status(session, base_url, rng):
+        return session.get(f"{base_url}/api/jobs/{rng.choice(job_ids)}")
+
+    def posts(session, base_url, rng):
+        return session.get(f"{base_url}/api/posts")
+
+    def admin_status(session, base_url, rng):
+        return session.get(f"{base_url}/api/admin/status")
+
+    def generate(session, base_url, rng):
+        return session.post(f"{base_url}/api/generate", json={
+            'persona_id': rng.choice(persona_ids),
+            'theme': rng.choice(THEMES),
+            'duration': 30,
+            'platforms': ['youtube'],
+            'auto_upload': False
+        })
+
+    def upload(session, base_url, rng):
+        # A new title each time, so the upload queue does not drop it as a duplicate
+        return session.post(f"{base_url}/api/upload", json={
+            'video_url': f"/generated/{BENCH_UPLOAD_VIDEO}",
+            'title': f"Bench upload {uuid.uuid4().hex}",
+            'platforms': rng.sample(PLATFORMS, rng.randint(1, len(PLATFORMS)))
+        })
+
+    scenarios = {
+        'GET /api/jobs/<id>': job_status,
+        'GET /api/posts': posts,
+        'GET /api/admin/status': admin_status,
+        'POST /api/upload': upload,
+        # Last: the queued jobs keep the worker pool busy after this runs
+        'POST /api/generate': generate
+    }
+    if not job_ids:
+        del scenarios['GET /api/jobs/<id>']
+    return scenarios
+
+def client_primitives():
+    """Process, Queue and Barrier for load clients: forked processes where possible
+
+    Separate processes keep the client's own GIL out of the measurement.
+    Without fork (Windows) the clients fall back to threads.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        return context.Process, context.Queue, context.Barrier
+    return threading.Thread, queue.Queue, threading.Barrier
+
+def run_client(request_fn, base_url, token, count, seed, barrier, results):
+    """One load client: count requests on a keep-alive session, reports (latencies, errors)"""
+    session = requests.Session()
+    session.headers['Authorization'] = f"Bearer {token}"
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+
+    barrier.wait()
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            ok = request_fn(session, base_url, rng).status_code < 400
+        except requests.RequestException:
+            ok = False
+        latencies.append(time.perf_counter() - started)
+        errors += 0 if ok else 1
+    results.put((latencies, errors))
+
+def run_scenario(request_fn, base_url, token, total, concurrency, warmup, seed):
+    """Send warmup, then total requests from concurrency clients; returns the summary"""
+    Worker, Queue, Barrier = client_primitives()
+
+    warmup_session = requests.Session()
+    warmup_session.headers['Authorization'] = f"Bearer {token}"
+    warmup_rng = random.Random(seed)
+    for _ in range(warmup):
+        request_fn(warmup_session, base_url, warmup_rng)
+    warmup_session.close()
+
+    # Clients start together once all of them are up, so startup is not timed
+    barrier = Barrier(concurrency + 1)
+    results = Queue()
+    clients = []
+    for i in range(concurrency):
+        count = total // concurrency + (1 if i < total % concurrency else 0)
+        clients.append(Worker(target=run_client, args=(request_fn, base_url, token, count, seed + i + 1, barrier, results)))
+    for client in clients:
+        client.start()
+
+    barrier.wait()
+    started = time.perf_counter()
+    latencies = []
+    errors = 0
+    for _ in clients:
+        client_latencies, client_errors = results.get()
+        latencies.extend(client_latencies)
+        errors += client_errors
+    elapsed = time.perf_counter() - started
+
+    for client in clients:
+        client.join()
+    return summarize(latencies, errors, elapsed)
+
+def compare(results, baseline_path):
+    """Print p95 and requests/sec changes against an earlier results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_commit')}, {baseline.get('started_at')}):")
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            print(f"  {name:24s} no baseline")
+            continue
+
+        def change(key):
+            if not previous.get(key) or current.get(key) is None:
+                return 'n/a'
+            return f"{(current[key] - previous[key]) / previous[key] * 100:+.1f}%"
+
+        print(f"  {name:24s} p95 {previous['p95_ms']} -> {current['p95_ms']} ms ({change('p95_ms')}), "
+              f"rps {previous['rps']} -> {current['rps']} ({change('rps')})")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='BuzzSnip backend benchmark')
+    parser.add_argument('--server', choices=['dev', 'serve'], default='dev',
+                        help='run.py (single process) or run.py serve (gunicorn workers)')
+    parser.add_argument('--workers', type=int, default=4, help='workers with --server serve')
+    parser.add_argument('--port', type=int, default=5090)
+    parser.add_argument('--job-store', choices=['sqlite', 'json'], default='sqlite')
+
+    data = parser.add_argument_group('synthetic data')
+    data.add_argument('--jobs', type=int, default=10000)
+    data.add_argument('--posts', type=int, default=2000)
+    data.add_argument('--uploads', type=int, default=500)
+    data.add_argument('--personas', type=int, default=20)
+    data.add_argument('--schedules', type=int, default=50)
+    data.add_argument('--seed', type=int, default=42, help='random seed for data and request mix')
+
+    load = parser.add_argument_group('load')
+    load.add_argument('--requests', type=int, default=500, help='measured requests per endpoint')
+    load.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    load.add_argument('--warmup', type=int, default=20, help='unmeasured requests per endpoint first')
+    load.add_argument('--ai-latency', type=float, default=1.0, help='mock AI services seconds per generation')
+    load.add_argument('--ai-jitter', type=float, default=0.0)
+    load.add_argument('--model-load-seconds-per-gb', type=float, default=0.5,
+                      help='simulated model load time with MODEL_RUNTIME=fake')
+    load.add_argument('--endpoints', help='comma-separated subset, e.g. "GET /api/posts,POST /api/upload"')
+
+    output = parser.add_argument_group('output')
+    output.add_argument('--output', help='results file (default benchmark_results/<timestamp>.json)')
+    output.add_argument('--compare', help='earlier results file to compare against')
+    output.add_argument('--workdir', help='keep the data tree and server logs here instead of a temp dir')
+    return parser.parse_args(argv)
+
+def main():
+    """Seed data, start the mock AI services and the backend, and measure each endpoint"""
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix='buzzsnip-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    started_at = datetime.utcnow()
+
+    ai_process = process = None
+    try:
+        ai_process, ai_url = start_mock_ai(args, workdir)
+        env = server_environment(workdir, args, ai_url)
+        # The stores read their paths from the environment when first imported
+        os.environ.update(env)
+
+        logger.info(f"Seeding {args.jobs} jobs, {args.posts} posts, {args.uploads} uploads, "
+                    f"{args.personas} personas, {args.schedules} schedules in {workdir}")
+        seed_started = time.perf_counter()
+        job_ids, persona_ids = seed_data(args)
+        logger.info(f"Seeded in {time.perf_counter() - seed_started:.1f}s")
+
+        process, base_url = start_backend(args, env, workdir)
+        login = requests.post(f"{base_url}/api/auth/login",
+                              json={'email': BENCH_ADMIN_EMAIL, 'password': BENCH_ADMIN_PASSWORD})
+        login.raise_for_status()
+        token = login.json()['token']
+
+        scenarios = build_scenarios(job_ids, persona_ids)
+        if args.endpoints:
+            wanted = [name.strip() for name in args.endpoints.split(',')]
+            scenarios = {name: fn for name, fn in scenarios.items() if name in wanted}
+
+        endpoints = {}
+        for name, request_fn in scenarios.items():
+            logger.info(f"Benchmarking {name}")
+            endpoints[name] = run_scenario(request_fn, base_url, token, args.requests,
+                                           args.concurrency, args.warmup, args.seed)
+            logger.info(f"{name}: {endpoints[name]}")
+    finally:
+        for running in [process, ai_process]:
+            if running is not None:
+                stop_process(running)
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'started_at': started_at.isoformat(),
+        'git_commit': git_commit(),
+        'python': sys.version.split()[0],
+        # Clients and server share these, compare runs from the same machine
+        'cpus': os.cpu_count(),
+        'settings': {
+            key: getattr(args, key) for key in [
+                'server', 'workers', 'job_store', 'jobs', 'posts', 'uploads', 'personas', 'schedules',
+                'seed', 'requests', 'concurrency', 'warmup', 'ai_latency', 'ai_jitter'
+            ]
+        },
+        'endpoints': endpoints
+    }
+
+    output_path = args.output or os.path.join(
+        BACKEND_DIR, 'benchmark_results', f"{started_at.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{'endpoint':24s} {'rps':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'errors':>7s}")
+    for name, stats in endpoints.items():
+        print(f"{name:24s} {stats['rps']:>8} {stats['p50_ms']:>9} {stats['p95_ms']:>9} "
+              f"{stats['p99_ms']:>9} {stats['errors']:>7}")
+    print(f"\nResults written to {output_path}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -10,11 +10,21 @@ class Config:
     # Flask settings
     SECRET_KEY = os.getenv('SECRET_KEY', 'buzzsnip-dev-key-change-in-production')
     DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+    AUTH_CACHE_SIZE = int(os.getenv('AUTH_CACHE_SIZE', 1024))  # verified JWTs kept in memory
     
     # Server settings
     HOST = os.getenv('FLASK_HOST', '0.0.0.0')
     PORT = int(os.getenv('FLASK_PORT', 5000))
     
+    # Production server (python run.py serve)
+    WORKERS = int(os.getenv('WORKERS', 4))
+    WORKER_THREADS = int(os.getenv('WORKER_THREADS', 8))  # concurrent requests (incl. SSE streams) per worker
+    SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', max(1, WORKER_THREADS // 2)))  # open SSE streams per process, 503 above
+    SSE_MAX_LIFETIME = int(os.getenv('SSE_MAX_LIFETIME', 300))  # seconds before a stream closes and the client reconnects
+    WORKER_MAX_REQUESTS = int(os.getenv('WORKER_MAX_REQUESTS', 1000))  # recycle a worker after this many, 0 = never
+    WORKER_TIMEOUT = int(os.getenv('WORKER_TIMEOUT', 120))  # seconds
+    PROCESS_SYNC_INTERVAL = float(os.getenv('PROCESS_SYNC_INTERVAL', 1.0))  # seconds between checks for other processes' writes
+    
     # Admin credentials
     ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'aditya.admin@buzzsnip.com')
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', '9074_Qwerty')
@@ -22,6 +32,12 @@ class Config:
     # AI Services
     AI_SERVICES_URL = os.getenv('AI_SERVICES_URL', 'http://localhost:5001')
     AI_SERVICES_TIMEOUT = int(os.getenv('AI_SERVICES_TIMEOUT', 600))
+    AI_SERVICES_POOL_SIZE = int(os.getenv('AI_SERVICES_POOL_SIZE', 10))
+    AI_SERVICES_MAX_RETRIES = int(os.getenv('AI_SERVICES_MAX_RETRIES', 2))
+    AI_SERVICES_RETRY_BACKOFF = float(os.getenv('AI_SERVICES_RETRY_BACKOFF', 0.5))  # seconds, doubled per retry
+    AI_SERVICES_BREAKER_THRESHOLD = int(os.getenv('AI_SERVICES_BREAKER_THRESHOLD', 5))  # consecutive failures
+    AI_SERVICES_BREAKER_RESET = int(os.getenv('AI_SERVICES_BREAKER_RESET', 30))  # seconds before a trial call
+    AUTOMATED_PIPELINE = os.getenv('AUTOMATED_PIPELINE', 'single')  # 'single' (one /generate/automated call) or 'stages' (stage DAG: checkpoints, per-stage timing and residency)
     
     # File paths
     DATA_DIR = os.getenv('DATA_DIR', 'data')
@@ -29,18 +45,61 @@ class Config:
     GENERATED_DIR = os.getenv('GENERATED_DIR', 'generated')
     LOGS_DIR = os.getenv('LOGS_DIR', 'logs')
     
+    # Logging (logs/backend.log)
+    LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 50 * 1024 * 1024))  # rotate at this size
+    LOG_ROTATE_INTERVAL = int(os.getenv('LOG_ROTATE_INTERVAL', 86400))  # seconds, also rotate at multiples of it, 0 = off
+    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 7))  # rotated files kept
+    LOG_FLUSH_INTERVAL = float(os.getenv('LOG_FLUSH_INTERVAL', 1.0))  # seconds between batched writes
+    LOG_FLUSH_RECORDS = int(os.getenv('LOG_FLUSH_RECORDS', 500))  # or after this many records
+    ACCESS_LOG_SAMPLE_RATE = float(os.getenv('ACCESS_LOG_SAMPLE_RATE', 0.01))  # share of health/polling requests logged
+    ACCESS_LOG_SAMPLED_ENDPOINTS = os.getenv(
+        'ACCESS_LOG_SAMPLED_ENDPOINTS', 'health_check,content.get_job_status,admin.get_system_status,metrics.export_metrics'
+    ).split(',')
+    
+    # Job store
+    JOB_STORE_BACKEND = os.getenv('JOB_STORE_BACKEND', 'sqlite')  # 'sqlite' or 'json'
+    JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', os.path.join(DATA_DIR, 'jobs.db'))
+    JOB_STATS_MAX_AGE = int(os.getenv('JOB_STATS_MAX_AGE', 300))  # seconds before a full re-scan
+    RECORD_INDEX_MAX_AGE = int(os.getenv('RECORD_INDEX_MAX_AGE', 30))  # seconds between posts re-scans
+    
     # Social media APIs
     YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY', '')
     YOUTUBE_CLIENT_ID = os.getenv('YOUTUBE_CLIENT_ID', '')
     YOUTUBE_CLIENT_SECRET = os.getenv('YOUTUBE_CLIENT_SECRET', '')
+    YOUTUBE_UPLOAD_URL = os.getenv('YOUTUBE_UPLOAD_URL', '')  # resumable upload endpoint, mock uploads when empty
+    YOUTUBE_ACCESS_TOKEN = os.getenv('YOUTUBE_ACCESS_TOKEN', '')
     
     INSTAGRAM_USERNAME = os.getenv('INSTAGRAM_USERNAME', '')
     INSTAGRAM_PASSWORD = os.getenv('INSTAGRAM_PASSWORD', '')
+    INSTAGRAM_UPLOAD_URL = os.getenv('INSTAGRAM_UPLOAD_URL', '')
+    INSTAGRAM_ACCESS_TOKEN = os.getenv('INSTAGRAM_ACCESS_TOKEN', '')
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))  # multiple of 256 KiB
+    UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS', 4))  # upload queue workers
+    UPLOAD_RATE_LIMITS = os.getenv('UPLOAD_RATE_LIMITS', 'youtube=6,instagram=6')  # uploads per minute
+    UPLOAD_LOG_SEGMENT_BYTES = int(os.getenv('UPLOAD_LOG_SEGMENT_BYTES', 16 * 1024 * 1024))
     
     # Content settings
     MAX_VIDEO_DURATION = int(os.getenv('MAX_VIDEO_DURATION', 60))
     MAX_CONCURRENT_JOBS = int(os.getenv('MAX_CONCURRENT_JOBS', 3))
     AUTO_CLEANUP_DAYS = int(os.getenv('AUTO_CLEANUP_DAYS', 30))
+    JOB_BATCH_WINDOW = float(os.getenv('JOB_BATCH_WINDOW', 120))  # seconds a job may wait behind jobs on resident models (0 = arrival order)
+    JOB_MAX_RETRIES = int(os.getenv('JOB_MAX_RETRIES', 2))  # automatic retries of a failed job
+    JOB_RETRY_DELAY = float(os.getenv('JOB_RETRY_DELAY', 30))  # seconds before the first retry, doubled per retry
+    
+    # Scheduler
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    
+    # System metrics sampler
+    METRICS_SAMPLE_INTERVAL = float(os.getenv('METRICS_SAMPLE_INTERVAL', 5))  # seconds
+    METRICS_HISTORY_SIZE = int(os.getenv('METRICS_HISTORY_SIZE', 720))  # samples kept
+    METRICS_PUBLISH_INTERVAL = float(os.getenv('METRICS_PUBLISH_INTERVAL', 5))  # seconds between /api/metrics snapshots per worker
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # static bearer token for Prometheus scrapes of /api/metrics (admin JWTs always work)
+    
+    # Model residency
+    MODEL_RUNTIME = os.getenv('MODEL_RUNTIME', 'fake')  # 'fake' (local, no GPU) or 'ai_services'
+    MODEL_MEMORY_BUDGET_MB = int(os.getenv('MODEL_MEMORY_BUDGET_MB', 8192))  # memory for resident models
+    MODEL_PINNED = os.getenv('MODEL_PINNED', '').split(',')  # model keys kept loaded, e.g. "bark,realistic-vision-v5"
+    FAKE_MODEL_LOAD_SECONDS_PER_GB = float(os.getenv('FAKE_MODEL_LOAD_SECONDS_PER_GB', 0))  # simulated load time, 0 keeps only the bookkeeping
     
     # CORS settings
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
@@ -55,7 +114,6 @@ class Config:
         # Create subdirectories
         os.makedirs(os.path.join(Config.DATA_DIR, 'jobs'), exist_ok=True)
         os.makedirs(os.path.join(Config.DATA_DIR, 'posts'), exist_ok=True)
-        os.makedirs(os.path.join(Config.DATA_DIR, 'uploads'), exist_ok=True)
 
 class DevelopmentConfig(Config):
     """Development configuration"""
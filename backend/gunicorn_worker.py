@@ -0,0 +1,54 @@
+"""
+gunicorn worker class for `python run.py serve`
+"""
+
+import sys
+import time
+from gunicorn.workers.gthread import ThreadWorker
+
+class DrainingThreadWorker(ThreadWorker):
+    """gthread worker that stops accepting before it exits
+
+    The stock worker can exit with connections it has accepted but not
+    served yet, resetting them. On max-requests or SIGTERM (reload,
+    shutdown) this one unregisters its listeners, so new connections go
+    to the other workers, stops keep-alive, and exits once its open
+    connections are done or half the graceful timeout has passed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.recycle_at = self.max_requests
+        self.max_requests = sys.maxsize
+        self.drain_deadline = None
+        self.exit_requested = False
+
+    def drain(self):
+        if self.drain_deadline is not None:
+            return
+        self.drain_deadline = time.monotonic() + self.cfg.graceful_timeout / 2
+        self.cfg.set('keepalive', 0)  # this process's copy
+        with self._lock:
+            for sock in self.sockets:
+                try:
+                    self.poller.unregister(sock)
+                except (KeyError, ValueError):
+                    pass
+
+    def handle_exit(self, sig, frame):
+        # Signal context: the main loop does the draining
+        self.exit_requested = True
+
+    def handle_request(self, req, conn):
+        if self.nr + 1 >= self.recycle_at and self.drain_deadline is None:
+            self.log.info(f"Recycling worker after {self.nr + 1} requests")
+            self.drain()
+        return super().handle_request(req, conn)
+
+    def murder_keepalived(self):
+        # Runs on every pass of the main loop
+        super().murder_keepalived()
+        if self.exit_requested:
+            self.drain()
+        if self.drain_deadline is not None and (self.nr_conns <= 0 or time.monotonic() > self.drain_deadline):
+            self.alive = False
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+BuzzSnip Job Store Migration
+One-shot import of data/jobs/*.json into the SQLite job store
+"""
+
+import os
+import sys
+import logging
+from config import Config
+from services.job_store import SqliteJobStore, migrate_json_jobs, LEGACY_IMPORT_KEY
+
+def main():
+    """Migrate legacy per-file jobs into the job store"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger(__name__)
+    
+    default_dir = os.path.join(Config.DATA_DIR, 'jobs')
+    jobs_dir = sys.argv[1] if len(sys.argv) > 1 else default_dir
+    
+    if Config.JOB_STORE_BACKEND == 'json':
+        logger.error("JOB_STORE_BACKEND is 'json', nothing to migrate")
+        sys.exit(1)
+    
+    if not os.path.isdir(jobs_dir):
+        logger.error(f"Jobs directory not found: {jobs_dir}")
+        sys.exit(1)
+    
+    # Opened directly: get_job_store() would also auto-import data/jobs
+    store = SqliteJobStore(Config.JOB_STORE_PATH)
+    migrated = migrate_json_jobs(jobs_dir, store)
+    if os.path.realpath(jobs_dir) == os.path.realpath(default_dir):
+        store.set_meta(LEGACY_IMPORT_KEY, 'completed')
+    logger.info(f"Migrated {migrated} jobs from {jobs_dir} to {Config.JOB_STORE_PATH}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+BuzzSnip Mock AI Services
+Local stand-in for the AI services API, for benchmarking the backend without the model runtime
+
+Point AI_SERVICES_URL at http://localhost:5001 and use --latency / --jitter
+to set how long each generation takes and --fail-rate to inject 503s.
+POST /models/<key>/load|unload answers after --load-latency seconds, for
+MODEL_RUNTIME=ai_services. With --generated-dir the mock also writes small
+placeholder files there and returns their *_path, like AI services sharing
+the backend's generated/ directory.
+"""
+
+import sys
+import time
+import uuid
+import random
+import argparse
+import threading
+import logging
+import os
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+GENERATE_PREFIX = '/generate/'
+MODELS_PREFIX = '/models/'
+
+# Result fields returned for each generation type, as the real services name them
+RESULT_FIELDS = {
+    'automated': ['video_url', 'audio_url', 'face_url'],
+    'audio': ['audio_url'],
+    'face': ['face_url'],
+    'video': ['video_url'],
+    # Automated pipeline stages
+    'script': ['script'],
+    'upscale': ['video_url'],
+    'compose': ['video_url'],
+    'thumbnail': ['thumbnail_url']
+}
+
+FILE_EXTENSIONS = {
+    'video_url': 'mp4',
+    'audio_url': 'wav',
+    'face_url': 'png',
+    'thumbnail_url': 'jpg'
+}
+
+class MockAIState:
+    """Latency and failure settings plus call counts per endpoint"""
+
+    def __init__(self, latency, jitter, fail_rate, load_latency=0.0, generated_dir=None):
+        self.latency = latency
+        self.generated_dir = generated_dir
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.load_latency = load_latency
+        self.calls = {}
+        self.loaded = set()
+        self.lock = threading.Lock()
+
+    def record_call(self, endpoint):
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def delay(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+def generation_result(job_type, generated_dir=None):
+    """Fake result body for one generation"""
+    name = uuid.uuid4().hex
+    result = {}
+    for field in RESULT_FIELDS[job_type]:
+        if field not in FILE_EXTENSIONS:
+            continue
+        filename = f"{job_type}_{name}.{FILE_EXTENSIONS[field]}"
+        result[field] = f"/generated/{filename}"
+        if generated_dir:
+            path = os.path.join(generated_dir, filename)
+            with open(path, 'wb') as f:
+                f.write(b'mock')
+            result[field[:-len('_url')] + '_path'] = path
+    if job_type == 'script':
+        result['script'] = f"Mock script {name}"
+    result['generated_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return result
+
+def make_handler(state):
+    class MockAIHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/health':
+                return self._reply(200, {'status': 'healthy', 'calls': dict(state.calls), 'loaded_models': sorted(state.loaded)})
+            return self._reply(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            if length:
+                self.rfile.read(length)
+
+            if self.path.startswith(MODELS_PREFIX):
+                return self._model_action(self.path[len(MODELS_PREFIX):])
+
+            job_type = self.path[len(GENERATE_PREFIX):] if self.path.startswith(GENERATE_PREFIX) else None
+            if job_type not in RESULT_FIELDS:
+                return self._reply(404, {'error': 'Not found'})
+
+            state.record_call(self.path)
+            time.sleep(state.delay())
+
+            if random.random() < state.fail_rate:
+                logger.info(f"Injected failure for {self.path}")
+                return self._reply(503, {'error': 'Injected failure'})
+            return self._reply(200, generation_result(job_type, state.generated_dir))
+
+        def _model_action(self, path):
+            key, _, action = path.rpartition('/')
+            if not key or action not in ['load', 'unload']:
+                return self._reply(404, {'error': 'Not found'})
+
+            state.record_call(self.path)
+            with state.lock:
+                loaded = key in state.loaded
+            if action == 'load' and not loaded:
+                time.sleep(state.load_latency)
+            with state.lock:
+                if action == 'load':
+                    state.loaded.add(key)
+                else:
+                    state.loaded.discard(key)
+            return self._reply(200, {'key': key, 'status': 'loaded' if action == 'load' else 'unloaded'})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return MockAIHandler
+
+class MockAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # The backend dropping a pooled connection (timeout, shutdown) is expected
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+def main():
+    """Run the mock AI services"""
+    parser = argparse.ArgumentParser(description='Mock AI services')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--latency', type=float, default=1.0, help='seconds per generation')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random +/- seconds added to --latency')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of generations answered with 503')
+    parser.add_argument('--load-latency', type=float, default=0.0, help='seconds per model load')
+    parser.add_argument('--generated-dir', help='write placeholder files here and return their *_path')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.generated_dir:
+        os.makedirs(args.generated_dir, exist_ok=True)
+
+    server = MockAIServer((args.host, args.port), make_handler(MockAIState(args.latency, args.jitter, args.fail_rate, args.load_latency, args.generated_dir)))
+    logger.info(f"Mock AI services listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+BuzzSnip Mock Upload Platform
+Local server speaking the resumable upload protocol, for offline resume/retry testing
+
+Point YOUTUBE_UPLOAD_URL and/or INSTAGRAM_UPLOAD_URL at
+http://localhost:5002/upload and use --fail-rate / --partial to inject
+5xx responses and short commits.
+"""
+
+import re
+import uuid
+import random
+import argparse
+import threading
+import logging
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+class MockPlatformState:
+    """In-memory upload sessions: session_id -> {'size', 'data', 'metadata'}"""
+
+    def __init__(self, fail_rate, partial):
+        self.fail_rate = fail_rate
+        self.partial = partial
+        self.sessions = {}
+        self.lock = threading.Lock()
+
+def make_handler(state):
+    class MockPlatformHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body=None, headers=None):
+            payload = json.dumps(body).encode() if body is not None else b''
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _read_body(self):
+            length = int(self.headers.get('Content-Length', 0))
+            return self.rfile.read(length) if length else b''
+
+        def _progress(self, session_id, session):
+            committed = len(session['data'])
+            if committed >= session['size']:
+                return self._reply(201, {'id': session_id, 'url': f"http://localhost/videos/{session_id}"})
+            headers = {'Range': f"bytes=0-{committed - 1}"} if committed else {}
+            return self._reply(308, headers=headers)
+
+        def do_POST(self):
+            if self.path != '/upload':
+                return self._reply(404, {'error': 'Not found'})
+
+            metadata = json.loads(self._read_body() or b'{}')
+            size = int(self.headers.get('X-Upload-Content-Length', 0))
+            session_id = uuid.uuid4().hex
+
+            with state.lock:
+                state.sessions[session_id] = {'size': size, 'data': bytearray(), 'metadata': metadata}
+
+            host = self.headers.get('Host', 'localhost')
+            logger.info(f"Opened session {session_id} for {size} bytes")
+            self._reply(200, headers={'Location': f"http://{host}/upload/{session_id}"})
+
+        def do_PUT(self):
+            match = re.match(r'^/upload/([0-9a-f]+)$', self.path)
+            body = self._read_body()
+
+            with state.lock:
+                session = state.sessions.get(match.group(1)) if match else None
+                if session is None:
+                    return self._reply(404, {'error': 'Unknown upload session'})
+                session_id = match.group(1)
+
+                content_range = self.headers.get('Content-Range', '')
+                if content_range.startswith('bytes */'):
+                    return self._progress(session_id, session)
+
+                if random.random() < state.fail_rate:
+                    logger.info(f"Injected failure for session {session_id}")
+                    return self._reply(503, {'error': 'Injected failure'})
+
+                range_match = re.match(r'bytes (\d+)-(\d+)/(\d+)', content_range)
+                if not range_match or int(range_match.group(1)) != len(session['data']):
+                    # Out-of-order chunk: tell the client where to resume
+                    return self._progress(session_id, session)
+
+                # Commit only part of the chunk to exercise the client's offset handling
+                if state.partial and len(body) > 1:
+                    body = body[:random.randint(1, len(body))]
+                session['data'].extend(body)
+                return self._progress(session_id, session)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return MockPlatformHandler
+
+def main():
+    """Run the mock upload platform"""
+    parser = argparse.ArgumentParser(description='Mock resumable upload platform')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of chunk PUTs answered with 503')
+    parser.add_argument('--partial', action='store_true', help='commit a random prefix of each chunk')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    state = MockPlatformState(args.fail_rate, args.partial)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    logger.info(f"Mock upload platform listening on http://{args.host}:{args.port}/upload")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
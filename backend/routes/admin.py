@@ -1,16 +1,24 @@
 from flask import Blueprint, request, jsonify
 import os
-import json
 import psutil
 import logging
 from datetime import datetime
 from .auth import require_auth
+from services import job_store
+from services.settings_store import load_settings, update_settings_category
+from services.job_stats import get_job_stats
+from services.system_sampler import get_system_sampler
+from services.ai_client import get_ai_client
+from services.artifact_cache import get_artifact_cache
+from services.upload_queue import get_upload_queue
+from services.metrics import collect_metrics
+from services.model_residency import (
+    get_model_residency, UnknownModelError, ModelBudgetError, ModelBusyError, ModelRuntimeError
+)
 
 admin_bp = Blueprint('admin', __name__)
 logger = logging.getLogger(__name__)
 
-SETTINGS_FILE = 'data/settings.json'
-
 @admin_bp.route('/settings', methods=['GET'])
 @require_auth
 def get_settings():
@@ -29,19 +37,15 @@ def update_settings(category):
     """Update settings for a specific category"""
     try:
         data = request.get_json()
-        settings = load_settings()
-        
-        if category not in settings:
-            return jsonify({'error': 'Invalid settings category'}), 400
         
         # Update the category settings
-        settings[category].update(data)
-        settings['last_updated'] = datetime.utcnow().isoformat()
+        category_settings = update_settings_category(category, data)
         
-        save_settings(settings)
+        if category_settings is None:
+            return jsonify({'error': 'Invalid settings category'}), 400
         
         logger.info(f"Updated {category} settings")
-        return jsonify({'success': True, 'settings': settings[category]})
+        return jsonify({'success': True, 'settings': category_settings})
         
     except Exception as e:
         logger.error(f"Update settings error: {str(e)}")
@@ -52,24 +56,15 @@ def update_settings(category):
 def get_system_status():
     """Get system status and performance metrics"""
     try:
-        # Get system metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Get GPU info if available
-        gpu_usage = 0
-        try:
-            import GPUtil
-            gpus = GPUtil.getGPUs()
-            if gpus:
-                gpu_usage = gpus[0].load * 100
-        except ImportError:
-            pass
+        # Get the latest background sample instead of blocking on psutil
+        sampler = get_system_sampler()
+        sample = sampler.latest() or {}
         
-        # Get active jobs count
-        active_jobs = count_active_jobs()
-        queue_length = count_queued_jobs()
+        # Get job counts from a single aggregated snapshot
+        job_stats = get_job_stats().snapshot()
+        by_status = job_stats['by_status']
+        active_jobs = sum(by_status.get(status, 0) for status in job_store.ACTIVE_STATUSES)
+        queue_length = by_status.get('queued', 0)
         
         # Calculate uptime
         boot_time = datetime.fromtimestamp(psutil.boot_time())
@@ -77,17 +72,27 @@ def get_system_status():
         uptime_str = f"{uptime.days} days, {uptime.seconds // 3600} hours"
         
         status = {
-            'cpu_usage': cpu_percent,
-            'memory_usage': memory.percent,
-            'gpu_usage': gpu_usage,
-            'disk_usage': disk.percent,
+            'cpu_usage': sample.get('cpu_usage', 0),
+            'memory_usage': sample.get('memory_usage', 0),
+            'gpu_usage': sample.get('gpu_usage', 0),
+            'disk_usage': sample.get('disk_usage', 0),
+            'sampled_at': sample.get('timestamp'),
             'active_jobs': active_jobs,
             'queue_length': queue_length,
+            'jobs': job_stats,
+            'ai_services': get_ai_client().stats(),
+            'artifact_cache': get_artifact_cache().stats(),
+            'upload_queue': get_upload_queue().depth(),
             'uptime': uptime_str,
             'last_backup': get_last_backup_time(),
             'timestamp': datetime.utcnow().isoformat()
         }
         
+        # Optional min/avg/max over the last ?window=<seconds>
+        window = request.args.get('window', type=int)
+        if window:
+            status['window_stats'] = sampler.summary(window)
+        
         return jsonify(status)
         
     except Exception as e:
@@ -97,49 +102,15 @@ def get_system_status():
 @admin_bp.route('/models', methods=['GET'])
 @require_auth
 def get_model_status():
-    """Get AI model status"""
+    """Get AI model residency and the model memory budget"""
     try:
-        # This would typically query the AI services
-        # For now, return mock data
-        models = [
-            {
-                'name': 'Stable Diffusion',
-                'status': 'loaded',
-                'size': '4.2 GB',
-                'last_used': '2024-01-15T14:30:00Z',
-                'memory_usage': '3.8 GB'
-            },
-            {
-                'name': 'Bark TTS',
-                'status': 'loaded',
-                'size': '2.8 GB',
-                'last_used': '2024-01-15T14:25:00Z',
-                'memory_usage': '2.1 GB'
-            },
-            {
-                'name': 'SadTalker',
-                'status': 'loaded',
-                'size': '1.5 GB',
-                'last_used': '2024-01-15T14:20:00Z',
-                'memory_usage': '1.2 GB'
-            },
-            {
-                'name': 'Real-ESRGAN',
-                'status': 'unloaded',
-                'size': '67 MB',
-                'last_used': '2024-01-14T16:45:00Z',
-                'memory_usage': '0 MB'
-            },
-            {
-                'name': 'TinyLlama',
-                'status': 'loaded',
-                'size': '2.2 GB',
-                'last_used': '2024-01-15T14:35:00Z',
-                'memory_usage': '1.8 GB'
-            }
-        ]
+        status = get_model_residency().status()
+        
+        # Counted by the job dispatcher, in whichever process runs it
+        swaps_avoided = collect_metrics().get(('counter', 'job_model_swaps_avoided_total', ()), 0)
+        status['swaps_avoided'] = int(swaps_avoided)
         
-        return jsonify(models)
+        return jsonify(status)
         
     except Exception as e:
         logger.error(f"Get model status error: {str(e)}")
@@ -148,17 +119,30 @@ def get_model_status():
 @admin_bp.route('/models/<model_name>/<action>', methods=['POST'])
 @require_auth
 def model_action(model_name, action):
-    """Perform action on AI model (load/unload)"""
+    """Perform action on AI model (load/unload/pin/unpin)"""
     try:
-        if action not in ['load', 'unload']:
+        residency = get_model_residency()
+        actions = {
+            'load': residency.load,
+            'unload': residency.unload,
+            'pin': residency.pin,
+            'unpin': residency.unpin
+        }
+        if action not in actions:
             return jsonify({'error': 'Invalid action'}), 400
         
-        # TODO: Implement actual model loading/unloading
-        # This would communicate with AI services
+        model = actions[action](model_name)
         
-        logger.info(f"Model action: {action} {model_name}")
-        return jsonify({'success': True, 'message': f'Model {action} successful'})
+        logger.info(f"Model action: {action} {model['key']}")
+        return jsonify({'success': True, 'message': f'Model {action} successful', 'model': model})
         
+    except UnknownModelError as e:
+        return jsonify({'error': str(e)}), 404
+    except (ModelBudgetError, ModelBusyError) as e:
+        return jsonify({'error': str(e)}), 409
+    except ModelRuntimeError as e:
+        logger.error(f"Model action error: {str(e)}")
+        return jsonify({'error': str(e)}), 502
     except Exception as e:
         logger.error(f"Model action error: {str(e)}")
         return jsonify({'error': f'Failed to {action} model'}), 500
@@ -200,106 +184,6 @@ def system_action(action):
         logger.error(f"System action error: {str(e)}")
         return jsonify({'error': f'Failed to {action} system'}), 500
 
-def load_settings():
-    """Load settings from JSON file"""
-    try:
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
-        else:
-            return get_default_settings()
-            
-    except Exception as e:
-        logger.error(f"Load settings error: {str(e)}")
-        return get_default_settings()
-
-def save_settings(settings):
-    """Save settings to JSON file"""
-    try:
-        os.makedirs('data', exist_ok=True)
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=2)
-            
-    except Exception as e:
-        logger.error(f"Save settings error: {str(e)}")
-
-def get_default_settings():
-    """Get default settings"""
-    return {
-        'general': {
-            'app_name': 'BuzzSnip',
-            'app_version': '1.0.0',
-            'max_video_duration': 60,
-            'default_resolution': '1080p',
-            'auto_cleanup_days': 30,
-            'max_concurrent_jobs': 3
-        },
-        'ai_models': {
-            'stable_diffusion_model': 'realistic-vision-v5',
-            'voice_model': 'bark',
-            'lip_sync_model': 'sadtalker',
-            'upscaling_model': 'real-esrgan',
-            'llm_model': 'tinyllama'
-        },
-        'social_media': {
-            'youtube_api_key': '••••••••••••••••',
-            'instagram_username': '•��••••••••••••••',
-            'auto_upload_enabled': True,
-            'max_upload_retries': 3,
-            'upload_timeout': 300
-        },
-        'storage': {
-            'output_directory': '/app/output',
-            'temp_directory': '/app/temp',
-            'models_directory': '/app/models',
-            'max_storage_gb': 100,
-            'auto_cleanup_enabled': True
-        },
-        'last_updated': datetime.utcnow().isoformat()
-    }
-
-def count_active_jobs():
-    """Count active jobs"""
-    try:
-        jobs_dir = 'data/jobs'
-        if not os.path.exists(jobs_dir):
-            return 0
-        
-        active_count = 0
-        for filename in os.listdir(jobs_dir):
-            if filename.endswith('.json'):
-                with open(os.path.join(jobs_dir, filename), 'r') as f:
-                    job = json.load(f)
-                    if job.get('status') in ['processing', 'queued']:
-                        active_count += 1
-        
-        return active_count
-        
-    except Exception as e:
-        logger.error(f"Count active jobs error: {str(e)}")
-        return 0
-
-def count_queued_jobs():
-    """Count queued jobs"""
-    try:
-        jobs_dir = 'data/jobs'
-        if not os.path.exists(jobs_dir):
-            return 0
-        
-        queued_count = 0
-        for filename in os.listdir(jobs_dir):
-            if filename.endswith('.json'):
-                with open(os.path.join(jobs_dir, filename), 'r') as f:
-                    job = json.load(f)
-                    if job.get('status') == 'queued':
-                        queued_count += 1
-        
-        return queued_count
-        
-    except Exception as e:
-        logger.error(f"Count queued jobs error: {str(e)}")
-        return 0
-
 def get_last_backup_time():
     """Get last backup time"""
     try:
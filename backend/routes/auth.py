@@ -3,10 +3,14 @@ import os
 import jwt
 from datetime import datetime, timedelta
 import logging
+from services.auth_tokens import get_token_verifier
 
 auth_bp = Blueprint('auth', __name__)
 logger = logging.getLogger(__name__)
 
+# Signing key is resolved once, at import
+token_verifier = get_token_verifier()
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Admin login endpoint"""
@@ -32,11 +36,7 @@ def login():
                 'iat': datetime.utcnow()
             }
             
-            token = jwt.encode(
-                token_payload,
-                os.getenv('SECRET_KEY', 'buzzsnip-dev-key'),
-                algorithm='HS256'
-            )
+            token = token_verifier.issue(token_payload)
             
             logger.info(f"Successful login for admin: {email}")
             
@@ -69,11 +69,7 @@ def verify_token():
         token = auth_header.split(' ')[1]
         
         try:
-            payload = jwt.decode(
-                token,
-                os.getenv('SECRET_KEY', 'buzzsnip-dev-key'),
-                algorithms=['HS256']
-            )
+            payload = token_verifier.verify(token)
             
             return jsonify({
                 'valid': True,
@@ -94,7 +90,13 @@ def verify_token():
 
 @auth_bp.route('/logout', methods=['POST'])
 def logout():
-    """Logout endpoint (client-side token removal)"""
+    """Logout endpoint (revokes the bearer token, if any)"""
+    auth_header = request.headers.get('Authorization')
+    
+    if auth_header and auth_header.startswith('Bearer '):
+        if token_verifier.revoke(auth_header.split(' ')[1]):
+            logger.info("Revoked token on logout")
+    
     return jsonify({'success': True, 'message': 'Logged out successfully'})
 
 def require_auth(f):
@@ -105,18 +107,16 @@ def require_auth(f):
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization')
         
-        if not auth_header or not auth_header.startswith('Bearer '):
+        if auth_header and auth_header.startswith('Bearer '):
+            token = auth_header.split(' ')[1]
+        elif 'text/event-stream' in request.headers.get('Accept', '') and request.args.get('token'):
+            # EventSource cannot set headers, so SSE streams may pass ?token=
+            token = request.args['token']
+        else:
             return jsonify({'error': 'Authentication required'}), 401
         
-        token = auth_header.split(' ')[1]
-        
         try:
-            payload = jwt.decode(
-                token,
-                os.getenv('SECRET_KEY', 'buzzsnip-dev-key'),
-                algorithms=['HS256']
-            )
-            request.user = payload
+            request.user = token_verifier.verify(token)
             return f(*args, **kwargs)
             
         except jwt.ExpiredSignatureError:
@@ -1,17 +1,29 @@
-from flask import Blueprint, request, jsonify
-import os
+from flask import Blueprint, request, jsonify, Response
 import json
-import uuid
-from datetime import datetime
+import time
 import logging
-import requests
+import threading
+from config import Config
 from .auth import require_auth
+from services import job_store
+from services.generation import build_job, build_automated_job, MANUAL_PIPELINE
+from services.job_queue import enqueue_job, resume_job, TERMINAL_STATUSES
+from services.job_events import get_job_event_bus, job_event
+from services.artifact_cache import get_artifact_cache, current_models
+from services.record_index import get_record_index
+from .listing import listing_response
 
 content_bp = Blueprint('content', __name__)
 logger = logging.getLogger(__name__)
 
-# AI Services base URL
-AI_SERVICES_URL = os.getenv('AI_SERVICES_URL', 'http://localhost:5001')
+# Seconds between SSE keep-alive comments on idle streams
+SSE_KEEPALIVE = 15
+
+# Seconds a client is told to wait when every stream slot is taken
+SSE_RETRY_AFTER = 5
+
+# Each open stream holds a server thread, so only some of them may stream
+_stream_slots = threading.BoundedSemaphore(Config.SSE_MAX_STREAMS)
 
 @content_bp.route('/generate', methods=['POST'])
 @require_auth
@@ -26,51 +38,16 @@ def generate_automated():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Generate unique job ID
-        job_id = str(uuid.uuid4())
+        # Create job record and hand it to the worker pool
+        job_id = enqueue_job(build_automated_job(data))
         
-        # Create job record
-        job_data = {
+        logger.info(f"Automated generation queued for job: {job_id}")
+        return jsonify({
+            'success': True,
             'job_id': job_id,
-            'type': 'automated',
             'status': 'queued',
-            'persona_id': data['persona_id'],
-            'theme': data['theme'],
-            'duration': data['duration'],
-            'platforms': data.get('platforms', ['youtube']),
-            'auto_upload': data.get('auto_upload', True),
-            'schedule_time': data.get('schedule_time'),
-            'created_at': datetime.utcnow().isoformat(),
-            'progress': 0
-        }
-        
-        # Save job to data store
-        save_job(job_data)
-        
-        # Send to AI services for processing
-        try:
-            ai_response = requests.post(
-                f"{AI_SERVICES_URL}/generate/automated",
-                json=data,
-                headers={'X-Job-ID': job_id},
-                timeout=30
-            )
-            
-            if ai_response.status_code == 200:
-                logger.info(f"Automated generation started for job: {job_id}")
-                return jsonify({
-                    'success': True,
-                    'job_id': job_id,
-                    'status': 'queued',
-                    'message': 'Video generation started'
-                })
-            else:
-                logger.error(f"AI services error: {ai_response.text}")
-                return jsonify({'error': 'Failed to start generation'}), 500
-                
-        except requests.RequestException as e:
-            logger.error(f"AI services connection error: {str(e)}")
-            return jsonify({'error': 'AI services unavailable'}), 503
+            'message': 'Video generation started'
+        })
             
     except Exception as e:
         logger.error(f"Automated generation error: {str(e)}")
@@ -88,30 +65,8 @@ def generate_audio():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Send to AI services
-        try:
-            ai_response = requests.post(
-                f"{AI_SERVICES_URL}/generate/audio",
-                json=data,
-                timeout=120  # Audio generation can take time
-            )
-            
-            if ai_response.status_code == 200:
-                result = ai_response.json()
-                logger.info(f"Audio generated successfully")
-                return jsonify({
-                    'success': True,
-                    'audio_url': result.get('audio_url'),
-                    'duration': result.get('duration'),
-                    'file_size': result.get('file_size')
-                })
-            else:
-                logger.error(f"Audio generation error: {ai_response.text}")
-                return jsonify({'error': 'Audio generation failed'}), 500
-                
-        except requests.RequestException as e:
-            logger.error(f"AI services connection error: {str(e)}")
-            return jsonify({'error': 'AI services unavailable'}), 503
+        # Audio generation can take time, poll /api/jobs/<job_id> for audio_url
+        return queue_generation('audio', data)
             
     except Exception as e:
         logger.error(f"Audio generation error: {str(e)}")
@@ -129,30 +84,8 @@ def generate_face():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Send to AI services
-        try:
-            ai_response = requests.post(
-                f"{AI_SERVICES_URL}/generate/face",
-                json=data,
-                timeout=180  # Face generation can take time
-            )
-            
-            if ai_response.status_code == 200:
-                result = ai_response.json()
-                logger.info(f"Face generated successfully")
-                return jsonify({
-                    'success': True,
-                    'face_url': result.get('face_url'),
-                    'resolution': result.get('resolution'),
-                    'file_size': result.get('file_size')
-                })
-            else:
-                logger.error(f"Face generation error: {ai_response.text}")
-                return jsonify({'error': 'Face generation failed'}), 500
-                
-        except requests.RequestException as e:
-            logger.error(f"AI services connection error: {str(e)}")
-            return jsonify({'error': 'AI services unavailable'}), 503
+        # Face generation can take time, poll /api/jobs/<job_id> for face_url
+        return queue_generation('face', data)
             
     except Exception as e:
         logger.error(f"Face generation error: {str(e)}")
@@ -170,37 +103,68 @@ def generate_video():
             if field not in data:
                 return jsonify({'error': f'Missing required field: {field}'}), 400
         
-        # Send to AI services
-        try:
-            ai_response = requests.post(
-                f"{AI_SERVICES_URL}/generate/video",
-                json=data,
-                timeout=600  # Video generation can take a long time
-            )
-            
-            if ai_response.status_code == 200:
-                result = ai_response.json()
-                logger.info(f"Video generated successfully")
-                return jsonify({
-                    'success': True,
-                    'video_url': result.get('video_url'),
-                    'duration': result.get('duration'),
-                    'resolution': result.get('resolution'),
-                    'file_size': result.get('file_size'),
-                    'thumbnail_url': result.get('thumbnail_url')
-                })
-            else:
-                logger.error(f"Video generation error: {ai_response.text}")
-                return jsonify({'error': 'Video generation failed'}), 500
-                
-        except requests.RequestException as e:
-            logger.error(f"AI services connection error: {str(e)}")
-            return jsonify({'error': 'AI services unavailable'}), 503
+        # Video generation can take a long time, poll /api/jobs/<job_id> for video_url
+        return queue_generation('video', data)
             
     except Exception as e:
         logger.error(f"Video generation error: {str(e)}")
         return jsonify({'error': 'Video generation failed'}), 500
 
+@content_bp.route('/pipelines', methods=['POST'])
+@require_auth
+def create_pipeline():
+    """Manual audio -> face -> video generation as one server-side job"""
+    try:
+        data = request.get_json()
+        
+        if 'persona_id' not in data:
+            return jsonify({'error': 'Missing required field: persona_id'}), 400
+        
+        required_fields = ['script', 'voice_type']
+        for field in required_fields:
+            if field not in (data.get('audio') or {}):
+                return jsonify({'error': f'Missing required field: audio.{field}'}), 400
+        
+        # One job runs every stage, poll /api/jobs/<job_id> for its stages and video_url
+        job_id = enqueue_job(build_job('pipeline', data, models=current_models()))
+        
+        logger.info(f"Pipeline queued for job: {job_id}")
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'stages': [stage.name for stage in MANUAL_PIPELINE.stages]
+        }), 202
+            
+    except Exception as e:
+        logger.error(f"Pipeline error: {str(e)}")
+        return jsonify({'error': 'Pipeline failed'}), 500
+
+def queue_generation(job_type, data):
+    """Answer from the artifact cache when possible, otherwise queue the job"""
+    models = current_models()
+    job_data = build_job(job_type, data, models=models)
+    
+    cached = get_artifact_cache().lookup(job_type, data, models)
+    if cached is not None:
+        job_data.update({
+            'status': 'completed',
+            'progress': 100,
+            'result': cached,
+            'cache_hit': True,
+            'completed_at': job_data['created_at']
+        })
+        save_job(job_data)
+        
+        logger.info(f"{job_type.capitalize()} generation served from cache for job: {job_data['job_id']}")
+        return jsonify({'success': True, 'job_id': job_data['job_id'], 'status': 'completed',
+                        'cached': True, 'result': cached})
+    
+    job_id = enqueue_job(job_data)
+    
+    logger.info(f"{job_type.capitalize()} generation queued for job: {job_id}")
+    return jsonify({'success': True, 'job_id': job_id, 'status': 'queued'}), 202
+
 @content_bp.route('/jobs/<job_id>', methods=['GET'])
 @require_auth
 def get_job_status(job_id):
@@ -216,60 +180,154 @@ def get_job_status(job_id):
         logger.error(f"Job status error: {str(e)}")
         return jsonify({'error': 'Failed to get job status'}), 500
 
+@content_bp.route('/jobs/<job_id>/resume', methods=['POST'])
+@require_auth
+def resume_failed_job(job_id):
+    """Re-queue a failed job from its first incomplete stage"""
+    try:
+        job = load_job(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job.get('status') != 'failed':
+            return jsonify({'error': f"Only failed jobs can be resumed, this job is {job.get('status')}"}), 409
+        
+        # Single-call jobs have no checkpoints, resuming would just resubmit them
+        if not job.get('stages'):
+            return jsonify({'error': 'This job has no completed stages to resume from, submit it again'}), 409
+        
+        stages = resume_job(job)
+        
+        logger.info(f"Job {job_id} resumed")
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'stages': stages,
+            'message': 'Job resumed'
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Resume job error: {str(e)}")
+        return jsonify({'error': 'Failed to resume job'}), 500
+
+@content_bp.route('/jobs/<job_id>/events', methods=['GET'])
+@require_auth
+def job_events(job_id):
+    """Server-Sent Events stream of one job's status/progress until it finishes"""
+    try:
+        bus = get_job_event_bus()
+        
+        # Subscribe before reading the current state so no transition is missed
+        subscription = bus.subscribe([job_id])
+        job = load_job(job_id)
+        if not job:
+            bus.unsubscribe(subscription)
+            return jsonify({'error': 'Job not found'}), 404
+        
+        return sse_response(subscription, [job_event(job)], stop_when_done=True)
+        
+    except Exception as e:
+        logger.error(f"Job events error: {str(e)}")
+        return jsonify({'error': 'Failed to stream job events'}), 500
+
+@content_bp.route('/jobs/events', methods=['GET'])
+@require_auth
+def all_job_events():
+    """Multiplexed Server-Sent Events stream of job transitions (?job_ids=a,b to filter)"""
+    try:
+        job_ids = [j for j in request.args.get('job_ids', '').split(',') if j]
+        subscription = get_job_event_bus().subscribe(job_ids or None)
+        return sse_response(subscription, [], stop_when_done=False)
+        
+    except Exception as e:
+        logger.error(f"Job events error: {str(e)}")
+        return jsonify({'error': 'Failed to stream job events'}), 500
+
+def sse_response(subscription, initial_events, stop_when_done):
+    """Stream events from a job event subscription as text/event-stream
+
+    At most Config.SSE_MAX_STREAMS streams are open per process (503 with
+    Retry-After above that), and each closes after Config.SSE_MAX_LIFETIME
+    seconds; EventSource reconnects on its own.
+    """
+    bus = get_job_event_bus()
+    
+    if not _stream_slots.acquire(blocking=False):
+        bus.unsubscribe(subscription)
+        response = jsonify({'error': 'Too many open event streams, retry shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(SSE_RETRY_AFTER)
+        return response
+    
+    closes_at = time.monotonic() + Config.SSE_MAX_LIFETIME
+    
+    def format_event(event):
+        return f"event: job\ndata: {json.dumps(event)}\n\n"
+    
+    def generate():
+        try:
+            for event in initial_events:
+                yield format_event(event)
+                if stop_when_done and event.get('status') in TERMINAL_STATUSES:
+                    return
+            
+            while True:
+                remaining = closes_at - time.monotonic()
+                if remaining <= 0:
+                    return
+                
+                event = subscription.get(timeout=min(SSE_KEEPALIVE, remaining))
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                
+                yield format_event(event)
+                if stop_when_done and event.get('status') in TERMINAL_STATUSES:
+                    return
+        finally:
+            bus.unsubscribe(subscription)
+    
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs even when the client goes away before the stream starts
+    response.call_on_close(_stream_slots.release)
+    return response
+
 @content_bp.route('/posts', methods=['GET'])
 @require_auth
 def get_posts():
-    """Get all posts/content history"""
+    """Get posts/content history (paginated, filterable, or NDJSON export)"""
     try:
-        posts = load_posts()
-        return jsonify(posts)
+        return listing_response(get_record_index('posts'))
         
     except Exception as e:
         logger.error(f"Get posts error: {str(e)}")
         return jsonify({'error': 'Failed to get posts'}), 500
 
 def save_job(job_data):
-    """Save job data to file"""
+    """Save job data to the job store"""
     try:
-        os.makedirs('data/jobs', exist_ok=True)
-        job_file = f"data/jobs/{job_data['job_id']}.json"
-        
-        with open(job_file, 'w') as f:
-            json.dump(job_data, f, indent=2)
+        job_store.save_job(job_data)
             
     except Exception as e:
         logger.error(f"Save job error: {str(e)}")
 
 def load_job(job_id):
-    """Load job data from file"""
+    """Load job data from the job store"""
     try:
-        job_file = f"data/jobs/{job_id}.json"
-        
-        if os.path.exists(job_file):
-            with open(job_file, 'r') as f:
-                return json.load(f)
-        return None
+        return job_store.load_job(job_id)
         
     except Exception as e:
         logger.error(f"Load job error: {str(e)}")
         return None
 
 def load_posts():
-    """Load all posts from data directory"""
+    """Load all posts from data directory (newest first)"""
     try:
-        posts = []
-        posts_dir = 'data/posts'
-        
-        if os.path.exists(posts_dir):
-            for filename in os.listdir(posts_dir):
-                if filename.endswith('.json'):
-                    with open(os.path.join(posts_dir, filename), 'r') as f:
-                        post = json.load(f)
-                        posts.append(post)
-        
-        # Sort by creation date (newest first)
-        posts.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        return posts
+        return list(get_record_index('posts').iter_records({}))
         
     except Exception as e:
         logger.error(f"Load posts error: {str(e)}")
@@ -0,0 +1,50 @@
+from flask import request, jsonify, Response, stream_with_context
+import json
+from services.record_index import decode_cursor
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def listing_response(index):
+    """Build a paginated or NDJSON-streamed listing from a RecordIndex or UploadLog
+
+    Query parameters: limit, after (cursor), order (asc/desc), persona,
+    platform, status, since, until and format=ndjson for exports.
+    """
+    args = request.args
+
+    filters = {
+        'persona': args.get('persona'),
+        'platform': args.get('platform'),
+        'status': args.get('status'),
+        'since': args.get('since'),
+        'until': args.get('until')
+    }
+
+    order = args.get('order', 'desc')
+    if order not in ['asc', 'desc']:
+        return jsonify({'error': 'Order must be asc or desc'}), 400
+
+    after = None
+    if args.get('after'):
+        try:
+            after = decode_cursor(args['after'])
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    if args.get('format') == 'ndjson':
+        def generate():
+            for record in index.iter_records(filters, order, after):
+                yield json.dumps(record) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    items, next_cursor = index.page(filters, order, after, limit)
+    return jsonify({
+        'items': items,
+        'next_cursor': next_cursor,
+        'limit': limit
+    })
@@ -0,0 +1,45 @@
+from flask import Blueprint, Response, request, jsonify
+import hmac
+import logging
+from functools import wraps
+from config import Config
+from .auth import require_auth
+from services.metrics import collect_metrics, render_metrics
+from services.job_stats import get_job_stats
+
+metrics_bp = Blueprint('metrics', __name__)
+logger = logging.getLogger(__name__)
+
+def require_metrics_auth(f):
+    """Accept Config.METRICS_TOKEN as a bearer token, otherwise require an admin JWT
+
+    Prometheus cannot log in for a JWT, so scrapers send the static token.
+    """
+    authenticated = require_auth(f)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if Config.METRICS_TOKEN and hmac.compare_digest(auth_header, f"Bearer {Config.METRICS_TOKEN}"):
+            return f(*args, **kwargs)
+        return authenticated(*args, **kwargs)
+
+    return decorated_function
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@require_metrics_auth
+def export_metrics():
+    """Request, AI services, job and queue metrics in Prometheus text format"""
+    try:
+        # Counters, histograms and queue depths summed over every server process
+        merged = collect_metrics()
+
+        # Job counts come from the shared job store, so they are the same in every process
+        for status, count in get_job_stats().snapshot()['by_status'].items():
+            merged[('gauge', 'jobs', (('status', status),))] = count
+
+        return Response(render_metrics(merged), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    except Exception as e:
+        logger.error(f"Export metrics error: {str(e)}")
+        return jsonify({'error': 'Failed to export metrics'}), 500
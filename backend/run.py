@@ -2,35 +2,34 @@
 """
 BuzzSnip Backend Server
 Run script for the Flask API server
+
+    python run.py                 development server (single process)
+    python run.py serve [...]     production server (pre-forked gunicorn workers)
 """
 
 import os
 import sys
+import argparse
 import logging
-from app import app
 from config import Config
+from services.log_pipeline import setup_logging, LOG_FORMAT
 
-def setup_logging():
-    """Setup logging configuration"""
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format=log_format,
-        handlers=[
-            logging.FileHandler('logs/backend.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+def start_process_services(on_claim=None):
+    """Follow other processes' job saves and run the background services if no other process does"""
+    from services.job_feed import start_job_feed
+    from services.process_roles import get_background_role
+    
+    start_job_feed()
+    role = get_background_role()
+    if on_claim:
+        role.add_claim_listener(on_claim)
+    role.elect()
 
 def main():
     """Main function to run the Flask app"""
     setup_logging()
     logger = logging.getLogger(__name__)
+    from app import app
     
     # Initialize configuration
     Config.init_app(app)
@@ -41,6 +40,9 @@ def main():
     logger.info(f"Host: {Config.HOST}")
     logger.info(f"Port: {Config.PORT}")
     
+    # Start the schedule runner, the AI services worker pool and the upload workers
+    start_process_services()
+    
     try:
         # Run the Flask app
         app.run(
@@ -55,5 +57,87 @@ def main():
         logger.error(f"Server error: {str(e)}")
         sys.exit(1)
 
+def post_worker_init(worker):
+    """gunicorn hook: per-worker services once the app is loaded"""
+    from services.metrics import start_metrics_publisher
+    
+    def exempt_from_recycling():
+        # Recycling the owner would interrupt running jobs and uploads
+        worker.recycle_at = sys.maxsize
+    
+    start_process_services(on_claim=exempt_from_recycling)
+    start_metrics_publisher()
+
+def serve(args):
+    """Run the app under gunicorn
+
+    The app is imported in each worker, not in this master process, so a
+    SIGHUP reloads the code: new workers start, old ones finish their
+    requests and exit. Workers are recycled after --max-requests (with
+    jitter) and exactly one of them runs the background services.
+    """
+    from gunicorn.app.base import BaseApplication
+    from services.metrics import clear_published_metrics
+
+    class BuzzSnipServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+    
+    # Workers set up their own queued logging when they import the app;
+    # the master only logs to stdout so it has no buffered records to fork
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, stream=sys.stdout)
+    for directory in [Config.DATA_DIR, Config.UPLOADS_DIR, Config.GENERATED_DIR, Config.LOGS_DIR]:
+        os.makedirs(directory, exist_ok=True)
+    
+    # /api/metrics totals start from zero with every server run
+    clear_published_metrics()
+    
+    logging.getLogger(__name__).info(
+        f"Starting BuzzSnip Backend Server on {args.bind} with {args.workers} workers x {args.threads} threads"
+    )
+    BuzzSnipServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        # Threaded workers, so long-lived SSE streams do not block a whole process
+        'worker_class': 'gunicorn_worker.DrainingThreadWorker',
+        'threads': args.threads,
+        'max_requests': args.max_requests,
+        'max_requests_jitter': args.max_requests // 10,
+        'timeout': args.timeout,
+        'graceful_timeout': args.timeout,
+        'pidfile': args.pidfile,
+        'post_worker_init': post_worker_init
+    }).run()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='BuzzSnip Backend Server')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    serve_parser = subparsers.add_parser('serve', help='production server with pre-forked workers')
+    serve_parser.add_argument('--workers', type=int, default=Config.WORKERS)
+    serve_parser.add_argument('--threads', type=int, default=Config.WORKER_THREADS,
+                              help='concurrent requests per worker')
+    serve_parser.add_argument('--max-requests', type=int, default=Config.WORKER_MAX_REQUESTS,
+                              help='recycle a worker after this many requests, 0 = never')
+    serve_parser.add_argument('--timeout', type=int, default=Config.WORKER_TIMEOUT,
+                              help='seconds before a silent worker is restarted')
+    serve_parser.add_argument('--bind', default=f"{Config.HOST}:{Config.PORT}")
+    serve_parser.add_argument('--pidfile', default=os.path.join(Config.DATA_DIR, 'server.pid'),
+                              help='send SIGHUP to this pid for a graceful reload')
+    return parser.parse_args(argv)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.command == 'serve':
+        serve(args)
+    else:
+        main()
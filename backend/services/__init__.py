@@ -0,0 +1 @@
+# Services package for BuzzSnip backend
\ No newline at end of file
@@ -0,0 +1,230 @@
+import time
+import random
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from config import Config
+from services.metrics import LatencyHistogram, get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Read timeouts (seconds) per endpoint, capped at Config.AI_SERVICES_TIMEOUT
+ENDPOINT_TIMEOUTS = {
+    '/generate/automated': Config.AI_SERVICES_TIMEOUT,
+    '/generate/audio': 120,
+    '/generate/face': 180,
+    '/generate/video': 600
+}
+
+CONNECT_TIMEOUT = 5
+RETRY_STATUS_CODES = [502, 503, 504]
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]
+
+def was_never_sent(error):
+    """Check whether a requests error happened before the request reached the server"""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+class AIServiceError(Exception):
+    """Raised when AI services reject a request or cannot be reached"""
+
+class AIServiceRequestError(AIServiceError):
+    """Raised when AI services reject the request itself (4xx), so sending it again cannot help"""
+
+class CircuitOpenError(AIServiceError):
+    """Raised without calling AI services while the circuit breaker is open"""
+
+class CircuitBreaker:
+    """Fails fast after consecutive AI services failures
+
+    Opens after failure_threshold consecutive failures. Once reset_timeout
+    has passed, a single trial call is let through (half-open): success
+    closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        """Check whether a call may go through, claiming the half-open trial slot"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("AI services circuit opened")
+                self._opened_at = time.monotonic()
+
+class AIServicesClient:
+    """Shared keep-alive client for AI services calls
+
+    Uses one pooled Session, per-endpoint timeouts, jittered exponential
+    retries and a circuit breaker. Idempotent calls are retried on
+    connection errors, timeouts and 502/503/504. Non-idempotent calls are
+    retried only when the connection could not be opened, because then the
+    request was never sent.
+    """
+
+    def __init__(self, base_url, pool_size, max_retries, backoff, breaker):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._histograms = {}
+        self._outcomes = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, endpoint, seconds, outcome):
+        with self._stats_lock:
+            histogram = self._histograms.get(endpoint)
+            if histogram is None:
+                histogram = self._histograms[endpoint] = LatencyHistogram(LATENCY_BUCKETS)
+            key = (endpoint, outcome)
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+        histogram.observe(seconds)
+
+    def _sleep_before_retry(self, attempt):
+        delay = self.backoff * (2 ** attempt)
+        time.sleep(random.uniform(0, delay))
+
+    def request(self, method, endpoint, idempotent=None, **kwargs):
+        """Send a request to AI services and return the response, raises AIServiceError"""
+        if idempotent is None:
+            idempotent = method.upper() in ['GET', 'HEAD', 'PUT', 'DELETE']
+
+        read_timeout = min(ENDPOINT_TIMEOUTS.get(endpoint, Config.AI_SERVICES_TIMEOUT), Config.AI_SERVICES_TIMEOUT)
+        kwargs.setdefault('timeout', (CONNECT_TIMEOUT, read_timeout))
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._record(endpoint, 0, 'circuit_open')
+                raise CircuitOpenError('AI services unavailable')
+
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, f"{self.base_url}{endpoint}", **kwargs)
+            except requests.RequestException as e:
+                self._record(endpoint, time.monotonic() - started, 'error')
+                self.breaker.record_failure()
+
+                if attempt < self.max_retries and (idempotent or was_never_sent(e)):
+                    logger.warning(f"AI services {endpoint} attempt {attempt + 1} failed: {str(e)}")
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+
+                logger.error(f"AI services connection error: {str(e)}")
+                raise AIServiceError('AI services unavailable')
+
+            elapsed = time.monotonic() - started
+            if response.status_code >= 500:
+                self._record(endpoint, elapsed, 'server_error')
+                self.breaker.record_failure()
+                if idempotent and response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    self._sleep_before_retry(attempt)
+                    attempt += 1
+                    continue
+            else:
+                self._record(endpoint, elapsed, 'success' if response.status_code < 400 else 'client_error')
+                self.breaker.record_success()
+
+            return response
+
+    def post(self, endpoint, idempotent=False, **kwargs):
+        return self.request('POST', endpoint, idempotent=idempotent, **kwargs)
+
+    def get(self, endpoint, **kwargs):
+        return self.request('GET', endpoint, **kwargs)
+
+    def stats(self):
+        """Get circuit state, outcome counts and latency histograms per endpoint"""
+        with self._stats_lock:
+            histograms = dict(self._histograms)
+            outcomes = dict(self._outcomes)
+
+        endpoints = {}
+        for endpoint, histogram in histograms.items():
+            endpoints[endpoint] = {
+                'latency': histogram.snapshot(),
+                'outcomes': {o: n for (e, o), n in outcomes.items() if e == endpoint}
+            }
+        return {'circuit': self.breaker.state, 'endpoints': endpoints}
+
+    def metric_series(self):
+        """Outcome counts and latency histograms per endpoint for /api/metrics"""
+        with self._stats_lock:
+            histograms = dict(self._histograms)
+            outcomes = dict(self._outcomes)
+
+        series = [
+            ('counter', 'ai_service_calls_total', (('endpoint', endpoint), ('outcome', outcome)), count)
+            for (endpoint, outcome), count in outcomes.items()
+        ]
+        series += [
+            ('histogram', 'ai_service_call_duration_seconds', (('endpoint', endpoint),), histogram.snapshot())
+            for endpoint, histogram in histograms.items()
+        ]
+        return series
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_ai_client():
+    """Get the shared AI services client"""
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AIServicesClient(
+                    Config.AI_SERVICES_URL,
+                    pool_size=Config.AI_SERVICES_POOL_SIZE,
+                    max_retries=Config.AI_SERVICES_MAX_RETRIES,
+                    backoff=Config.AI_SERVICES_RETRY_BACKOFF,
+                    breaker=CircuitBreaker(
+                        Config.AI_SERVICES_BREAKER_THRESHOLD,
+                        Config.AI_SERVICES_BREAKER_RESET
+                    )
+                )
+                get_metrics().add_collector(_client.metric_series)
+    return _client
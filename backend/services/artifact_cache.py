@@ -0,0 +1,209 @@
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from config import Config
+from services.json_store import write_json_atomic
+from services.settings_store import load_settings, get_default_settings, get_setting
+from services.job_queue import get_job_queue
+
+logger = logging.getLogger(__name__)
+
+# Job types whose output depends only on the request and the model config
+CACHEABLE_TYPES = ['audio', 'face', 'video']
+
+def cache_key(job_type, request_data, models):
+    """Canonical SHA-256 of the job type, request payload and model config"""
+    canonical = json.dumps(
+        {'type': job_type, 'request': request_data, 'models': models},
+        sort_keys=True,
+        separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ArtifactCache:
+    """Content-addressed cache of generated voice, face and video results
+
+    Each entry is a small metadata file under <GENERATED_DIR>/cache holding
+    the AI services result. Artifact files are the result's *_path values.
+    Entries are kept in LRU order, and the least recently used ones are
+    evicted, along with their files under GENERATED_DIR, once the total
+    size goes over storage.max_storage_gb. A lookup that misses in memory
+    checks for the metadata file, which picks up results cached by another
+    server process.
+    """
+
+    def __init__(self, generated_dir):
+        self.generated_dir = os.path.realpath(generated_dir)
+        self.cache_dir = os.path.join(generated_dir, 'cache')
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_size = 0
+        self._load()
+
+    def _meta_file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.json'):
+                try:
+                    with open(os.path.join(self.cache_dir, filename), 'r') as f:
+                        entries.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Load cache entry {filename} error: {str(e)}")
+
+        for entry in sorted(entries, key=lambda x: x.get('last_used', '')):
+            self._entries[entry['key']] = entry
+            self._total_size += entry.get('size', 0)
+
+    def _read_meta(self, key):
+        try:
+            with open(self._meta_file(key), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Load cache entry {key} error: {str(e)}")
+            return None
+
+    def _write_meta(self, entry):
+        write_json_atomic(self._meta_file(entry['key']), entry)
+
+    def _artifact_paths(self, result):
+        return [v for k, v in result.items() if k.endswith('_path') and isinstance(v, str)]
+
+    def _artifact_size(self, result):
+        size = 0
+        for path in self._artifact_paths(result):
+            if os.path.isfile(path):
+                size += os.path.getsize(path)
+        if not size and isinstance(result.get('file_size'), (int, float)):
+            size = int(result['file_size'])
+        return size
+
+    def _is_owned(self, path):
+        """Only files under GENERATED_DIR may be deleted on eviction"""
+        real = os.path.realpath(path)
+        return os.path.commonpath([real, self.generated_dir]) == self.generated_dir
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+
+        self._total_size -= entry.get('size', 0)
+        for path in self._artifact_paths(entry['result']):
+            if self._is_owned(path) and os.path.isfile(path):
+                os.remove(path)
+        try:
+            os.remove(self._meta_file(key))
+        except FileNotFoundError:
+            pass
+
+    def lookup(self, job_type, request_data, models):
+        """Get the cached result for a request, or None"""
+        if job_type not in CACHEABLE_TYPES:
+            return None
+
+        key = cache_key(job_type, request_data, models)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                entry = self._read_meta(key)
+                if not entry:
+                    return None
+                self._entries[key] = entry
+                self._total_size += entry.get('size', 0)
+
+            # An artifact deleted behind our back makes the entry useless
+            if any(not os.path.isfile(p) for p in self._artifact_paths(entry['result'])):
+                self._remove(key)
+                return None
+
+            entry['hits'] = entry.get('hits', 0) + 1
+            entry['last_used'] = datetime.utcnow().isoformat()
+            self._entries.move_to_end(key)
+            self._write_meta(entry)
+            return dict(entry['result'])
+
+    def store(self, job_type, request_data, models, result, max_bytes):
+        """Cache a result and evict least recently used entries beyond max_bytes"""
+        if job_type not in CACHEABLE_TYPES:
+            return
+
+        key = cache_key(job_type, request_data, models)
+        now = datetime.utcnow().isoformat()
+        entry = {
+            'key': key,
+            'type': job_type,
+            'result': result,
+            'size': self._artifact_size(result),
+            'hits': 0,
+            'created_at': now,
+            'last_used': now
+        }
+
+        with self._lock:
+            if key in self._entries:
+                self._total_size -= self._entries.pop(key).get('size', 0)
+            self._entries[key] = entry
+            self._total_size += entry['size']
+            self._write_meta(entry)
+
+            while self._total_size > max_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                logger.info(f"Evicting cached {self._entries[oldest]['type']} artifact {oldest}")
+                self._remove(oldest)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'size_bytes': self._total_size}
+
+def current_models():
+    """Model configuration that cached artifacts depend on"""
+    return load_settings().get('ai_models') or get_default_settings()['ai_models']
+
+def max_cache_bytes():
+    return int(float(get_setting('storage', 'max_storage_gb', 100)) * 1024 ** 3)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_artifact_cache():
+    """Get the shared artifact cache"""
+    global _cache
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ArtifactCache(Config.GENERATED_DIR)
+    return _cache
+
+def start_artifact_cache():
+    """Fill the cache from jobs completed by this process's job queue (background services process only)
+
+    Registered before the job queue starts, so jobs recovered on start are
+    cached too.
+    """
+    cache = get_artifact_cache()
+    get_job_queue().add_completion_listener(cache_completed_job)
+    return cache
+
+def cache_completed_job(job_data):
+    """Job queue completion hook storing successful generation results"""
+    if job_data.get('status') == 'completed' and job_data.get('type') in CACHEABLE_TYPES:
+        get_artifact_cache().store(
+            job_data['type'],
+            job_data['request'],
+            job_data.get('models') or current_models(),
+            job_data.get('result') or {},
+            max_cache_bytes()
+        )
@@ -0,0 +1,124 @@
+import os
+import time
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+import jwt
+from config import Config
+from services.json_store import get_document
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM = 'HS256'
+REVOKED_TOKENS_FILE = os.path.join(Config.DATA_DIR, 'revoked_tokens.json')
+
+class TokenVerifier:
+    """JWT issue/verify with a verified-token cache and a revocation denylist
+
+    The signing key is resolved once. Verified tokens are kept in a bounded
+    LRU (token hash -> payload) until their exp, so repeated requests with
+    the same token skip the HMAC and claim checks. Revoked tokens are held
+    in a denylist until they would have expired anyway. With a denylist
+    document the denylist is shared through that file; each verify stats it
+    and reloads it when another process has revoked a token.
+    """
+
+    def __init__(self, key, cache_size, denylist_document=None):
+        self.key = key
+        self.cache_size = cache_size
+        self.denylist_document = denylist_document
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()  # token hash -> (payload, exp)
+        self._denylist = {}  # token hash -> exp
+        self._denylist_version = None
+
+    def _token_hash(self, token):
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _refresh_denylist(self):
+        """Reload the shared denylist if another process changed it"""
+        if self.denylist_document is None or self.denylist_document.version() == self._denylist_version:
+            return
+        denylist, version = self.denylist_document.read()
+        with self._lock:
+            self._denylist.update(denylist)
+            self._denylist_version = version
+            for token_hash in denylist:
+                self._cache.pop(token_hash, None)
+
+    def issue(self, payload):
+        return jwt.encode(payload, self.key, algorithm=ALGORITHM)
+
+    def verify(self, token):
+        """Get the token's payload, raises jwt.ExpiredSignatureError / jwt.InvalidTokenError"""
+        token_hash = self._token_hash(token)
+        now = time.time()
+        self._refresh_denylist()
+
+        with self._lock:
+            if token_hash in self._denylist:
+                raise jwt.InvalidTokenError('Token revoked')
+
+            cached = self._cache.get(token_hash)
+            if cached:
+                payload, exp = cached
+                if exp is None or now < exp:
+                    self._cache.move_to_end(token_hash)
+                    return payload
+                del self._cache[token_hash]
+                raise jwt.ExpiredSignatureError('Signature has expired')
+
+        payload = jwt.decode(token, self.key, algorithms=[ALGORITHM])
+
+        with self._lock:
+            self._cache[token_hash] = (payload, payload.get('exp'))
+            self._cache.move_to_end(token_hash)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
+
+    def revoke(self, token):
+        """Deny a token until its expiry, returns False if it was not valid"""
+        try:
+            payload = self.verify(token)
+        except jwt.InvalidTokenError:
+            return False
+
+        token_hash = self._token_hash(token)
+        now = time.time()
+
+        def deny(denylist):
+            # Drop entries for tokens that have expired on their own
+            for expired in [h for h, exp in denylist.items() if exp is not None and exp <= now]:
+                del denylist[expired]
+            denylist[token_hash] = payload.get('exp')
+
+        with self._lock:
+            deny(self._denylist)
+            self._cache.pop(token_hash, None)
+
+        if self.denylist_document is not None:
+            self.denylist_document.update(deny)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {'cached_tokens': len(self._cache), 'revoked_tokens': len(self._denylist)}
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_token_verifier():
+    """Get the shared verifier, resolving the signing key on first use"""
+    global _verifier
+
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = TokenVerifier(
+                    os.getenv('SECRET_KEY', 'buzzsnip-dev-key'),
+                    Config.AUTH_CACHE_SIZE,
+                    get_document(REVOKED_TOKENS_FILE, dict)
+                )
+    return _verifier
@@ -0,0 +1,212 @@
+import uuid
+import logging
+from datetime import datetime
+from config import Config
+from services.pipeline import Stage, Pipeline, call_ai_services
+from services.model_residency import get_model_residency, job_models
+from services.persona_registry import get_persona_registry
+from services.settings_store import load_settings, get_default_settings
+
+logger = logging.getLogger(__name__)
+
+# AI services endpoint for each job type
+AI_ENDPOINTS = {
+    'automated': '/generate/automated',
+    'audio': '/generate/audio',
+    'face': '/generate/face',
+    'video': '/generate/video'
+}
+
+# Job types the worker pool runs: one AI services call, or a stage pipeline
+JOB_TYPES = list(AI_ENDPOINTS) + ['pipeline']
+
+def build_job(job_type, data, source='manual', **fields):
+    """Build a queued job record carrying the AI services request payload"""
+    job_data = {
+        'job_id': str(uuid.uuid4()),
+        'type': job_type,
+        'source': source,
+        'status': 'queued',
+        'persona_id': data.get('persona_id'),
+        'request': data,
+        'created_at': datetime.utcnow().isoformat(),
+        'progress': 0
+    }
+    job_data.update(fields)
+    return job_data
+
+def build_automated_job(data, source='manual', schedule_id=None):
+    """Build the job record for an automated generation request"""
+    return build_job(
+        'automated',
+        data,
+        source=source,
+        schedule_id=schedule_id,
+        theme=data['theme'],
+        duration=data['duration'],
+        platforms=data.get('platforms', ['youtube']),
+        auto_upload=data.get('auto_upload', True),
+        schedule_time=data.get('schedule_time')
+    )
+
+def artifact_input(output, name):
+    """Pass a stage's artifact on by local path when AI services returned one, else by URL"""
+    if output.get(f"{name}_path"):
+        return {f"{name}_path": output[f"{name}_path"]}
+    return {f"{name}_url": output[f"{name}_url"]}
+
+def voice_model(context):
+    return context['persona'].get('voice_type') or context['models'].get('voice_model')
+
+# Automated generation as a stage DAG: script and face start together, the
+# voice waits for the script, lip sync for voice and face, and the thumbnail
+# is rendered while the lip-synced video is upscaled.
+AUTOMATED_PIPELINE = Pipeline([
+    Stage(
+        'script', '/generate/script',
+        payload=lambda context, outputs: {
+            'persona_id': context['request']['persona_id'],
+            'theme': context['request']['theme'],
+            'duration': context['request']['duration'],
+            'language': context['persona'].get('language')
+        },
+        models=lambda context: [context['models'].get('llm_model')]
+    ),
+    Stage(
+        'face', '/generate/face',
+        payload=lambda context, outputs: {
+            'persona_id': context['request']['persona_id'],
+            'prompt': context['persona'].get('prompt')
+        },
+        models=lambda context: [context['models'].get('stable_diffusion_model')]
+    ),
+    Stage(
+        'voice', '/generate/audio', needs=['script'],
+        payload=lambda context, outputs: {
+            'persona_id': context['request']['persona_id'],
+            'script': outputs['script']['script'],
+            'voice_type': voice_model(context)
+        },
+        models=lambda context: [voice_model(context)]
+    ),
+    Stage(
+        'lip_sync', '/generate/video', needs=['voice', 'face'],
+        payload=lambda context, outputs: {
+            'persona_id': context['request']['persona_id'],
+            **artifact_input(outputs['voice'], 'audio'),
+            **artifact_input(outputs['face'], 'face')
+        },
+        models=lambda context: [context['models'].get('lip_sync_model')]
+    ),
+    Stage(
+        'upscale', '/generate/upscale', needs=['lip_sync'],
+        payload=lambda context, outputs: {
+            **artifact_input(outputs['lip_sync'], 'video'),
+            'resolution': context['request'].get('resolution', '1080p')
+        },
+        models=lambda context: [context['models'].get('upscaling_model')]
+    ),
+    Stage(
+        'thumbnail', '/generate/thumbnail', needs=['lip_sync', 'face'],
+        payload=lambda context, outputs: {
+            **artifact_input(outputs['lip_sync'], 'video'),
+            **artifact_input(outputs['face'], 'face'),
+            'title': context['request']['theme'],
+            'style': context['request'].get('thumbnail_style', 'modern')
+        }
+    ),
+    Stage(
+        'compose', '/generate/compose', needs=['upscale', 'voice', 'script'],
+        payload=lambda context, outputs: {
+            'persona_id': context['request']['persona_id'],
+            **artifact_input(outputs['upscale'], 'video'),
+            **artifact_input(outputs['voice'], 'audio'),
+            'script': outputs['script']['script'],
+            'platforms': context['request'].get('platforms', ['youtube'])
+        }
+    )
+])
+
+def run_automated_pipeline(job_data, on_change=None):
+    """Run an automated job's stages and return its combined result"""
+    context = {
+        'request': job_data['request'],
+        'persona': get_persona_registry().get(job_data.get('persona_id')) or {},
+        'models': job_data.get('models') or load_settings().get('ai_models') or get_default_settings()['ai_models']
+    }
+    outputs = AUTOMATED_PIPELINE.run(job_data, context, on_change)
+
+    return {
+        'video_url': outputs['compose']['video_url'],
+        'audio_url': outputs['voice']['audio_url'],
+        'face_url': outputs['face']['face_url'],
+        'thumbnail_url': outputs['thumbnail'].get('thumbnail_url'),
+        'script': outputs['script']['script'],
+        'generated_at': datetime.utcnow().isoformat()
+    }
+
+def stage_models(job_type):
+    return lambda context: job_models({
+        'type': job_type,
+        'request': context['request'].get(job_type) or {},
+        'models': context['models']
+    })
+
+# The manual audio -> face -> video flow as one job: audio and face run
+# together and the video stage gets both files by path.
+MANUAL_PIPELINE = Pipeline([
+    Stage(
+        'audio', '/generate/audio',
+        payload=lambda context, outputs: dict(context['request']['audio'], persona_id=context['request']['persona_id']),
+        models=stage_models('audio')
+    ),
+    Stage(
+        'face', '/generate/face',
+        payload=lambda context, outputs: dict(context['request'].get('face') or {}, persona_id=context['request']['persona_id']),
+        models=stage_models('face')
+    ),
+    Stage(
+        'video', '/generate/video', needs=['audio', 'face'],
+        payload=lambda context, outputs: dict(
+            context['request'].get('video') or {},
+            persona_id=context['request']['persona_id'],
+            **artifact_input(outputs['audio'], 'audio'),
+            **artifact_input(outputs['face'], 'face')
+        ),
+        models=stage_models('video')
+    )
+])
+
+def run_manual_pipeline(job_data, on_change=None):
+    """Run a pipeline job's audio, face and video stages and return their merged results"""
+    context = {
+        'request': job_data['request'],
+        'models': job_data.get('models') or load_settings().get('ai_models') or get_default_settings()['ai_models']
+    }
+    outputs = MANUAL_PIPELINE.run(job_data, context, on_change)
+
+    result = {}
+    for stage in MANUAL_PIPELINE.stages:
+        result.update(outputs[stage.name])
+    return result
+
+def run_job(job_data, on_change=None):
+    """Run a job through AI services and return its result, raises AIServiceError
+
+    Pipeline jobs, and automated jobs when Config.AUTOMATED_PIPELINE is
+    'stages', run as a stage DAG, recording each stage in
+    job_data['stages'] and calling on_change() when it changes. Other jobs
+    are one call holding their models.
+    """
+    if job_data['type'] == 'pipeline':
+        return run_manual_pipeline(job_data, on_change)
+
+    endpoint = AI_ENDPOINTS[job_data['type']]
+    if job_data['type'] == 'automated':
+        if Config.AUTOMATED_PIPELINE == 'stages':
+            return run_automated_pipeline(job_data, on_change)
+        # AI services loads the models for the stages of a single call itself
+        return call_ai_services(endpoint, job_data['request'], job_data['job_id'])
+
+    with get_model_residency().using(job_models(job_data)):
+        return call_ai_services(endpoint, job_data['request'], job_data['job_id'])
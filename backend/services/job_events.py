@@ -0,0 +1,83 @@
+import queue
+import threading
+import logging
+from services import job_store
+
+logger = logging.getLogger(__name__)
+
+# Fields pushed to watchers on every job transition
+EVENT_FIELDS = ['job_id', 'type', 'status', 'progress', 'updated_at', 'error', 'result']
+
+class Subscription:
+    """One watcher's bounded event queue, optionally limited to some job IDs"""
+
+    def __init__(self, job_ids, max_pending):
+        self.job_ids = set(job_ids) if job_ids else None
+        self._events = queue.Queue(maxsize=max_pending)
+
+    def wants(self, job_id):
+        return self.job_ids is None or job_id in self.job_ids
+
+    def offer(self, event):
+        try:
+            self._events.put_nowait(event)
+        except queue.Full:
+            # A stalled watcher drops events rather than blocking save_job
+            logger.warning("Dropping job event for slow subscriber")
+
+    def get(self, timeout):
+        """Wait for the next event, returns None on timeout"""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class JobEventBus:
+    """In-process pub/sub of job transitions fed by save_job
+
+    Watchers read from memory, so N open streams do not turn into N disk
+    reads per second.
+    """
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def subscribe(self, job_ids=None):
+        subscription = Subscription(job_ids, self.max_pending)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, job_data):
+        event = job_event(job_data)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+
+        for subscription in subscriptions:
+            if subscription.wants(event['job_id']):
+                subscription.offer(event)
+
+def job_event(job_data):
+    """Reduce a job record to the fields sent to watchers"""
+    return {field: job_data.get(field) for field in EVENT_FIELDS if field in job_data}
+
+_bus = None
+_bus_lock = threading.Lock()
+
+def get_job_event_bus():
+    """Get the shared event bus, registering it with the job store on first use"""
+    global _bus
+
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                bus = JobEventBus()
+                job_store.add_save_listener(bus.publish)
+                _bus = bus
+    return _bus
@@ -0,0 +1,71 @@
+import threading
+import logging
+from config import Config
+from services import job_store
+
+logger = logging.getLogger(__name__)
+
+class JobChangeFeed(threading.Thread):
+    """Replays job saves made by other server processes to the local save listeners
+
+    Polls the job store for the saves after the last change position seen
+    and hands every version not saved by this process, and not already
+    replayed, to job_store's save listeners. That keeps job events, job
+    stats and, in the background process, the job queue in step with jobs
+    created or updated by other workers.
+    """
+
+    def __init__(self, interval):
+        super().__init__(name='job-change-feed', daemon=True)
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._seen = {}  # job id -> version handled in the last batch
+        self._marker = None
+        self._position = job_store.get_job_store().change_position()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def poll(self):
+        """Replay new saves once, returns how many were replayed"""
+        store = job_store.get_job_store()
+        marker = store.change_marker()
+        if marker is not None and marker == self._marker:
+            return 0
+        self._marker = marker
+
+        jobs, self._position = store.changes_since(self._position)
+        seen = {}
+        replayed = 0
+        for job_data in jobs:
+            version = job_store.job_version(job_data)
+            seen[job_data['job_id']] = version
+            if self._seen.get(job_data['job_id']) == version or job_store.is_local_save(job_data):
+                continue
+
+            job_store.notify_save_listeners(job_data)
+            replayed += 1
+
+        # A backend re-reading a window returns these again next time
+        self._seen = seen
+        return replayed
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Job change feed error: {str(e)}")
+
+_feed = None
+_feed_lock = threading.Lock()
+
+def start_job_feed():
+    """Start following other processes' job saves (multi-process serving only)"""
+    global _feed
+
+    with _feed_lock:
+        if _feed is None:
+            _feed = JobChangeFeed(Config.PROCESS_SYNC_INTERVAL)
+            _feed.start()
+    return _feed
@@ -0,0 +1,257 @@
+import time
+import itertools
+import threading
+import logging
+from datetime import datetime, timedelta
+from config import Config
+from services import job_store
+from services.metrics import get_metrics
+from services.ai_client import AIServiceError, AIServiceRequestError
+from services.generation import run_job, JOB_TYPES
+from services.model_residency import get_model_residency, job_models, models_label, ModelRuntimeError
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+LANES = {
+    'manual': 0,
+    'scheduled': 1
+}
+
+TERMINAL_STATUSES = ['completed', 'failed']
+
+def is_retryable(error):
+    """AI services and model loading failures may pass; bad requests and budget errors will not"""
+    cause = getattr(error, 'cause', error)
+    if isinstance(cause, AIServiceRequestError):
+        return False
+    return isinstance(cause, (AIServiceError, ModelRuntimeError))
+
+def retry_delay(job_data):
+    """Seconds until a job's retry_at, 0 when it has none or it has passed"""
+    if not job_data.get('retry_at'):
+        return 0
+    return max(0.0, (datetime.fromisoformat(job_data['retry_at']) - datetime.utcnow()).total_seconds())
+
+class JobQueue:
+    """Worker pool that owns every AI services call
+
+    Jobs are persisted in the job store as 'queued' before they are put on
+    the in-memory queue, so anything still queued (or interrupted while
+    processing) is recovered on start. Once started, every save of a
+    queued job queues it, including saves replayed from other server
+    processes by the job change feed. Manual work is served ahead of
+    scheduled work.
+
+    Within a lane, jobs run in arrival order, except that a job whose
+    models are already resident may go ahead of an older job that would
+    need a model load. A job is passed over like this for at most
+    batch_window seconds, and every such dispatch is counted in
+    job_model_swaps_avoided_total.
+
+    A job failing on AI services or a model load is queued again up to
+    max_retries times, after retry_delay seconds doubled per retry (kept
+    in its retry_at, so it survives a restart). Jobs run as stages
+    (pipeline jobs, automated jobs with AUTOMATED_PIPELINE = 'stages')
+    resume from their stage checkpoints; single-call jobs run again whole.
+    """
+
+    def __init__(self, workers, batch_window, max_retries=0, retry_delay=0):
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._waiting = {}  # job id -> (lane, seq, queued monotonic time, models, not before monotonic time)
+        self._pending = set()  # job ids waiting or processing
+        self._threads = []
+        self._completion_listeners = []
+
+    def add_completion_listener(self, callback):
+        """Register a callback(job_data) invoked once a job completes or fails"""
+        self._completion_listeners.append(callback)
+
+    def put(self, job_data):
+        """Queue an already-saved job on its lane"""
+        job_id = job_data['job_id']
+        lane = LANES.get(job_data.get('source'), LANES['manual'])
+        models = frozenset(job_models(job_data))
+        now = time.monotonic()
+
+        with self._cond:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+            self._waiting[job_id] = (lane, next(self._counter), now, models, now + retry_delay(job_data))
+            self._cond.notify()
+
+    def depth(self):
+        with self._cond:
+            return len(self._waiting)
+
+    def depth_by_models(self):
+        """Waiting jobs grouped by the models they need"""
+        with self._cond:
+            groups = {}
+            for _, _, _, models, _ in self._waiting.values():
+                groups[models_label(models)] = groups.get(models_label(models), 0) + 1
+            return groups
+
+    def metric_series(self):
+        return [('gauge', 'job_queue_depth', (), self.depth())] + [
+            ('gauge', 'job_queue_model_depth', (('models', label),), count)
+            for label, count in self.depth_by_models().items()
+        ]
+
+    def start(self):
+        """Recover persisted jobs and start the workers"""
+        if self._threads:
+            return
+
+        job_store.add_save_listener(self._on_job_saved)
+        for job_data in job_store.list_jobs(['queued', 'processing']):
+            if job_data.get('type') in JOB_TYPES:
+                self.put(job_data)
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Job queue started with {self.workers} workers, {self.depth()} jobs recovered")
+
+    def _on_job_saved(self, job_data):
+        if job_data.get('status') == 'queued' and job_data.get('type') in JOB_TYPES:
+            self.put(job_data)
+
+    def _take(self):
+        """Block for the next job: the oldest of the first lane, or a job on resident models"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                ready = [item for item in self._waiting.items() if item[1][4] <= now]
+                if ready:
+                    break
+                # Nothing queued, or only retries that are not due yet
+                self._cond.wait(min((entry[4] for entry in self._waiting.values()), default=now + 60) - now)
+
+            ordered = sorted(ready, key=lambda item: item[1][:2])
+            job_id, (lane, _, queued_at, models, _) = ordered[0]
+
+            if self.batch_window > 0 and time.monotonic() - queued_at < self.batch_window:
+                resident = get_model_residency().resident_models()
+                if not models <= resident:
+                    for candidate_id, (candidate_lane, _, _, candidate_models, _) in ordered[1:]:
+                        if candidate_lane != lane:
+                            break
+                        if candidate_models and candidate_models <= resident:
+                            logger.info(f"Running job {candidate_id} on resident {models_label(candidate_models)} "
+                                        f"ahead of {job_id} ({models_label(models)})")
+                            get_metrics().inc('job_model_swaps_avoided_total')
+                            job_id = candidate_id
+                            break
+
+            del self._waiting[job_id]
+            return job_id
+
+    def _work(self):
+        while True:
+            job_id = self._take()
+            retry = None
+            try:
+                retry = self._process(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error for {job_id}: {str(e)}")
+            finally:
+                with self._cond:
+                    self._pending.discard(job_id)
+            if retry:
+                self.put(retry)
+
+    def _update(self, job_data, **fields):
+        job_data.update(fields)
+        job_data['updated_at'] = datetime.utcnow().isoformat()
+        job_store.save_job(job_data)
+
+    def _process(self, job_id):
+        """Run one job, returns the job when it was queued for a retry"""
+        job_data = job_store.load_job(job_id)
+        if not job_data or job_data.get('status') in TERMINAL_STATUSES:
+            return None
+
+        job_data.pop('error', None)
+        job_data.pop('retry_at', None)
+        self._update(job_data, status='processing', progress=10, started_at=datetime.utcnow().isoformat())
+
+        try:
+            result = run_job(job_data, on_change=lambda: self._update(job_data))
+            self._update(job_data, status='completed', progress=100, result=result,
+                         completed_at=datetime.utcnow().isoformat())
+            logger.info(f"Job {job_id} ({job_data['type']}) completed")
+
+        except Exception as e:
+            retries = job_data.get('retries', 0)
+            if is_retryable(e) and retries < self.max_retries:
+                delay = self.retry_delay * 2 ** retries
+                retry_at = datetime.utcnow() + timedelta(seconds=delay)
+                self._update(job_data, status='queued', error=str(e), retries=retries + 1,
+                             retry_at=retry_at.isoformat())
+                logger.warning(f"Job {job_id} ({job_data['type']}) failed, retry {retries + 1} "
+                               f"of {self.max_retries} in {delay:g}s: {str(e)}")
+                return job_data
+
+            self._update(job_data, status='failed', error=str(e),
+                         completed_at=datetime.utcnow().isoformat())
+            logger.error(f"Job {job_id} ({job_data['type']}) failed: {str(e)}")
+
+        for callback in self._completion_listeners:
+            try:
+                callback(job_data)
+            except Exception as e:
+                logger.error(f"Job completion listener error: {str(e)}")
+        return None
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Get the shared job queue (workers not started)"""
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(Config.MAX_CONCURRENT_JOBS, Config.JOB_BATCH_WINDOW,
+                                  Config.JOB_MAX_RETRIES, Config.JOB_RETRY_DELAY)
+                get_metrics().add_collector(_queue.metric_series)
+    return _queue
+
+def start_job_queue():
+    """Recover persisted jobs and start the worker pool"""
+    job_queue = get_job_queue()
+    job_queue.start()
+    return job_queue
+
+def enqueue_job(job_data):
+    """Persist a new job; the worker pool picks it up from the save, in whichever process runs it"""
+    job_store.save_job(job_data)
+    return job_data['job_id']
+
+def resume_job(job_data):
+    """Queue a failed staged job again with fresh automatic retries
+
+    The job keeps its completed stages, so the pipeline restarts from the
+    first incomplete one. Returns the names of the stages that will run.
+    """
+    pending = [name for name, stage in job_data.get('stages', {}).items() if stage.get('status') != 'completed']
+    job_data.pop('retry_at', None)
+    job_data.update({
+        'status': 'queued',
+        'retries': 0,
+        'resumes': job_data.get('resumes', 0) + 1,
+        'resumed_at': datetime.utcnow().isoformat(),
+        'updated_at': datetime.utcnow().isoformat()
+    })
+    job_store.save_job(job_data)
+    return pending
@@ -0,0 +1,166 @@
+import time
+import threading
+import logging
+from collections import Counter, OrderedDict
+from config import Config
+from services import job_store
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class JobStats:
+    """In-memory job counts by status, persona and type
+
+    Built with a single pass over the job store, then kept current from
+    save_job notifications. A full re-scan happens once the counts are
+    older than max_age seconds, which also picks up writes made by other
+    processes. Saves recorded while a re-scan runs are replayed on top of
+    its result, and only one re-scan runs at a time: other callers get
+    the previous counts meanwhile.
+    """
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._during_rebuild = None  # job id -> key saved while a rebuild scans
+        self._jobs = {}
+        self._by_status = Counter()
+        self._by_persona = Counter()
+        self._by_type = Counter()
+        self._built_at = None
+
+    def _add(self, key, sign):
+        status, persona_id, job_type = key
+        self._by_status[status] += sign
+        if persona_id:
+            self._by_persona[persona_id] += sign
+        self._by_type[job_type] += sign
+
+    def _key(self, job_data):
+        return (job_data.get('status'), job_data.get('persona_id'), job_data.get('type'))
+
+    def rebuild(self):
+        """Recount every job in one pass over the store"""
+        with self._rebuild_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self._during_rebuild = {}
+
+        try:
+            jobs = {}
+            for job_id, status, persona_id, job_type in job_store.get_job_store().iter_job_keys():
+                jobs[job_id] = (status, persona_id, job_type)
+        except Exception:
+            with self._lock:
+                self._during_rebuild = None
+            raise
+
+        with self._lock:
+            # The scan may have read a job before a save that was recorded meanwhile
+            jobs.update(self._during_rebuild)
+            self._during_rebuild = None
+            self._jobs = jobs
+            self._by_status = Counter()
+            self._by_persona = Counter()
+            self._by_type = Counter()
+            for key in jobs.values():
+                self._add(key, 1)
+            self._built_at = time.monotonic()
+
+    def record(self, job_data):
+        """Apply a single job write to the counts"""
+        with self._lock:
+            key = self._key(job_data)
+            if self._during_rebuild is not None:
+                self._during_rebuild[job_data['job_id']] = key
+
+            if self._built_at is None:
+                return
+
+            previous = self._jobs.get(job_data['job_id'])
+            if previous == key:
+                return
+
+            if previous is not None:
+                self._add(previous, -1)
+            self._add(key, 1)
+            self._jobs[job_data['job_id']] = key
+
+    def is_stale(self):
+        return self._built_at is None or time.monotonic() - self._built_at > self.max_age
+
+    def snapshot(self):
+        """Get current counts, re-scanning the store if they are stale"""
+        if self.is_stale():
+            if self._rebuild_lock.acquire(blocking=False):
+                try:
+                    self._rebuild()
+                finally:
+                    self._rebuild_lock.release()
+            elif self._built_at is None:
+                # First build in progress elsewhere, nothing to serve yet
+                with self._rebuild_lock:
+                    pass
+
+        with self._lock:
+            return {
+                'by_status': {k: v for k, v in self._by_status.items() if v},
+                'by_persona': {k: v for k, v in self._by_persona.items() if v},
+                'by_type': {k: v for k, v in self._by_type.items() if v},
+                'total': len(self._jobs)
+            }
+
+class JobTransitions:
+    """Counts job saves that change a job's status into job_transitions_total{type, status}
+
+    Every save, including ones replayed from other processes, updates the
+    last status seen per job, but only this process's own saves are
+    counted, so the totals summed across server workers count each
+    transition once. Progress saves that keep the status are not counted.
+    """
+
+    def __init__(self, metrics, max_tracked):
+        self.metrics = metrics
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._statuses = OrderedDict()  # job id -> last status seen
+
+    def record(self, job_data):
+        status = job_data.get('status')
+        with self._lock:
+            previous = self._statuses.pop(job_data['job_id'], None)
+            self._statuses[job_data['job_id']] = status
+            while len(self._statuses) > self.max_tracked:
+                self._statuses.popitem(last=False)
+
+        if status != previous and job_store.is_local_save(job_data):
+            self.metrics.inc('job_transitions_total', (('type', job_data.get('type')), ('status', status)))
+
+_stats = None
+_stats_lock = threading.Lock()
+_transitions = None
+
+def get_job_stats():
+    """Get the shared JobStats instance, registering it with the job store on first use"""
+    global _stats
+
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                stats = JobStats(Config.JOB_STATS_MAX_AGE)
+                job_store.add_save_listener(stats.record)
+                _stats = stats
+    return _stats
+
+def track_job_transitions():
+    """Start counting job status transitions for /api/metrics"""
+    global _transitions
+
+    with _stats_lock:
+        if _transitions is None:
+            _transitions = JobTransitions(get_metrics(), job_store.LOCAL_SAVES_KEPT)
+            job_store.add_save_listener(_transitions.record)
+    return _transitions
@@ -0,0 +1,361 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from config import Config
+from services.metrics import timed
+from services.json_store import write_json_atomic
+from services.process_lock import process_lock
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ['processing', 'queued']
+
+# Saves made by this process remembered so the change feed does not replay them
+LOCAL_SAVES_KEPT = 10000
+
+# Meta key recording the import of data/jobs: 'started' or 'completed'
+LEGACY_IMPORT_KEY = 'legacy_jobs_import'
+
+def job_version(job_data):
+    """Timestamp of a job's latest save"""
+    return job_data.get('updated_at', job_data.get('created_at')) or ''
+
+class JobStore:
+    """Base class for job storage backends"""
+
+    def save(self, job_data):
+        raise NotImplementedError
+
+    def save_many(self, jobs):
+        for job_data in jobs:
+            self.save(job_data)
+        return len(jobs)
+
+    def load(self, job_id):
+        raise NotImplementedError
+
+    def list_by_status(self, statuses):
+        raise NotImplementedError
+
+    def iter_jobs(self):
+        raise NotImplementedError
+
+    def iter_job_keys(self):
+        """(job_id, status, persona_id, type) of every job"""
+        for job in self.iter_jobs():
+            yield job['job_id'], job.get('status'), job.get('persona_id'), job.get('type')
+
+    def change_position(self):
+        """Position of the latest save, to pass to changes_since()"""
+        raise NotImplementedError
+
+    def changes_since(self, position):
+        """(jobs saved after position, oldest save first; position to ask from next)
+
+        Backends without a commit sequence may return some jobs again;
+        callers tell repeats apart with job_version().
+        """
+        raise NotImplementedError
+
+    def change_marker(self):
+        """Cheap token that changes on every save, or None if the backend has none"""
+        return None
+
+class JsonJobStore(JobStore):
+    """Legacy backend storing one JSON file per job"""
+
+    # Saves are timestamped just before their file is renamed into place, so
+    # changes are re-read a little behind the newest save seen
+    LOOKBACK_SECONDS = 5
+
+    def __init__(self, jobs_dir):
+        self.jobs_dir = jobs_dir
+
+    def _job_file(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def save(self, job_data):
+        write_json_atomic(self._job_file(job_data['job_id']), job_data)
+
+    def load(self, job_id):
+        job_file = self._job_file(job_id)
+        if os.path.exists(job_file):
+            with open(job_file, 'r') as f:
+                return json.load(f)
+        return None
+
+    def list_by_status(self, statuses):
+        jobs = [job for job in self.iter_jobs() if job.get('status') in statuses]
+        jobs.sort(key=lambda x: x.get('created_at', ''))
+        return jobs
+
+    def iter_jobs(self):
+        if not os.path.exists(self.jobs_dir):
+            return
+
+        for filename in os.listdir(self.jobs_dir):
+            if filename.endswith('.json'):
+                with open(os.path.join(self.jobs_dir, filename), 'r') as f:
+                    yield json.load(f)
+
+    def change_position(self):
+        return datetime.utcnow().isoformat()
+
+    def changes_since(self, position):
+        start = (datetime.fromisoformat(position) - timedelta(seconds=self.LOOKBACK_SECONDS)).isoformat()
+        jobs = [job for job in self.iter_jobs() if job_version(job) >= start]
+        jobs.sort(key=job_version)
+        return jobs, max([position] + [job_version(job) for job in jobs])
+
+    def change_marker(self):
+        # Every save renames a file into the directory
+        try:
+            return os.stat(self.jobs_dir).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+class SqliteJobStore(JobStore):
+    """SQLite backend (WAL mode) with indexed status, persona and creation time
+
+    Every save also takes the next value of seq. Writes are serialized by
+    SQLite, so seq grows in commit order and changes_since() never misses
+    a save, however long its writer waited for the lock.
+    """
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            type TEXT,
+            status TEXT,
+            persona_id TEXT,
+            created_at TEXT,
+            updated_at TEXT,
+            data TEXT NOT NULL,
+            seq INTEGER
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_persona_id ON jobs (persona_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at)",
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+    ]
+
+    # Databases created before seq existed get the column on open
+    SEQ_COLUMN = "ALTER TABLE jobs ADD COLUMN seq INTEGER"
+    SEQ_INDEX = "CREATE INDEX IF NOT EXISTS idx_jobs_seq ON jobs (seq)"
+
+    UPSERT = """INSERT INTO jobs (job_id, type, status, persona_id, created_at, updated_at, data, seq)
+        VALUES (?, ?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM jobs))
+        ON CONFLICT(job_id) DO UPDATE SET
+            type = excluded.type,
+            status = excluded.status,
+            persona_id = excluded.persona_id,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            data = excluded.data,
+            seq = excluded.seq"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        conn = self._connection()
+        with conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(jobs)')]
+            if 'seq' not in columns:
+                conn.execute(self.SEQ_COLUMN)
+            conn.execute(self.SEQ_INDEX)
+
+    def _connection(self):
+        """Get the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _row(self, job_data):
+        return (
+            job_data['job_id'],
+            job_data.get('type'),
+            job_data.get('status'),
+            job_data.get('persona_id'),
+            job_data.get('created_at'),
+            job_version(job_data),
+            json.dumps(job_data)
+        )
+
+    def save(self, job_data):
+        conn = self._connection()
+        with conn:
+            conn.execute(self.UPSERT, self._row(job_data))
+
+    def save_many(self, jobs):
+        conn = self._connection()
+        with conn:
+            conn.executemany(self.UPSERT, [self._row(job) for job in jobs])
+        return len(jobs)
+
+    def load(self, job_id):
+        row = self._connection().execute(
+            'SELECT data FROM jobs WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_by_status(self, statuses):
+        placeholders = ', '.join('?' for _ in statuses)
+        cursor = self._connection().execute(
+            f'SELECT data FROM jobs WHERE status IN ({placeholders}) ORDER BY created_at', list(statuses)
+        )
+        return [json.loads(row[0]) for row in cursor]
+
+    def iter_jobs(self):
+        cursor = self._connection().execute('SELECT data FROM jobs ORDER BY created_at')
+        for row in cursor:
+            yield json.loads(row[0])
+
+    def is_empty(self):
+        return self._connection().execute('SELECT 1 FROM jobs LIMIT 1').fetchone() is None
+
+    def get_meta(self, key):
+        row = self._connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        conn = self._connection()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def iter_job_keys(self):
+        # Indexed columns only, no JSON decoding
+        yield from self._connection().execute('SELECT job_id, status, persona_id, type FROM jobs')
+
+    def change_position(self):
+        return self._connection().execute('SELECT COALESCE(MAX(seq), 0) FROM jobs').fetchone()[0]
+
+    def changes_since(self, position):
+        rows = self._connection().execute(
+            'SELECT seq, data FROM jobs WHERE seq > ? ORDER BY seq', (position,)
+        ).fetchall()
+        return [json.loads(data) for _, data in rows], rows[-1][0] if rows else position
+
+def migrate_json_jobs(jobs_dir, store, batch_size=500):
+    """Copy every data/jobs/<id>.json file into the given store, returns the job count"""
+    source = JsonJobStore(jobs_dir)
+    migrated = 0
+    batch = []
+
+    for job in source.iter_jobs():
+        batch.append(job)
+        if len(batch) >= batch_size:
+            migrated += store.save_many(batch)
+            batch = []
+
+    if batch:
+        migrated += store.save_many(batch)
+
+    return migrated
+
+def import_legacy_jobs(store, jobs_dir):
+    """Import data/jobs into a SQLite store once, returns the job count (0 if already done)
+
+    The import is marked 'started' and then 'completed' in the store's
+    meta table, so one interrupted midway runs again on the next start.
+    A database with jobs but no mark predates it and is left alone.
+    Server processes starting together import under a file lock.
+    """
+    with process_lock(f"{store.db_path}.import.lock"):
+        state = store.get_meta(LEGACY_IMPORT_KEY)
+        if state == 'completed':
+            return 0
+        if state is None and not store.is_empty():
+            store.set_meta(LEGACY_IMPORT_KEY, 'completed')
+            return 0
+
+        store.set_meta(LEGACY_IMPORT_KEY, 'started')
+        migrated = migrate_json_jobs(jobs_dir, store)
+        store.set_meta(LEGACY_IMPORT_KEY, 'completed')
+        logger.info(f"Migrated {migrated} jobs from {jobs_dir} to {store.db_path}")
+        return migrated
+
+_store = None
+_store_lock = threading.Lock()
+_save_listeners = []
+_local_saves = OrderedDict()  # job id -> version of this process's latest save
+_local_saves_lock = threading.Lock()
+
+def add_save_listener(callback):
+    """Register a callback(job_data) invoked after every save_job"""
+    _save_listeners.append(callback)
+
+def get_job_store():
+    """Get the configured job store, creating it on first use"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_job_store()
+    return _store
+
+def create_job_store():
+    """Create the job store selected by Config.JOB_STORE_BACKEND"""
+    jobs_dir = os.path.join(Config.DATA_DIR, 'jobs')
+
+    if Config.JOB_STORE_BACKEND == 'json':
+        return JsonJobStore(jobs_dir)
+
+    store = SqliteJobStore(Config.JOB_STORE_PATH)
+
+    # One-shot import of the legacy per-file job directory
+    if os.path.isdir(jobs_dir):
+        import_legacy_jobs(store, jobs_dir)
+
+    return store
+
+def save_job(job_data):
+    """Save a job record to the configured store and notify listeners"""
+    with timed('job_store.save'):
+        get_job_store().save(job_data)
+
+    with _local_saves_lock:
+        _local_saves[job_data['job_id']] = job_version(job_data)
+        _local_saves.move_to_end(job_data['job_id'])
+        while len(_local_saves) > LOCAL_SAVES_KEPT:
+            _local_saves.popitem(last=False)
+
+    notify_save_listeners(job_data)
+
+def is_local_save(job_data):
+    """Whether this version of the job was saved by this process"""
+    with _local_saves_lock:
+        return _local_saves.get(job_data['job_id']) == job_version(job_data)
+
+def notify_save_listeners(job_data):
+    """Invoke the save listeners, also used to replay saves made by other processes"""
+    for callback in _save_listeners:
+        try:
+            callback(job_data)
+        except Exception as e:
+            logger.error(f"Job save listener error: {str(e)}")
+
+def load_job(job_id):
+    """Load a job record from the configured store"""
+    with timed('job_store.load'):
+        return get_job_store().load(job_id)
+
+def list_jobs(statuses):
+    """List jobs whose status is one of the given statuses, oldest first"""
+    return get_job_store().list_by_status(statuses)
@@ -0,0 +1,162 @@
+import os
+import copy
+import json
+import threading
+import logging
+from contextlib import contextmanager
+from services.process_lock import process_lock
+
+logger = logging.getLogger(__name__)
+
+ANY_VERSION = object()
+MAX_UPDATE_ATTEMPTS = 10
+
+class VersionConflictError(Exception):
+    """The file changed since the version the caller read"""
+
+class ReadWriteLock:
+    """Many readers or one writer; a waiting writer holds back new readers"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+def _fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to a temp file, fsync it and rename it over path"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(directory)
+
+class JsonDocument:
+    """One JSON file with crash-safe writes and optimistic versioning
+
+    Writes go to a temp file that is fsynced and renamed over the target,
+    so readers see either the old or the new document, never a partial
+    one. Reads share a per-file reader/writer lock; writes are exclusive
+    in-process and also hold an flock on <path>.lock where available, so
+    several server processes can share the file. The version is the file's
+    (inode, mtime, size), which every rename changes. update() reads
+    without blocking other readers, applies the change and writes only if
+    the version is still the one it read, retrying on conflict.
+    """
+
+    def __init__(self, path, default_factory=None):
+        self.path = path
+        self.default_factory = default_factory
+        self._lock = ReadWriteLock()
+
+    def _version(self, stat):
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def version(self):
+        """Current version token, or None when the file does not exist"""
+        try:
+            return self._version(os.stat(self.path))
+        except FileNotFoundError:
+            return None
+
+    def read(self):
+        """Get (data, version); defaults with version None if the file is missing"""
+        with self._lock.reading():
+            try:
+                with open(self.path, 'r') as f:
+                    # Version of the file actually opened, even if it is replaced meanwhile
+                    return json.load(f), self._version(os.fstat(f.fileno()))
+            except FileNotFoundError:
+                default = self.default_factory() if self.default_factory else None
+                return default, None
+
+    def write(self, data, expected_version=ANY_VERSION):
+        """Replace the document, raises VersionConflictError if it changed since expected_version"""
+        with self._lock.writing(), process_lock(f"{self.path}.lock"):
+            if expected_version is not ANY_VERSION and self.version() != expected_version:
+                raise VersionConflictError(f"{self.path} was modified concurrently")
+            write_json_atomic(self.path, data)
+            return self.version()
+
+    def update(self, mutate):
+        """Apply mutate(data) and save the result if the data changed
+
+        mutate edits the document in place and its return value is passed
+        through. The write is skipped when nothing changed.
+        """
+        for attempt in range(MAX_UPDATE_ATTEMPTS):
+            data, version = self.read()
+            original = copy.deepcopy(data)
+            result = mutate(data)
+
+            if data == original and version is not None:
+                return result
+            try:
+                self.write(data, expected_version=version)
+                return result
+            except VersionConflictError:
+                logger.info(f"Retrying update of {self.path} after concurrent write (attempt {attempt + 1})")
+
+        raise VersionConflictError(f"Gave up updating {self.path} after {MAX_UPDATE_ATTEMPTS} attempts")
+
+_documents = {}
+_documents_lock = threading.Lock()
+
+def get_document(path, default_factory=None):
+    """Get the shared JsonDocument for a path, so every caller uses the same lock"""
+    key = os.path.abspath(path)
+    with _documents_lock:
+        if key not in _documents:
+            _documents[key] = JsonDocument(path, default_factory)
+        return _documents[key]
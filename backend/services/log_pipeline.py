@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request
+from config import Config
+from services.process_lock import process_lock
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_FILE = os.path.join(Config.LOGS_DIR, 'backend.log')
+
+# Large enough that batches are written with whole lines, never split by a full buffer
+LOG_BUFFER_BYTES = 1024 * 1024
+
+# Responses small enough to look for a job_id in
+JOB_ID_RESPONSE_BYTES = 4096
+
+access_logger = logging.getLogger('access')
+
+class RotatingBatchFileHandler(logging.FileHandler):
+    """Log file written in batches and rotated by size or at fixed time boundaries
+
+    Records go to a large write buffer that is flushed every flush_records
+    records, on ERROR and above, and whenever the queue listener flushes
+    (at least every Config.LOG_FLUSH_INTERVAL seconds). The file is rotated
+    to <file>.<timestamp> once it reaches max_bytes or crosses a multiple
+    of rotate_interval seconds, keeping backup_count old files. Several
+    server processes may share the file: rotation happens under an flock
+    on <file>.lock, and a process whose file was rotated by another one
+    reopens it.
+    """
+
+    def __init__(self, filename, max_bytes, rotate_interval, backup_count, flush_records):
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.flush_records = flush_records
+        self._pending = 0
+        self._checked = 0
+        super().__init__(filename, mode='a', encoding='utf-8')
+        self._next_rotation = self._boundary_after(time.time())
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_BYTES,
+                    encoding=self.encoding, errors=self.errors)
+
+    def _boundary_after(self, now):
+        if not self.rotate_interval:
+            return float('inf')
+        return (now // self.rotate_interval + 1) * self.rotate_interval
+
+    def _rotated_elsewhere(self):
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reopen(self):
+        self.stream.close()
+        self.stream = self._open()
+        self._pending = 0
+        self._next_rotation = self._boundary_after(time.time())
+
+    def _due(self, now):
+        if now >= self._next_rotation:
+            return True
+        return self.max_bytes and os.fstat(self.stream.fileno()).st_size >= self.max_bytes
+
+    def _rotated_name(self, now):
+        base = f"{self.baseFilename}.{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}"
+        name, n = base, 1
+        while os.path.exists(name):
+            name = f"{base}.{n}"
+            n += 1
+        return name
+
+    def _prune(self):
+        directory, prefix = os.path.split(self.baseFilename)
+        directory = directory or '.'
+        rotated = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith(prefix + '.') and name[len(prefix) + 1:][:1].isdigit()),
+            key=os.path.getmtime
+        )
+        for path in rotated[:-self.backup_count] if self.backup_count else []:
+            os.remove(path)
+
+    def _maybe_rotate(self):
+        now = time.time()
+        if now - self._checked >= 1:
+            self._checked = now
+            if self._rotated_elsewhere():
+                self.stream.flush()
+                self._reopen()
+
+        if not self._due(now):
+            return
+
+        with process_lock(f"{self.baseFilename}.lock"):
+            self.stream.flush()
+            if self._rotated_elsewhere():
+                self._reopen()
+                return
+            if not self._due(now):
+                return
+
+            self.stream.close()
+            os.replace(self.baseFilename, self._rotated_name(now))
+            self.stream = self._open()
+            self._next_rotation = self._boundary_after(now)
+            self._prune()
+
+    def emit(self, record):
+        try:
+            self._maybe_rotate()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if self._pending >= self.flush_records or record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        super().flush()
+        self._pending = 0
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers every flush_interval seconds"""
+
+    def __init__(self, log_queue, *handlers, flush_interval):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+
+    def dequeue(self, block):
+        while True:
+            timeout = self._last_flush + self.flush_interval - time.monotonic()
+            if timeout <= 0:
+                self.flush()
+                continue
+            try:
+                return self.queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+
+    def flush(self):
+        for handler in self.handlers:
+            handler.flush()
+        self._last_flush = time.monotonic()
+
+    def stop(self):
+        super().stop()
+        self.flush()
+
+_pid = None
+_listener = None
+_setup_lock = threading.Lock()
+
+def setup_logging():
+    """Send all logging through a queue to a background writer thread
+
+    Request threads only enqueue records; formatting, the file write and
+    rotation happen on the listener thread. Runs once per process, so a
+    forked server worker replaces the handler it inherited with its own
+    queue and listener.
+    """
+    global _pid, _listener
+
+    with _setup_lock:
+        if _pid == os.getpid():
+            return
+
+        os.makedirs(Config.LOGS_DIR, exist_ok=True)
+        formatter = logging.Formatter(LOG_FORMAT)
+        file_handler = RotatingBatchFileHandler(
+            LOG_FILE,
+            Config.LOG_MAX_BYTES,
+            Config.LOG_ROTATE_INTERVAL,
+            Config.LOG_BACKUP_COUNT,
+            Config.LOG_FLUSH_RECORDS
+        )
+        console_handler = logging.StreamHandler(sys.stdout)
+        for handler in [file_handler, console_handler]:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+
+        listener = BatchingQueueListener(log_queue, file_handler, console_handler,
+                                         flush_interval=Config.LOG_FLUSH_INTERVAL)
+        listener.start()
+        atexit.register(listener.stop)
+        _pid, _listener = os.getpid(), listener
+
+def request_job_id(response):
+    """Job the request is about: the <job_id> route argument or the job_id a POST returned"""
+    job_id = (request.view_args or {}).get('job_id')
+    if job_id or request.method != 'POST' or not response.is_json:
+        return job_id
+
+    if (response.content_length or JOB_ID_RESPONSE_BYTES) < JOB_ID_RESPONSE_BYTES:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            return body.get('job_id')
+    return None
+
+def init_access_log(app):
+    """Log one combined line per request to the 'access' logger
+
+    Requests to Config.ACCESS_LOG_SAMPLED_ENDPOINTS (health checks and
+    polling) are logged at Config.ACCESS_LOG_SAMPLE_RATE unless they fail;
+    their lines carry sample_rate so counts can be scaled back up.
+    """
+    sampled_endpoints = set(Config.ACCESS_LOG_SAMPLED_ENDPOINTS)
+    sample_rate = Config.ACCESS_LOG_SAMPLE_RATE
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        sampled = request.endpoint in sampled_endpoints and response.status_code < 400
+        if sampled and random.random() >= sample_rate:
+            return response
+
+        line = (
+            f"method={request.method} path={request.path} status={response.status_code} "
+            f"latency_ms={latency_ms:.1f} job_id={request_job_id(response) or '-'} remote={request.remote_addr}"
+        )
+        if sampled:
+            line += f" sample_rate={sample_rate}"
+        access_logger.info(line)
+        return response
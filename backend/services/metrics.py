@@ -0,0 +1,295 @@
+import os
+import time
+import json
+import atexit
+import bisect
+import threading
+import logging
+from contextlib import contextmanager
+from flask import g, request
+from config import Config
+from services.json_store import write_json_atomic, get_document
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.path.join(Config.DATA_DIR, 'metrics')
+RETIRED_METRICS_FILE = os.path.join(METRICS_DIR, 'retired.json')
+METRIC_PREFIX = 'buzzsnip_'
+
+REQUEST_LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+METRIC_HELP = {
+    'http_request_duration_seconds': 'Request latency by blueprint, endpoint and method',
+    'http_requests_total': 'Requests by blueprint, endpoint, method and status',
+    'section_duration_seconds': 'Time spent in instrumented code sections (disk reads, store writes)',
+    'ai_service_call_duration_seconds': 'AI services round-trip time by endpoint, one sample per attempt',
+    'ai_service_calls_total': 'AI services call attempts by endpoint and outcome',
+    'job_transitions_total': 'Job saves that moved a job into a status, by job type',
+    'job_queue_depth': 'Jobs waiting for an AI services worker',
+    'upload_queue_depth': 'Upload tasks waiting for a worker, by platform',
+    'jobs': 'Jobs in the job store by status'
+}
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, seconds):
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets + ['+Inf'], self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            return {'buckets': buckets, 'sum': round(self._sum, 6), 'count': self._count}
+
+class Metrics:
+    """Process-local counters and latency histograms, plus collector callbacks
+
+    A series is a metric name and a tuple of (label, value) pairs. Updates
+    on the request path are a dict lookup and a short lock; collectors
+    (queue depths, AI services stats) are only called when a snapshot is
+    taken.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds, buckets=REQUEST_LATENCY_BUCKETS):
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram(buckets))
+        histogram.observe(seconds)
+
+    def add_collector(self, callback):
+        """Register a callback() returning (kind, name, labels, value) series for every snapshot
+
+        kind is 'counter' or 'gauge' with a number, or 'histogram' with a
+        LatencyHistogram snapshot.
+        """
+        self._collectors.append(callback)
+
+    def snapshot(self):
+        """All series as [kind, name, labels, value] lists"""
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = list(self._histograms.items())
+
+        series = [['counter', name, labels, value] for (name, labels), value in counters]
+        series += [['histogram', name, labels, h.snapshot()] for (name, labels), h in histograms]
+        for callback in self._collectors:
+            try:
+                series += [list(s) for s in callback()]
+            except Exception as e:
+                logger.error(f"Metrics collector error: {str(e)}")
+        return series
+
+def merge_series(*series_lists):
+    """Sum series from several snapshots, keyed by (kind, name, labels)"""
+    merged = {}
+    for series in series_lists:
+        for kind, name, labels, value in series:
+            key = (kind, name, tuple(tuple(pair) for pair in labels))
+            if kind != 'histogram':
+                merged[key] = merged.get(key, 0) + value
+                continue
+
+            total = merged.setdefault(key, {'buckets': {}, 'sum': 0, 'count': 0})
+            for bound, count in value['buckets'].items():
+                total['buckets'][bound] = total['buckets'].get(bound, 0) + count
+            total['sum'] += value['sum']
+            total['count'] += value['count']
+    return merged
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+def render_metrics(merged):
+    """Format merged series in the Prometheus text exposition format"""
+    lines = []
+    described = set()
+    for (kind, name, labels), value in sorted(merged.items(), key=lambda item: (item[0][1], item[0][2])):
+        full_name = METRIC_PREFIX + name
+        if name not in described:
+            described.add(name)
+            if name in METRIC_HELP:
+                lines.append(f"# HELP {full_name} {METRIC_HELP[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+
+        if kind == 'histogram':
+            for bound, count in value['buckets'].items():
+                lines.append(f"{full_name}_bucket{_label_text(labels, [('le', bound)])} {count}")
+            lines.append(f"{full_name}_sum{_label_text(labels)} {round(value['sum'], 6)}")
+            lines.append(f"{full_name}_count{_label_text(labels)} {value['count']}")
+        else:
+            lines.append(f"{full_name}{_label_text(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+class MetricsPublisher(threading.Thread):
+    """Writes this process's snapshot to <directory>/<pid>.json for the other server workers
+
+    Any worker answering /api/metrics adds up the published snapshots, so
+    a scrape covers every process. On exit the counters and histograms
+    are folded into retired.json, which keeps totals from going backwards
+    when gunicorn recycles a worker.
+    """
+
+    def __init__(self, metrics, directory, interval):
+        super().__init__(name='metrics-publisher', daemon=True)
+        self.metrics = metrics
+        self.directory = directory
+        self.interval = interval
+        self.path = os.path.join(directory, f"{os.getpid()}.json")
+        self._stop_event = threading.Event()
+
+    def publish(self):
+        write_json_atomic(self.path, self.metrics.snapshot(), indent=None)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Metrics publish error: {str(e)}")
+
+    def retire(self):
+        """Fold the counters and histograms into retired.json and withdraw the live snapshot"""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout=self.interval)
+        finished = [s for s in self.metrics.snapshot() if s[0] != 'gauge']
+
+        def fold(retired):
+            merged = merge_series(retired, finished)
+            retired[:] = [[kind, name, labels, value] for (kind, name, labels), value in merged.items()]
+
+        try:
+            get_document(RETIRED_METRICS_FILE, list).update(fold)
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Metrics retire error: {str(e)}")
+
+def published_series(directory, max_age):
+    """Series published by the other live processes and by retired ones
+
+    Snapshots not refreshed within max_age seconds belong to processes
+    that died without retiring; they are removed.
+    """
+    series = []
+    own_file = f"{os.getpid()}.json"
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return series
+
+    now = time.time()
+    for name in names:
+        if not name.endswith('.json') or name == own_file:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if path != RETIRED_METRICS_FILE and now - os.stat(path).st_mtime > max_age:
+                os.remove(path)
+                continue
+            with open(path, 'r') as f:
+                series.append(json.load(f))
+        except (OSError, ValueError):
+            # Being replaced or removed by its owner
+            continue
+    return series
+
+def clear_published_metrics():
+    """Start a new server run from zero (called by the serve master before forking)"""
+    if not os.path.isdir(METRICS_DIR):
+        return
+    for name in os.listdir(METRICS_DIR):
+        if name.endswith('.json'):
+            os.remove(os.path.join(METRICS_DIR, name))
+
+_metrics = Metrics()
+_publisher = None
+_publisher_lock = threading.Lock()
+
+def get_metrics():
+    """Get this process's metrics"""
+    return _metrics
+
+def start_metrics_publisher():
+    """Publish this process's metrics for the other server workers (multi-process serving only)"""
+    global _publisher
+
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = MetricsPublisher(_metrics, METRICS_DIR, Config.METRICS_PUBLISH_INTERVAL)
+            _publisher.publish()
+            _publisher.start()
+            atexit.register(_publisher.retire)
+    return _publisher
+
+def collect_metrics():
+    """Merged series of this process and every published snapshot"""
+    stale_after = Config.METRICS_PUBLISH_INTERVAL * 3
+    return merge_series(_metrics.snapshot(), *published_series(METRICS_DIR, stale_after))
+
+@contextmanager
+def timed(section):
+    """Record the time spent in a block under section_duration_seconds{section=...}"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _metrics.observe('section_duration_seconds', (('section', section),), time.perf_counter() - started)
+
+def init_request_metrics(app):
+    """Time every request into per-route latency histograms and status counts"""
+
+    @app.before_request
+    def start_metrics_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+
+        # Unrouted paths share one series so scanners cannot add new ones
+        route = (
+            ('blueprint', request.blueprint or 'app'),
+            ('endpoint', request.endpoint or 'unmatched'),
+            ('method', request.method)
+        )
+        _metrics.observe('http_request_duration_seconds', route, time.perf_counter() - started)
+        _metrics.inc('http_requests_total', route + (('status', str(response.status_code)),))
+        return response
@@ -0,0 +1,509 @@
+import os
+import time
+import uuid
+import threading
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from config import Config
+from services.json_store import get_document
+from services.process_lock import process_lock
+from services.ai_client import get_ai_client, AIServiceError
+from services.settings_store import load_settings, get_default_settings
+from services.persona_registry import get_persona_registry
+
+logger = logging.getLogger(__name__)
+
+RESIDENCY_FILE = os.path.join(Config.DATA_DIR, 'model_residency.json')
+RESIDENCY_LOCK_FILE = os.path.join(Config.DATA_DIR, 'model_residency.lock')
+
+# Models AI services can hold, keyed as in the ai_models settings and persona voice_type
+MODEL_CATALOG = {
+    'realistic-vision-v5': {'name': 'Stable Diffusion', 'size_mb': 4300, 'memory_mb': 3890},
+    'bark': {'name': 'Bark TTS', 'size_mb': 2870, 'memory_mb': 2150},
+    'tortoise': {'name': 'Tortoise TTS', 'size_mb': 3200, 'memory_mb': 2450},
+    'sadtalker': {'name': 'SadTalker', 'size_mb': 1540, 'memory_mb': 1230},
+    'wav2lip': {'name': 'Wav2Lip', 'size_mb': 430, 'memory_mb': 410},
+    'real-esrgan': {'name': 'Real-ESRGAN', 'size_mb': 67, 'memory_mb': 180},
+    'tinyllama': {'name': 'TinyLlama', 'size_mb': 2250, 'memory_mb': 1840}
+}
+
+class ModelResidencyError(Exception):
+    """Raised when a model cannot be loaded, unloaded or pinned"""
+
+class UnknownModelError(ModelResidencyError):
+    """Raised for a model that is not in MODEL_CATALOG"""
+
+class ModelBudgetError(ModelResidencyError):
+    """Raised when a model does not fit the memory budget even after evicting"""
+
+class ModelBusyError(ModelResidencyError):
+    """Raised when unloading a model that is pinned or in use"""
+
+class ModelRuntimeError(ModelResidencyError):
+    """Raised when the runtime fails to load or unload a model"""
+
+def models_label(keys):
+    """Stable label for a set of model keys, e.g. "bark+real-esrgan" """
+    return '+'.join(sorted(keys)) or 'none'
+
+def format_mb(mb):
+    return f"{mb / 1024:.1f} GB" if mb >= 1024 else f"{mb} MB"
+
+class FakeModelRuntime:
+    """Local stand-in for model loading, for testing without a GPU
+
+    With seconds_per_gb set, a load sleeps in proportion to the model's
+    memory footprint, so eviction and swap costs show up in job timings
+    (the benchmark does this). At 0 it only keeps the bookkeeping.
+    """
+
+    name = 'fake'
+
+    def __init__(self, seconds_per_gb):
+        self.seconds_per_gb = seconds_per_gb
+
+    def load(self, key, spec):
+        if self.seconds_per_gb:
+            time.sleep(spec['memory_mb'] / 1024 * self.seconds_per_gb)
+
+    def unload(self, key, spec):
+        pass
+
+class AIServicesModelRuntime:
+    """Loads and unloads models in AI services with POST /models/<key>/load|unload"""
+
+    name = 'ai_services'
+
+    def _call(self, key, action):
+        try:
+            response = get_ai_client().post(f"/models/{key}/{action}", idempotent=True)
+        except AIServiceError as e:
+            raise ModelRuntimeError(f"Failed to {action} {key}: {str(e)}")
+        if response.status_code != 200:
+            raise ModelRuntimeError(f"Failed to {action} {key}: AI services returned {response.status_code}")
+
+    def load(self, key, spec):
+        self._call(key, 'load')
+
+    def unload(self, key, spec):
+        self._call(key, 'unload')
+
+def create_model_runtime():
+    if Config.MODEL_RUNTIME == 'ai_services':
+        return AIServicesModelRuntime()
+    return FakeModelRuntime(Config.FAKE_MODEL_LOAD_SECONDS_PER_GB)
+
+def pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # Single process on Windows: other pids are from earlier runs
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ModelResidency:
+    """Tracks which models are resident and keeps them within a memory budget
+
+    State (status, pinned, last use, in-use counts per process) lives in
+    data/model_residency.json, so every server process sees the same
+    models. It is re-read under an flock on data/model_residency.lock and
+    written back after each change. Loads run outside the lock: a model
+    is marked 'loading' (its memory counted against the budget), loaded,
+    and then marked 'loaded' under the lock again, so other models can be
+    used, loaded and evicted meanwhile. Callers needing a model that is
+    loading wait for it: on a condition within the process, polling every
+    Config.PROCESS_SYNC_INTERVAL seconds across processes.
+
+    A load that does not fit the budget first evicts least recently used
+    models that are neither pinned nor in use by a running job.
+    """
+
+    def __init__(self, document, lock_path, runtime, budget_mb, pinned, catalog=MODEL_CATALOG):
+        self.document = document
+        self.lock_path = lock_path
+        self.runtime = runtime
+        self.budget_mb = budget_mb
+        self.pinned = set(pinned)
+        self.catalog = catalog
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._version = 0
+        # Identifies this manager's loads, even if a restarted process reuses the pid
+        self._owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def resolve(self, name):
+        """Catalog key for a model key or display name, raises UnknownModelError"""
+        if name in self.catalog:
+            return name
+        for key, spec in self.catalog.items():
+            if spec['name'].lower() == name.lower():
+                return key
+        raise UnknownModelError(f"Unknown model: {name}")
+
+    def _owner_alive(self, owner):
+        pid, _, _ = (owner or '0:').partition(':')
+        if int(pid) == os.getpid():
+            return owner == self._owner
+        return pid_alive(int(pid))
+
+    def _normalize(self, state, locked):
+        state = dict(state or {})
+        for key in self.catalog:
+            entry = state.setdefault(key, {
+                'status': 'unloaded',
+                'pinned': key in self.pinned,
+                'last_used': None,
+                'loaded_at': None,
+                'loads': 0,
+                'evictions': 0,
+                'users': {}
+            })
+            entry['users'] = {pid: n for pid, n in entry['users'].items() if n > 0 and pid_alive(int(pid))}
+            if entry['status'] in ['loading', 'unloading'] and not self._owner_alive(entry.get('owner')):
+                # The process doing this died
+                if locked:
+                    logger.warning(f"Model {key} was left {entry['status']}, marking it unloaded")
+                entry.update(status='unloaded', owner=None)
+        return state
+
+    @contextmanager
+    def _locked(self):
+        """Hold the residency lock and yield the current state, written back afterwards"""
+        with self._lock, process_lock(self.lock_path):
+            state = self._normalize(self.document.read()[0], locked=True)
+            try:
+                yield state
+            finally:
+                self.document.write(state)
+
+    def _notify(self):
+        """Wake this process's waiters after a load finished or memory was freed"""
+        with self._changed:
+            self._version += 1
+            self._changed.notify_all()
+
+    def _wait(self, seen):
+        """Wait for a _notify() after version seen, or a poll interval for other processes"""
+        with self._changed:
+            if self._version == seen:
+                self._changed.wait(Config.PROCESS_SYNC_INTERVAL)
+
+    def _used_mb(self, state):
+        return sum(
+            self.catalog[key]['memory_mb'] for key, entry in state.items()
+            if key in self.catalog and entry['status'] in ['loaded', 'loading']
+        )
+
+    def _unload(self, state, key, evicted=False):
+        # Unloads only free memory and stay under the lock
+        entry = state[key]
+        entry.update(status='unloading', owner=self._owner)
+        self.document.write(state)
+        try:
+            self.runtime.unload(key, self.catalog[key])
+        except Exception:
+            entry.update(status='loaded', owner=None)
+            raise
+        entry.update(status='unloaded', owner=None, loaded_at=None)
+        if evicted:
+            entry['evictions'] += 1
+
+    def _reserve(self, state, keys):
+        """Mark the keys not loaded yet as 'loading', evicting to make room
+
+        Returns the keys to load, or None while one of them is being
+        loaded or unloaded by someone else. Raises ModelBudgetError when
+        pinned and in-use models leave no room; nothing is evicted then.
+        """
+        pending = [key for key in keys if state[key]['status'] != 'loaded']
+        if any(state[key]['status'] in ['loading', 'unloading'] for key in pending):
+            return None
+
+        needed = sum(self.catalog[key]['memory_mb'] for key in pending)
+        if needed > self.budget_mb:
+            raise ModelBudgetError(f"{models_label(pending)} needs {needed} MB, more than the {self.budget_mb} MB budget")
+
+        free = self.budget_mb - self._used_mb(state)
+        if free < needed:
+            candidates = sorted(
+                (k for k, e in state.items()
+                 if e['status'] == 'loaded' and not e['pinned'] and not e['users'] and k not in keys),
+                key=lambda k: state[k]['last_used'] or ''
+            )
+            victims = []
+            for candidate in candidates:
+                if free >= needed:
+                    break
+                victims.append(candidate)
+                free += self.catalog[candidate]['memory_mb']
+            if free < needed:
+                raise ModelBudgetError(
+                    f"No room for {models_label(pending)} ({needed} MB): "
+                    f"pinned and in-use models hold the {self.budget_mb} MB budget"
+                )
+
+            for victim in victims:
+                logger.info(f"Evicting model {victim} (least recently used) to load {models_label(pending)}")
+                self._unload(state, victim, evicted=True)
+
+        for key in pending:
+            state[key].update(status='loading', owner=self._owner)
+        return pending
+
+    def _load(self, keys):
+        """Load reserved keys outside the lock, recording each outcome under it"""
+        for i, key in enumerate(keys):
+            started = time.monotonic()
+            try:
+                self.runtime.load(key, self.catalog[key])
+            except Exception:
+                with self._locked() as state:
+                    for failed in keys[i:]:
+                        state[failed].update(status='unloaded', owner=None)
+                self._notify()
+                raise
+
+            with self._locked() as state:
+                now = datetime.utcnow().isoformat()
+                entry = state[key]
+                entry.update(status='loaded', owner=None, loaded_at=now, last_used=now, loads=entry['loads'] + 1)
+            self._notify()
+            logger.info(f"Loaded model {key} in {time.monotonic() - started:.1f}s")
+
+    def _acquire(self, keys, hold=False, wait=False):
+        """Get the keys loaded, waiting while any of them is loading elsewhere
+
+        hold registers this process as a user of every key (release with
+        _release). With wait, models in use holding the memory needed are
+        waited for, and ModelBudgetError is raised only if the keys cannot
+        fit next to the pinned models; otherwise it is raised right away.
+        """
+        pid = str(os.getpid())
+        waiting = False
+        while True:
+            with self._locked() as state:
+                if wait and not self._fits_when_idle(state, keys):
+                    raise ModelBudgetError(
+                        f"{models_label(keys)} cannot fit next to the pinned models in the {self.budget_mb} MB budget"
+                    )
+                try:
+                    pending = self._reserve(state, keys)
+                except ModelBudgetError:
+                    if not wait:
+                        raise
+                    pending = None
+
+                if pending is not None:
+                    if hold:
+                        for key in keys:
+                            users = state[key]['users']
+                            users[pid] = users.get(pid, 0) + 1
+                    break
+                seen = self._version
+
+            if not waiting:
+                logger.info(f"Waiting for models loading or in use to make room for {models_label(keys)}")
+                waiting = True
+            self._wait(seen)
+
+        try:
+            self._load(pending)
+        except Exception:
+            if hold:
+                self._release(keys)
+            raise
+
+    def _release(self, keys):
+        pid = str(os.getpid())
+        with self._locked() as state:
+            now = datetime.utcnow().isoformat()
+            for key in keys:
+                users = state[key]['users']
+                users[pid] = users.get(pid, 1) - 1
+                if users[pid] <= 0:
+                    del users[pid]
+                state[key]['last_used'] = now
+        self._notify()
+
+    def load(self, name):
+        key = self.resolve(name)
+        self._acquire([key])
+        return self.describe(key)
+
+    def unload(self, name):
+        key = self.resolve(name)
+        with self._locked() as state:
+            entry = state[key]
+            if entry['pinned']:
+                raise ModelBusyError(f"{key} is pinned, unpin it first")
+            if entry['users']:
+                raise ModelBusyError(f"{key} is in use by {sum(entry['users'].values())} running jobs")
+            if entry['status'] == 'loading':
+                raise ModelBusyError(f"{key} is loading")
+            if entry['status'] == 'loaded':
+                self._unload(state, key)
+        self._notify()
+        return self.describe(key)
+
+    def pin(self, name):
+        """Load a model and keep it resident until unpinned"""
+        key = self.resolve(name)
+        with self._locked() as state:
+            pinned_mb = sum(self.catalog[k]['memory_mb'] for k, e in state.items() if e['pinned'] and k != key)
+            if pinned_mb + self.catalog[key]['memory_mb'] > self.budget_mb:
+                raise ModelBudgetError(f"Pinning {key} would pin more than the {self.budget_mb} MB budget")
+            was_pinned = state[key]['pinned']
+            # Pinned before loading so nothing evicts it in between
+            state[key]['pinned'] = True
+
+        try:
+            self._acquire([key])
+        except Exception:
+            with self._locked() as state:
+                state[key]['pinned'] = was_pinned
+            raise
+        return self.describe(key)
+
+    def unpin(self, name):
+        key = self.resolve(name)
+        with self._locked() as state:
+            state[key]['pinned'] = False
+        self._notify()
+        return self.describe(key)
+
+    def preload_pinned(self):
+        """Load the pinned models, e.g. when the background services start"""
+        state = self._normalize(self.document.read()[0], locked=False)
+        for key, entry in state.items():
+            if entry['pinned'] and key in self.catalog:
+                try:
+                    self._acquire([key])
+                except ModelResidencyError as e:
+                    logger.error(f"Preload pinned model {key} error: {str(e)}")
+
+    def _fits_when_idle(self, state, keys):
+        pinned_mb = sum(self.catalog[k]['memory_mb'] for k, e in state.items() if e['pinned'] and k not in keys)
+        return pinned_mb + sum(self.catalog[key]['memory_mb'] for key in keys) <= self.budget_mb
+
+    @contextmanager
+    def using(self, keys):
+        """Load the given models (evicting others if needed) and keep them resident while the block runs
+
+        Waits while models in use by other jobs hold the memory needed,
+        and raises ModelBudgetError only if the models cannot fit next to
+        the pinned ones.
+        """
+        keys = [key for key in dict.fromkeys(keys) if key in self.catalog]
+        if not keys:
+            yield
+            return
+
+        self._acquire(keys, hold=True, wait=True)
+        try:
+            yield
+        finally:
+            self._release(keys)
+
+    def _describe(self, key, entry):
+        spec = self.catalog[key]
+        resident = entry['status'] in ['loaded', 'loading', 'unloading']
+        return {
+            'key': key,
+            'name': spec['name'],
+            'status': entry['status'],
+            'pinned': entry['pinned'],
+            'in_use': sum(entry['users'].values()),
+            'size': format_mb(spec['size_mb']),
+            'size_mb': spec['size_mb'],
+            'memory_usage': format_mb(spec['memory_mb'] if resident else 0),
+            'memory_mb': spec['memory_mb'],
+            'last_used': entry['last_used'],
+            'loaded_at': entry['loaded_at'],
+            'loads': entry['loads'],
+            'evictions': entry['evictions']
+        }
+
+    def describe(self, key):
+        state = self._normalize(self.document.read()[0], locked=False)
+        return self._describe(key, state[key])
+
+    def resident_models(self):
+        """Keys of the models loaded or being loaded"""
+        state = self._normalize(self.document.read()[0], locked=False)
+        return {key for key, entry in state.items() if key in self.catalog and entry['status'] in ['loaded', 'loading']}
+
+    def status(self):
+        """Every catalog model with its residency, plus the budget and memory in use"""
+        state = self._normalize(self.document.read()[0], locked=False)
+        return {
+            'runtime': self.runtime.name,
+            'memory_budget_mb': self.budget_mb,
+            'memory_used_mb': self._used_mb(state),
+            'models': [self._describe(key, state[key]) for key in self.catalog]
+        }
+
+def job_models(job_data):
+    """Catalog keys of the models a job's stages run on
+
+    Cloud voices (gtts) and unknown keys are left out.
+    """
+    models = job_data.get('models') or load_settings().get('ai_models') or get_default_settings()['ai_models']
+    request = job_data.get('request') or {}
+
+    if job_data['type'] == 'audio':
+        keys = [request.get('voice_type') or models.get('voice_model')]
+    elif job_data['type'] == 'face':
+        keys = [models.get('stable_diffusion_model')]
+    elif job_data['type'] == 'video':
+        keys = [models.get('lip_sync_model'), models.get('upscaling_model')]
+    elif job_data['type'] == 'automated':
+        persona = get_persona_registry().get(job_data.get('persona_id')) or {}
+        keys = [
+            persona.get('voice_type') or models.get('voice_model'),
+            models.get('stable_diffusion_model'),
+            models.get('lip_sync_model'),
+            models.get('upscaling_model'),
+            models.get('llm_model')
+        ]
+    elif job_data['type'] == 'pipeline':
+        keys = [
+            (request.get('audio') or {}).get('voice_type') or models.get('voice_model'),
+            models.get('stable_diffusion_model'),
+            models.get('lip_sync_model'),
+            models.get('upscaling_model')
+        ]
+    else:
+        keys = []
+    return [key for key in keys if key in MODEL_CATALOG]
+
+_residency = None
+_residency_lock = threading.Lock()
+
+def get_model_residency():
+    """Get the shared model residency manager"""
+    global _residency
+
+    if _residency is None:
+        with _residency_lock:
+            if _residency is None:
+                _residency = ModelResidency(
+                    get_document(RESIDENCY_FILE, dict),
+                    RESIDENCY_LOCK_FILE,
+                    create_model_runtime(),
+                    Config.MODEL_MEMORY_BUDGET_MB,
+                    [key for key in Config.MODEL_PINNED if key]
+                )
+    return _residency
+
+def start_model_residency():
+    """Load the pinned models in the background (background services process only)"""
+    thread = threading.Thread(target=get_model_residency().preload_pinned, name='model-preload', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,170 @@
+import os
+import copy
+import threading
+import logging
+from datetime import datetime
+from config import Config
+from services.json_store import get_document
+
+logger = logging.getLogger(__name__)
+
+PERSONAS_FILE = os.path.join(Config.DATA_DIR, 'personas.json')
+
+class PersonaRegistry:
+    """Parsed personas kept in memory behind an id index
+
+    The file is re-read only when its version (inode, mtime, size) changes.
+    Writes go through the shared JsonDocument, so they are atomic and
+    concurrent updates are retried instead of overwriting each other.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self._lock = threading.Lock()
+        self._personas = None
+        self._by_id = {}
+        self._version = None
+
+    def _set(self, personas, version):
+        self._personas = personas
+        self._by_id = {p['id']: p for p in personas}
+        self._version = version
+
+    def _refresh(self):
+        """Reload the file if it changed since it was last read"""
+        version = self.document.version()
+        if self._personas is not None and version == self._version:
+            return
+
+        try:
+            self._set(*self.document.read())
+        except Exception as e:
+            logger.error(f"Load personas error: {str(e)}")
+            if self._personas is None:
+                self._set(self.document.default_factory(), None)
+
+    def list(self):
+        """Get all personas"""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._personas)
+
+    def get(self, persona_id):
+        """Get a persona by id, or None"""
+        with self._lock:
+            self._refresh()
+            persona = self._by_id.get(persona_id)
+            return copy.deepcopy(persona) if persona else None
+
+    def create(self, persona):
+        """Add a persona, returns False if the id is already taken"""
+        def add(personas):
+            if any(p['id'] == persona['id'] for p in personas):
+                return False
+            personas.append(copy.deepcopy(persona))
+            return True
+
+        return self.document.update(add)
+
+    def update(self, persona_id, fields):
+        """Apply field updates to a persona, returns the updated persona or None"""
+        def apply(personas):
+            persona = next((p for p in personas if p['id'] == persona_id), None)
+            if persona is None:
+                return None
+            persona.update(fields)
+            return copy.deepcopy(persona)
+
+        return self.document.update(apply)
+
+    def delete(self, persona_id):
+        """Remove a persona, returns False if it did not exist"""
+        def remove(personas):
+            remaining = [p for p in personas if p['id'] != persona_id]
+            if len(remaining) == len(personas):
+                return False
+            personas[:] = remaining
+            return True
+
+        return self.document.update(remove)
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_persona_registry():
+    """Get the shared persona registry"""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PersonaRegistry(get_document(PERSONAS_FILE, get_default_personas))
+    return _registry
+
+def get_default_personas():
+    """Get default personas"""
+    return [
+        {
+            'id': 'tech_guru_hindi',
+            'name': 'TechShree',
+            'language': 'Hindi-English (Hinglish)',
+            'voice_type': 'bark',
+            'prompt': 'A confident, sharp Indian tech influencer, photorealistic, 8k, focused lighting',
+            'themes': ['gadget_reviews', 'ai_tips', 'coding_hacks'],
+            'personality_traits': ['smart', 'calm', 'helpful'],
+            'signature_phrases': [
+                'Aaj ka tech secret...',
+                'Yeh feature bilkul next-level hai!',
+                'Agar aap coder ho toh yeh zaroor try karo!'
+            ],
+            'avatar_url': '',
+            'status': 'active',
+            'created_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.utcnow().isoformat(),
+            'total_videos': 45,
+            'total_views': 125000,
+            'last_used': '2024-01-15T14:30:00Z'
+        },
+        {
+            'id': 'fitness_coach',
+            'name': 'Aarohi FitAI',
+            'language': 'Hindi-English (Hinglish)',
+            'voice_type': 'tortoise',
+            'prompt': 'An energetic Indian fitness coach, athletic build, motivational expression, gym background',
+            'themes': ['workout_tips', 'nutrition_advice', 'motivation', 'exercise_demos'],
+            'personality_traits': ['energetic', 'motivational', 'disciplined', 'caring'],
+            'signature_phrases': [
+                'Aaj ka workout challenge...',
+                'Fitness is not a destination, it\'s a journey!',
+                'Strong body, strong mind!'
+            ],
+            'avatar_url': '',
+            'status': 'active',
+            'created_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.utcnow().isoformat(),
+            'total_videos': 32,
+            'total_views': 89000,
+            'last_used': '2024-01-14T16:20:00Z'
+        },
+        {
+            'id': 'fashion_influencer',
+            'name': 'Ritika AI',
+            'language': 'Hindi-English (Hinglish)',
+            'voice_type': 'gtts',
+            'prompt': 'A glamorous Indian fashion model, stylish outfit, confident pose, modern background',
+            'themes': ['outfit_ideas', 'style_tips', 'fashion_trends', 'beauty_hacks'],
+            'personality_traits': ['stylish', 'confident', 'trendy', 'inspiring'],
+            'signature_phrases': [
+                'Aaj ka fashion mantra...',
+                'Style is a way to say who you are!',
+                'Fashion fades, but style is eternal!'
+            ],
+            'avatar_url': '',
+            'status': 'inactive',
+            'created_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.utcnow().isoformat(),
+            'total_videos': 28,
+            'total_views': 67000,
+            'last_used': '2024-01-12T13:45:00Z'
+        }
+    ]
\ No newline at end of file
@@ -0,0 +1,148 @@
+import time
+import threading
+import logging
+from datetime import datetime
+from services.ai_client import get_ai_client, AIServiceError, AIServiceRequestError
+
+# Client errors that say nothing about the request being wrong
+TRANSIENT_CLIENT_STATUSES = [408, 409, 429]
+from services.model_residency import get_model_residency
+
+logger = logging.getLogger(__name__)
+
+class StageError(AIServiceError):
+    """Raised when a pipeline stage fails"""
+
+    def __init__(self, stage, cause):
+        super().__init__(f"{stage} stage failed: {str(cause)}")
+        self.stage = stage
+        self.cause = cause
+
+class Stage:
+    """One AI services call in a pipeline
+
+    needs lists the stages whose outputs it uses; it starts as soon as
+    all of them are done. models(context) returns the model keys it
+    holds while it runs and payload(context, outputs) builds its request.
+    """
+
+    def __init__(self, name, endpoint, payload, needs=(), models=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.payload = payload
+        self.needs = list(needs)
+        self.models = models or (lambda context: [])
+
+def call_ai_services(endpoint, payload, job_id):
+    """POST one generation to AI services and return the response body"""
+    ai_response = get_ai_client().post(
+        endpoint,
+        json=payload,
+        headers={'X-Job-ID': job_id}
+    )
+
+    if ai_response.status_code != 200:
+        logger.error(f"AI services error on {endpoint}: {ai_response.text}")
+        if 400 <= ai_response.status_code < 500 and ai_response.status_code not in TRANSIENT_CLIENT_STATUSES:
+            raise AIServiceRequestError(f"AI services rejected the request on {endpoint}: {ai_response.status_code}")
+        raise AIServiceError(f"AI services returned {ai_response.status_code} on {endpoint}")
+
+    return ai_response.json()
+
+class Pipeline:
+    """A DAG of stages run with as much overlap as their dependencies allow
+
+    Every stage gets an entry in job_data['stages'] with its status,
+    start/end times, seconds spent waiting for models, seconds in AI
+    services, and output. on_change() is called (one stage at a time)
+    whenever an entry changes so the caller can persist the job. When a
+    stage fails no new stages start; the running ones finish and the
+    first failure is raised as StageError.
+
+    The saved entries double as checkpoints: running the same job again
+    reuses the output of every completed stage and starts from the
+    first incomplete ones.
+    """
+
+    def __init__(self, stages):
+        names = set()
+        for stage in stages:
+            missing = [need for need in stage.needs if need not in names]
+            if missing:
+                raise ValueError(f"Stage {stage.name} needs {missing}, which must be declared before it")
+            names.add(stage.name)
+        self.stages = stages
+
+    def run(self, job_data, context, on_change=None):
+        """Run every stage and return their outputs by stage name"""
+        entries = job_data.setdefault('stages', {})
+        outputs = {}
+        for stage in self.stages:
+            entry = entries.get(stage.name) or {}
+            if entry.get('status') == 'completed' and 'output' in entry:
+                # Checkpoint from an earlier attempt
+                outputs[stage.name] = entry['output']
+            else:
+                entries[stage.name] = {'status': 'pending', 'needs': stage.needs}
+
+        if outputs:
+            logger.info(f"Job {job_data['job_id']} resuming with {', '.join(outputs)} already done")
+
+        errors = []
+        running = set()
+        cond = threading.Condition()
+
+        def changed():
+            job_data['progress'] = 10 + 80 * len(outputs) // len(self.stages)
+            if on_change:
+                on_change()
+
+        def run_stage(stage):
+            entry = entries[stage.name]
+            try:
+                waited = time.monotonic()
+                with get_model_residency().using(stage.models(context)):
+                    started = time.monotonic()
+                    with cond:
+                        entry.update(status='running', started_at=datetime.utcnow().isoformat(),
+                                     model_wait=round(started - waited, 3))
+                        changed()
+                    output = call_ai_services(stage.endpoint, stage.payload(context, outputs), job_data['job_id'])
+
+                with cond:
+                    outputs[stage.name] = output
+                    entry.update(status='completed', completed_at=datetime.utcnow().isoformat(),
+                                 duration=round(time.monotonic() - started, 3), output=output)
+                    changed()
+
+            except Exception as e:
+                with cond:
+                    errors.append(StageError(stage.name, e))
+                    entry.update(status='failed', error=str(e), completed_at=datetime.utcnow().isoformat())
+                    changed()
+
+            finally:
+                with cond:
+                    running.discard(stage.name)
+                    cond.notify()
+
+        with cond:
+            while True:
+                if errors:
+                    if not running:
+                        raise errors[0]
+                else:
+                    for stage in self.stages:
+                        if entries[stage.name]['status'] == 'pending' and all(need in outputs for need in stage.needs):
+                            entries[stage.name]['status'] = 'starting'
+                            running.add(stage.name)
+                            threading.Thread(
+                                target=run_stage,
+                                args=(stage,),
+                                name=f"stage-{stage.name}-{job_data['job_id'][:8]}",
+                                daemon=True
+                            ).start()
+
+                    if len(outputs) == len(self.stages):
+                        return outputs
+                cond.wait()
@@ -0,0 +1,423 @@
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import logging
+from datetime import datetime
+import requests
+from config import Config
+from services.json_store import write_json_atomic
+from services.settings_store import get_setting
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR = os.path.join(Config.DATA_DIR, 'upload_sessions')
+MAX_BACKOFF = 60
+
+class UploadError(Exception):
+    """Non-retryable upload failure (rejected request, exhausted retries)"""
+
+class RetryableUploadError(Exception):
+    """Transient failure (connection error, 5xx) worth retrying from the committed offset"""
+
+class SessionExpiredError(Exception):
+    """The platform no longer knows the upload session; start a new one from byte zero"""
+
+class PlatformUploader:
+    """Base class for platforms accepting chunked, resumable uploads"""
+
+    name = None
+
+    def start_session(self, size, metadata):
+        """Open an upload session, returns an opaque session reference"""
+        raise NotImplementedError
+
+    def query_offset(self, session, size):
+        """Get the committed byte offset, or the final result dict if already complete"""
+        raise NotImplementedError
+
+    def upload_chunk(self, session, data, offset, size):
+        """Send one chunk, returns the new committed offset or the final result dict"""
+        raise NotImplementedError
+
+    def format_result(self, response_data):
+        """Map the platform's completion response to an upload result"""
+        return {'success': True, 'platform': self.name, **response_data}
+
+class HttpResumableUploader(PlatformUploader):
+    """Resumable protocol modelled on YouTube's resumable uploads
+
+    POST <base_url> with the metadata opens a session (Location header).
+    Chunks are PUT to the session URL with Content-Range; 308 means more is
+    expected and its Range header gives the committed bytes. 200/201 ends
+    the upload. An empty PUT with "Content-Range: bytes */<size>" asks for
+    the current offset.
+    """
+
+    def __init__(self, name, base_url, access_token='', timeout=300):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.http = requests.Session()
+        if access_token:
+            self.http.headers['Authorization'] = f"Bearer {access_token}"
+
+    def _call(self, method, url, **kwargs):
+        try:
+            response = self.http.request(method, url, timeout=(5, self.timeout), **kwargs)
+        except requests.RequestException as e:
+            raise RetryableUploadError(str(e))
+
+        if response.status_code in [404, 410]:
+            raise SessionExpiredError(f"{self.name} upload session expired")
+        if response.status_code >= 500 or response.status_code == 429:
+            raise RetryableUploadError(f"{self.name} returned {response.status_code}")
+        if response.status_code >= 400:
+            raise UploadError(f"{self.name} rejected upload: {response.status_code} {response.text[:200]}")
+        return response
+
+    def _offset_or_result(self, response):
+        if response.status_code in [200, 201]:
+            return self.format_result(response.json() if response.content else {})
+
+        # 308 Resume Incomplete: "Range: bytes=0-<last committed byte>"
+        match = re.match(r'bytes=0-(\d+)', response.headers.get('Range', ''))
+        return int(match.group(1)) + 1 if match else 0
+
+    def start_session(self, size, metadata):
+        response = self._call('POST', self.base_url, json=metadata, headers={
+            'X-Upload-Content-Length': str(size),
+            'X-Upload-Content-Type': 'video/mp4'
+        })
+        session_url = response.headers.get('Location')
+        if not session_url:
+            raise UploadError(f"{self.name} did not return an upload session")
+        return session_url
+
+    def query_offset(self, session, size):
+        response = self._call('PUT', session, headers={'Content-Range': f"bytes */{size}"})
+        return self._offset_or_result(response)
+
+    def upload_chunk(self, session, data, offset, size):
+        end = offset + len(data) - 1
+        response = self._call('PUT', session, data=data, headers={
+            'Content-Range': f"bytes {offset}-{end}/{size}",
+            'Content-Type': 'video/mp4'
+        })
+        return self._offset_or_result(response)
+
+class YouTubeUploader(HttpResumableUploader):
+    def __init__(self, base_url, access_token='', timeout=300):
+        super().__init__('youtube', base_url, access_token, timeout)
+
+    def format_result(self, response_data):
+        video_id = response_data.get('id')
+        return {
+            'success': True,
+            'platform': 'youtube',
+            'video_id': video_id,
+            'url': response_data.get('url') or f"https://youtube.com/shorts/{video_id}",
+            'uploaded_at': datetime.utcnow().isoformat()
+        }
+
+class InstagramUploader(HttpResumableUploader):
+    def __init__(self, base_url, access_token='', timeout=300):
+        super().__init__('instagram', base_url, access_token, timeout)
+
+    def format_result(self, response_data):
+        post_id = response_data.get('id')
+        return {
+            'success': True,
+            'platform': 'instagram',
+            'post_id': post_id,
+            'url': response_data.get('url') or f"https://instagram.com/reel/{post_id}",
+            'uploaded_at': datetime.utcnow().isoformat()
+        }
+
+class ResumableUploadEngine:
+    """Drives a PlatformUploader chunk by chunk with persisted offsets
+
+    The session reference and committed offset are saved after every chunk
+    under data/upload_sessions, so an interrupted upload (crash, restart,
+    exhausted retries) continues from the last committed byte the next time
+    the same upload key is sent. Transient failures back off exponentially
+    with jitter, up to max_retries consecutive failures without progress.
+    An upload still running at its deadline stops between chunks and keeps
+    its session for the next attempt.
+    """
+
+    def __init__(self, sessions_dir, chunk_size, max_retries, backoff=1.0):
+        self.sessions_dir = sessions_dir
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _state_file(self, upload_key):
+        return os.path.join(self.sessions_dir, f"{upload_key}.json")
+
+    def _load_state(self, upload_key):
+        try:
+            with open(self._state_file(upload_key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_state(self, upload_key, state):
+        write_json_atomic(self._state_file(upload_key), state, indent=None)
+
+    def _clear_state(self, upload_key):
+        try:
+            os.remove(self._state_file(upload_key))
+        except FileNotFoundError:
+            pass
+
+    def _check_deadline(self, uploader, deadline, state, wait=0):
+        if deadline is not None and time.monotonic() + wait >= deadline:
+            raise UploadError(
+                f"{uploader.name} upload timed out at byte {state['offset'] if state else 0}, "
+                f"it resumes from there when retried"
+            )
+
+    def upload(self, uploader, video_path, metadata, upload_key, deadline=None):
+        """Upload a file, resuming a persisted session if one exists, returns the result dict
+
+        deadline is a time.monotonic() value after which no chunk is started.
+        """
+        size = os.path.getsize(video_path)
+        state = self._load_state(upload_key)
+        if state and (state.get('size') != size or state.get('platform') != uploader.name):
+            state = None
+
+        retries = 0
+        resync = state is not None
+
+        while True:
+            try:
+                if state is None:
+                    state = {
+                        'platform': uploader.name,
+                        'session': uploader.start_session(size, metadata),
+                        'offset': 0,
+                        'size': size,
+                        'started_at': datetime.utcnow().isoformat()
+                    }
+                    self._save_state(upload_key, state)
+
+                if resync:
+                    # Ask the platform what it actually committed before sending more
+                    committed = uploader.query_offset(state['session'], size)
+                    if isinstance(committed, dict):
+                        self._clear_state(upload_key)
+                        return committed
+                    state['offset'] = committed
+                    self._save_state(upload_key, state)
+                    resync = False
+
+                with open(video_path, 'rb') as f:
+                    while True:
+                        self._check_deadline(uploader, deadline, state)
+                        f.seek(state['offset'])
+                        data = f.read(self.chunk_size)
+                        outcome = uploader.upload_chunk(state['session'], data, state['offset'], size)
+
+                        if isinstance(outcome, dict):
+                            self._clear_state(upload_key)
+                            logger.info(f"{uploader.name} upload {upload_key} completed")
+                            return outcome
+
+                        if outcome <= state['offset'] and data:
+                            raise RetryableUploadError(f"{uploader.name} did not commit any bytes")
+
+                        state['offset'] = outcome
+                        self._save_state(upload_key, state)
+                        retries = 0
+
+            except SessionExpiredError as e:
+                logger.warning(f"{str(e)}, restarting {upload_key} from byte zero")
+                self._clear_state(upload_key)
+                state = None
+                resync = False
+
+            except RetryableUploadError as e:
+                if retries >= self.max_retries:
+                    raise UploadError(f"{uploader.name} upload failed after {retries} retries: {str(e)}")
+
+                delay = min(MAX_BACKOFF, self.backoff * (2 ** retries))
+                delay = random.uniform(delay / 2, delay)
+                self._check_deadline(uploader, deadline, state, delay)
+                retries += 1
+                logger.warning(
+                    f"{uploader.name} upload {upload_key} failed at byte {state['offset'] if state else 0} "
+                    f"({str(e)}), retry {retries}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                resync = state is not None
+
+def get_uploader(platform):
+    """Get the uploader for a platform, or None when no upload endpoint is configured"""
+    timeout = get_setting('social_media', 'upload_timeout', 300)
+    if platform == 'youtube' and Config.YOUTUBE_UPLOAD_URL:
+        return YouTubeUploader(Config.YOUTUBE_UPLOAD_URL, Config.YOUTUBE_ACCESS_TOKEN, timeout)
+    if platform == 'instagram' and Config.INSTAGRAM_UPLOAD_URL:
+        return InstagramUploader(Config.INSTAGRAM_UPLOAD_URL, Config.INSTAGRAM_ACCESS_TOKEN, timeout)
+    return None
+
+def get_upload_engine(max_retries):
+    return ResumableUploadEngine(SESSIONS_DIR, Config.UPLOAD_CHUNK_SIZE, max_retries)
+
+def idempotency_key(video_hash, platform, title):
+    """Stable key identifying one platform upload of a video
+
+    Used both to reject double submits and as the resumable session key.
+    """
+    return hashlib.sha256(f"{video_hash}:{platform}:{title}".encode()).hexdigest()[:32]
+
+def _is_servable(path):
+    """Only files under GENERATED_DIR or UPLOADS_DIR may be uploaded"""
+    real = os.path.realpath(path)
+    for directory in [Config.GENERATED_DIR, Config.UPLOADS_DIR]:
+        root = os.path.realpath(directory)
+        if os.path.commonpath([real, root]) == root:
+            return os.path.isfile(real)
+    return False
+
+def local_video_file(video_url):
+    """Map a local path or /generated/<file> URL to a file, or None
+
+    Paths are resolved (symlinks included) and must lie under GENERATED_DIR
+    or UPLOADS_DIR, so a request cannot upload arbitrary server files.
+    """
+    if video_url.startswith(('http://', 'https://')):
+        return None
+
+    for path in [video_url, os.path.join(Config.GENERATED_DIR, os.path.basename(video_url))]:
+        if _is_servable(path):
+            return os.path.realpath(path)
+    return None
+
+def video_fingerprint(video_url):
+    """SHA-256 of a local video's real path, size and mtime, or of its URL
+
+    Cheap enough to compute inside the upload request: the file is never
+    read, and rewriting it gives a new fingerprint.
+    """
+    path = local_video_file(video_url)
+    if path is None:
+        return hashlib.sha256(video_url.encode()).hexdigest()
+
+    stat = os.stat(path)
+    return hashlib.sha256(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+
+def resolve_video_file(video_url):
+    """Map a video URL or path to a local file, downloading remote videos once"""
+    local_path = local_video_file(video_url)
+    if local_path:
+        return local_path
+
+    if video_url.startswith(('http://', 'https://')):
+        download_dir = os.path.join(Config.GENERATED_DIR, 'downloads')
+        os.makedirs(download_dir, exist_ok=True)
+        local_path = os.path.join(download_dir, f"{hashlib.sha256(video_url.encode()).hexdigest()[:32]}.mp4")
+
+        if not os.path.isfile(local_path):
+            tmp_path = f"{local_path}.part"
+            with requests.get(video_url, stream=True, timeout=(5, 120)) as response:
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+            os.replace(tmp_path, local_path)
+        return local_path
+
+    raise UploadError(f"Video not found: {video_url}")
+
+def resumable_upload(platform, video_url, metadata, session_key):
+    """Chunked, resumable upload through the platform's configured uploader
+
+    social_media.upload_timeout bounds the whole upload (from the first
+    request to the last chunk) as well as each call to the platform.
+    """
+    deadline = time.monotonic() + float(get_setting('social_media', 'upload_timeout', 300))
+    engine = get_upload_engine(int(get_setting('social_media', 'max_upload_retries', 3)))
+    return engine.upload(get_uploader(platform), resolve_video_file(video_url), metadata, session_key, deadline)
+
+def upload_to_platform(platform, upload_record, session_key):
+    """Upload a record's video to a single platform"""
+    if platform == 'youtube':
+        return upload_to_youtube(upload_record, session_key)
+
+    elif platform == 'instagram':
+        return upload_to_instagram(upload_record, session_key)
+
+    logger.warning(f"Unsupported platform: {platform}")
+    return {
+        'success': False,
+        'error': 'Unsupported platform'
+    }
+
+def upload_to_youtube(upload_record, session_key):
+    """Upload video to YouTube Shorts"""
+    title = upload_record['title']
+    try:
+        if get_uploader('youtube'):
+            return resumable_upload('youtube', upload_record['video_url'], {
+                'snippet': {
+                    'title': title,
+                    'description': upload_record.get('description', ''),
+                    'tags': upload_record.get('tags', [])
+                },
+                'status': {'privacyStatus': 'public'},
+                'thumbnail_style': upload_record.get('thumbnail_style', 'modern')
+            }, session_key)
+
+        # No upload endpoint configured, return mock success
+        logger.info(f"Mock YouTube upload: {title}")
+
+        return {
+            'success': True,
+            'platform': 'youtube',
+            'video_id': f"yt_{int(datetime.utcnow().timestamp())}",
+            'url': f"https://youtube.com/shorts/mock_video_id",
+            'uploaded_at': datetime.utcnow().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"YouTube upload error: {str(e)}")
+        return {
+            'success': False,
+            'platform': 'youtube',
+            'error': str(e)
+        }
+
+def upload_to_instagram(upload_record, session_key):
+    """Upload video to Instagram Reels"""
+    title = upload_record['title']
+    try:
+        if get_uploader('instagram'):
+            caption = [upload_record.get('description', '')] + [f"#{tag}" for tag in upload_record.get('tags', [])]
+            return resumable_upload('instagram', upload_record['video_url'], {
+                'title': title,
+                'caption': ' '.join(caption).strip(),
+                'media_type': 'REELS'
+            }, session_key)
+
+        # No upload endpoint configured, return mock success
+        logger.info(f"Mock Instagram upload: {title}")
+
+        return {
+            'success': True,
+            'platform': 'instagram',
+            'post_id': f"ig_{int(datetime.utcnow().timestamp())}",
+            'url': f"https://instagram.com/reel/mock_post_id",
+            'uploaded_at': datetime.utcnow().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Instagram upload error: {str(e)}")
+        return {
+            'success': False,
+            'platform': 'instagram',
+            'error': str(e)
+        }
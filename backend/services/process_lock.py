@@ -0,0 +1,43 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single process, in-process locking only
+    fcntl = None
+
+@contextmanager
+def process_lock(path):
+    """Hold an exclusive flock on path (created if missing) against other server processes
+
+    Threads of one process are not excluded by this; callers pair it with
+    their own threading lock. Without fcntl it does nothing.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def try_hold_process_lock(path):
+    """Take an exclusive flock on path without waiting, returns the open lock file or None
+
+    The lock is held until the returned file is closed (or the process
+    exits). None means another process holds it. Without fcntl the lock
+    is always granted.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    lock_file = open(path, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return None
+    return lock_file
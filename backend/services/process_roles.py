@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+import logging
+
+from config import Config
+from services.process_lock import try_hold_process_lock
+from services.scheduler import start_scheduler
+from services.job_queue import start_job_queue
+from services.artifact_cache import start_artifact_cache
+from services.upload_queue import start_upload_queue
+from services.system_sampler import start_system_sampler
+from services.model_residency import start_model_residency
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_LOCK_FILE = os.path.join(Config.DATA_DIR, 'background.lock')
+
+def start_background_services():
+    """Start the scheduler, the AI services worker pool, the upload workers, the system sampler and the pinned model preload"""
+    start_scheduler()
+    start_artifact_cache()
+    start_job_queue()
+    start_upload_queue()
+    start_system_sampler()
+    start_model_residency()
+
+class BackgroundRole:
+    """Elects the one server process that runs the background services
+
+    Every process tries a non-blocking flock on data/background.lock and
+    the holder starts the services. The lock is held for the life of the
+    process, so when the owner exits (crash, reload) the OS releases it and
+    the next process to retry takes over, recovering queued and interrupted
+    work from the stores.
+    """
+
+    def __init__(self, lock_path, start_services, retry_interval):
+        self.lock_path = lock_path
+        self.start_services = start_services
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._owner = False
+        self._listeners = []
+
+    @property
+    def is_owner(self):
+        return self._owner
+
+    def add_claim_listener(self, callback):
+        """Register a callback() invoked once this process becomes the owner"""
+        self._listeners.append(callback)
+
+    def try_claim(self):
+        """Take the background role if no other process holds it, returns True when owned"""
+        with self._lock:
+            if self._owner:
+                return True
+
+            lock_file = try_hold_process_lock(self.lock_path)
+            if lock_file is None:
+                return False
+            self._lock_file = lock_file
+            self._owner = True
+
+        logger.info(f"Process {os.getpid()} owns the background services")
+        for callback in self._listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Background claim listener error: {str(e)}")
+        self.start_services()
+        return True
+
+    def elect(self):
+        """Claim now, or keep retrying in a daemon thread until the current owner goes away"""
+        if self.try_claim():
+            return
+
+        def retry():
+            while not self.try_claim():
+                time.sleep(self.retry_interval)
+
+        threading.Thread(target=retry, name='background-election', daemon=True).start()
+
+_role = None
+_role_lock = threading.Lock()
+
+def get_background_role():
+    """Get this process's background role (unclaimed until elect())"""
+    global _role
+
+    if _role is None:
+        with _role_lock:
+            if _role is None:
+                _role = BackgroundRole(BACKGROUND_LOCK_FILE, start_background_services, Config.PROCESS_SYNC_INTERVAL * 5)
+    return _role
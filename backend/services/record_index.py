@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import base64
+import bisect
+import threading
+import logging
+from config import Config
+from services.metrics import timed
+
+logger = logging.getLogger(__name__)
+
+class RecordIndex:
+    """Sorted in-memory index over a directory of JSON records
+
+    Only the fields needed to sort and filter are kept in memory; full
+    records are read from disk for the page being returned. The directory
+    is re-scanned when its mtime changes or the index is older than
+    max_age, and only new or modified files are parsed again.
+    """
+
+    def __init__(self, records_dir, sort_field, max_age):
+        self.records_dir = records_dir
+        self.sort_field = sort_field
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}  # record id -> entry
+        self._order = []  # sorted (sort_key, record id)
+        self._dir_mtime = None
+        self._scanned_at = 0
+
+    def _entry(self, record_id, path, stat):
+        with open(path, 'r') as f:
+            record = json.load(f)
+
+        platforms = record.get('platforms') or []
+        if isinstance(platforms, str):
+            platforms = [platforms]
+
+        return {
+            'id': record_id,
+            'path': path,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sort_key': record.get(self.sort_field) or '',
+            'persona_id': record.get('persona_id'),
+            'status': record.get('status'),
+            'platforms': set(platforms)
+        }
+
+    def _needs_scan(self):
+        try:
+            dir_mtime = os.stat(self.records_dir).st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+        return dir_mtime != self._dir_mtime or time.monotonic() - self._scanned_at > self.max_age
+
+    def refresh(self, force=False):
+        """Re-scan the directory, parsing only new or changed files"""
+        with self._lock:
+            if not force and not self._needs_scan():
+                return
+            with timed('record_index.scan'):
+                self._scan()
+
+    def _scan(self):
+        # Called with self._lock held
+        entries = {}
+        if os.path.isdir(self.records_dir):
+            self._dir_mtime = os.stat(self.records_dir).st_mtime_ns
+            with os.scandir(self.records_dir) as it:
+                for dir_entry in it:
+                    if not dir_entry.name.endswith('.json'):
+                        continue
+                    record_id = dir_entry.name[:-5]
+                    try:
+                        stat = dir_entry.stat()
+                        cached = self._entries.get(record_id)
+                        if cached and cached['mtime'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                            entries[record_id] = cached
+                        else:
+                            entries[record_id] = self._entry(record_id, dir_entry.path, stat)
+                    except (OSError, ValueError) as e:
+                        logger.error(f"Index record {dir_entry.name} error: {str(e)}")
+        else:
+            self._dir_mtime = None
+
+        self._entries = entries
+        self._order = sorted((e['sort_key'], e['id']) for e in entries.values())
+        self._scanned_at = time.monotonic()
+
+    def upsert(self, record_id):
+        """Index a single record right after it was written"""
+        path = os.path.join(self.records_dir, f"{record_id}.json")
+        entry = self._entry(record_id, path, os.stat(path))
+
+        with self._lock:
+            previous = self._entries.get(record_id)
+            if previous:
+                self._order.remove((previous['sort_key'], record_id))
+            self._entries[record_id] = entry
+            bisect.insort(self._order, (entry['sort_key'], record_id))
+
+    def _matches(self, entry, filters):
+        if filters.get('persona') and entry['persona_id'] != filters['persona']:
+            return False
+        if filters.get('status') and entry['status'] != filters['status']:
+            return False
+        if filters.get('platform') and filters['platform'] not in entry['platforms']:
+            return False
+        if filters.get('since') and entry['sort_key'] < filters['since']:
+            return False
+        if filters.get('until') and entry['sort_key'] > filters['until']:
+            return False
+        return True
+
+    def _iter_entries(self, filters, order, after):
+        """Yield matching index entries in order, strictly after the cursor"""
+        self.refresh()
+        with self._lock:
+            keys = list(self._order)
+            entries = self._entries
+
+        if order == 'desc':
+            end = bisect.bisect_left(keys, after) if after else len(keys)
+            candidates = reversed(keys[:end])
+        else:
+            start = bisect.bisect_right(keys, after) if after else 0
+            candidates = keys[start:]
+
+        for key in candidates:
+            entry = entries.get(key[1])
+            if entry and self._matches(entry, filters):
+                yield entry
+
+    def _load(self, entry):
+        with timed('record_index.load'), open(entry['path'], 'r') as f:
+            return json.load(f)
+
+    def page(self, filters, order='desc', after=None, limit=50):
+        """Get one page of records and the cursor for the next page"""
+        items = []
+        last = None
+
+        for entry in self._iter_entries(filters, order, after):
+            if len(items) == limit:
+                return items, encode_cursor(last)
+            try:
+                items.append(self._load(entry))
+                last = (entry['sort_key'], entry['id'])
+            except (OSError, ValueError) as e:
+                logger.error(f"Load record {entry['id']} error: {str(e)}")
+
+        return items, None
+
+    def iter_records(self, filters, order='desc', after=None):
+        """Stream matching records one at a time"""
+        for entry in self._iter_entries(filters, order, after):
+            try:
+                yield self._load(entry)
+            except (OSError, ValueError) as e:
+                logger.error(f"Load record {entry['id']} error: {str(e)}")
+
+def encode_cursor(key):
+    """Encode a (sort_key, record id) pair as an opaque cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raises ValueError if malformed"""
+    try:
+        sort_key, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (str(sort_key), str(record_id))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+# Record directories under Config.DATA_DIR and the field they are sorted by
+INDEXED_RECORDS = {
+    'posts': 'created_at'
+}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_record_index(name):
+    """Get the shared index for one of INDEXED_RECORDS"""
+    with _indexes_lock:
+        if name not in _indexes:
+            _indexes[name] = RecordIndex(
+                os.path.join(Config.DATA_DIR, name),
+                INDEXED_RECORDS[name],
+                Config.RECORD_INDEX_MAX_AGE
+            )
+        return _indexes[name]
@@ -0,0 +1,159 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from config import Config
+from services.json_store import get_document
+
+logger = logging.getLogger(__name__)
+
+SCHEDULES_FILE = os.path.join(Config.DATA_DIR, 'schedules.json')
+
+def schedules_document():
+    return get_document(SCHEDULES_FILE, get_default_schedules)
+
+def load_schedules():
+    """Load schedules from JSON file"""
+    try:
+        return schedules_document().read()[0]
+            
+    except Exception as e:
+        logger.error(f"Load schedules error: {str(e)}")
+        return get_default_schedules()
+
+def save_schedules(schedules):
+    """Save schedules to JSON file"""
+    try:
+        schedules_document().write(schedules)
+            
+    except Exception as e:
+        logger.error(f"Save schedules error: {str(e)}")
+
+def modify_schedules(mutate):
+    """Apply mutate(schedules) in place and save, retrying on concurrent writes"""
+    return schedules_document().update(mutate)
+
+def update_schedule(schedule_id, fields):
+    """Apply field updates to one schedule, returns the updated schedule or None"""
+    def apply(schedules):
+        schedule = next((s for s in schedules if s['id'] == schedule_id), None)
+        if schedule:
+            schedule.update(fields)
+        return schedule
+
+    return modify_schedules(apply)
+
+def set_schedule_status(schedule, status):
+    """Set status in place; reactivating moves next_run to the next slot from now
+
+    A schedule paused past its next_run would otherwise fire for the run it
+    missed as soon as it is reactivated.
+    """
+    if status == 'active' and schedule.get('status') != 'active':
+        schedule['next_run'] = calculate_next_run(schedule['frequency'], schedule['time'], schedule.get('days', []))
+    schedule['status'] = status
+
+def calculate_next_run(frequency, time, days):
+    """Calculate next run time for a schedule"""
+    try:
+        now = datetime.utcnow()
+        hour, minute = map(int, time.split(':'))
+        
+        if frequency == 'daily':
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+        
+        elif frequency == 'weekly':
+            # Find next occurrence of specified days
+            if not days:
+                # Default to weekly from today
+                next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                next_run += timedelta(days=7)
+            else:
+                # Find next day in the list
+                weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+                current_weekday = now.weekday()
+                
+                target_days = [weekdays.index(day.lower()) for day in days if day.lower() in weekdays]
+                target_days.sort()
+                
+                next_day = None
+                for day in target_days:
+                    if day > current_weekday:
+                        next_day = day
+                        break
+                
+                if next_day is None:
+                    next_day = target_days[0] if target_days else current_weekday
+                    days_ahead = 7 - current_weekday + next_day
+                else:
+                    days_ahead = next_day - current_weekday
+                
+                next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                next_run += timedelta(days=days_ahead)
+        
+        elif frequency == 'monthly':
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                # Move to next month
+                if now.month == 12:
+                    next_run = next_run.replace(year=now.year + 1, month=1)
+                else:
+                    next_run = next_run.replace(month=now.month + 1)
+        
+        else:
+            # Default to daily
+            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += timedelta(days=1)
+        
+        return next_run.isoformat()
+        
+    except Exception as e:
+        logger.error(f"Calculate next run error: {str(e)}")
+        # Return tomorrow at the specified time as fallback
+        tomorrow = datetime.utcnow() + timedelta(days=1)
+        return tomorrow.replace(hour=12, minute=0, second=0, microsecond=0).isoformat()
+
+def get_default_schedules():
+    """Get default schedules"""
+    return [
+        {
+            'id': 'schedule_001',
+            'name': 'Daily Tech Tips',
+            'persona_id': 'tech_guru_hindi',
+            'frequency': 'daily',
+            'time': '14:00',
+            'days': [],
+            'platforms': ['youtube', 'instagram'],
+            'theme': 'ai_tips',
+            'duration': 30,
+            'auto_post': True,
+            'status': 'active',
+            'next_run': calculate_next_run('daily', '14:00', []),
+            'last_run': '2024-01-15T14:00:00Z',
+            'total_runs': 25,
+            'success_rate': 96,
+            'created_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.utcnow().isoformat()
+        },
+        {
+            'id': 'schedule_002',
+            'name': 'Weekly Workout',
+            'persona_id': 'fitness_coach',
+            'frequency': 'weekly',
+            'time': '08:00',
+            'days': ['monday', 'wednesday', 'friday'],
+            'platforms': ['instagram'],
+            'theme': 'workout_tips',
+            'duration': 25,
+            'auto_post': True,
+            'status': 'active',
+            'next_run': calculate_next_run('weekly', '08:00', ['monday', 'wednesday', 'friday']),
+            'last_run': '2024-01-15T08:00:00Z',
+            'total_runs': 12,
+            'success_rate': 100,
+            'created_at': datetime.utcnow().isoformat(),
+            'updated_at': datetime.utcnow().isoformat()
+        }
+    ]
\ No newline at end of file
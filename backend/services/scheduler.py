@@ -0,0 +1,176 @@
+import heapq
+import threading
+import logging
+from datetime import datetime
+from config import Config
+from services.generation import build_automated_job
+from services.job_queue import get_job_queue, enqueue_job
+from services.schedule_store import (
+    schedules_document, load_schedules, update_schedule, modify_schedules, calculate_next_run
+)
+
+logger = logging.getLogger(__name__)
+
+def parse_time(value):
+    """Parse a stored ISO timestamp (with or without trailing Z) as naive UTC"""
+    return datetime.fromisoformat(value.replace('Z', '')) if value else None
+
+class SchedulerEngine(threading.Thread):
+    """Fires active schedules at their next_run
+
+    Due times live in a min-heap of (next_run, schedule_id); the thread
+    sleeps on a condition until the earliest one and is woken early only by
+    reload() or stop(). Heap entries are checked against the stored schedule
+    when popped, so edits only need a reload() to take effect. Edits made in
+    other server processes are noticed by a watcher thread that compares
+    the schedules file version every Config.PROCESS_SYNC_INTERVAL seconds
+    and calls reload() when it changes. Due runs go to the job queue's
+    scheduled lane, whose worker pool is bounded by Config.MAX_CONCURRENT_JOBS.
+    """
+
+    def __init__(self):
+        super().__init__(name='scheduler', daemon=True)
+        self._heap = []
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._version = None
+        self._watcher = threading.Thread(target=self._watch, name='scheduler-watch', daemon=True)
+
+    def reload(self):
+        """Rebuild the heap from the stored schedules and wake the loop"""
+        version = schedules_document().version()
+        heap = []
+        for schedule in load_schedules():
+            if schedule.get('status') == 'active' and schedule.get('next_run'):
+                heap.append((parse_time(schedule['next_run']), schedule['id']))
+        heapq.heapify(heap)
+
+        with self._cond:
+            self._heap = heap
+            self._version = version
+            self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _watch(self):
+        """Reload when another process rewrites the schedules file"""
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: self._stopped, timeout=Config.PROCESS_SYNC_INTERVAL):
+                    return
+                version = self._version
+            try:
+                if schedules_document().version() != version:
+                    self.reload()
+            except Exception as e:
+                logger.error(f"Scheduler watch error: {str(e)}")
+
+    def run(self):
+        self.reload()
+        self._watcher.start()
+        logger.info("Scheduler started")
+
+        while True:
+            with self._cond:
+                if self._stopped:
+                    return
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                due_at, schedule_id = self._heap[0]
+                delay = (due_at - datetime.utcnow()).total_seconds()
+                if delay > 0:
+                    self._cond.wait(timeout=delay)
+                    continue
+
+                heapq.heappop(self._heap)
+
+            try:
+                self._fire(schedule_id, due_at)
+            except Exception as e:
+                logger.error(f"Scheduler fire error for {schedule_id}: {str(e)}")
+
+    def _fire(self, schedule_id, due_at):
+        schedule = next((s for s in load_schedules() if s['id'] == schedule_id), None)
+
+        # Skip entries made stale by an edit, pause or delete since they were queued
+        if not schedule or schedule.get('status') != 'active' or parse_time(schedule.get('next_run')) != due_at:
+            return
+
+        # Advance next_run first so the schedule cannot fire twice
+        next_run = calculate_next_run(schedule['frequency'], schedule['time'], schedule.get('days', []))
+        update_schedule(schedule_id, {'next_run': next_run})
+        with self._cond:
+            heapq.heappush(self._heap, (parse_time(next_run), schedule_id))
+
+        self.run_now(schedule)
+
+    def run_now(self, schedule):
+        """Create a job for the schedule and queue it on the scheduled lane, returns the job ID"""
+        payload = {
+            'persona_id': schedule['persona_id'],
+            'theme': schedule.get('theme', ''),
+            'duration': schedule.get('duration', 30),
+            'platforms': schedule.get('platforms', ['youtube']),
+            'auto_upload': schedule.get('auto_post', True)
+        }
+
+        job_data = build_automated_job(payload, source='scheduled', schedule_id=schedule['id'])
+        enqueue_job(job_data)
+
+        logger.info(f"Schedule {schedule['id']} queued job {job_data['job_id']}")
+        return job_data['job_id']
+
+def on_job_finished(job_data):
+    """Job queue completion hook recording the outcome of scheduled runs"""
+    if job_data.get('schedule_id'):
+        record_run(job_data['schedule_id'], job_data.get('status') == 'completed')
+
+def record_run(schedule_id, succeeded):
+    """Update last_run, total_runs and success_rate after a schedule run"""
+    def apply(schedules):
+        schedule = next((s for s in schedules if s['id'] == schedule_id), None)
+        if not schedule:
+            return
+
+        total_runs = schedule.get('total_runs', 0)
+        success_rate = schedule.get('success_rate', 100)
+        new_rate = (success_rate * total_runs + (100 if succeeded else 0)) / (total_runs + 1)
+
+        schedule.update({
+            'last_run': datetime.utcnow().isoformat(),
+            'total_runs': total_runs + 1,
+            'success_rate': round(new_rate)
+        })
+
+    modify_schedules(apply)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Get the shared scheduler engine (not started)"""
+    global _scheduler
+
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                get_job_queue().add_completion_listener(on_job_finished)
+                _scheduler = SchedulerEngine()
+    return _scheduler
+
+def start_scheduler():
+    """Start the scheduler thread if enabled"""
+    scheduler = get_scheduler()
+    if Config.SCHEDULER_ENABLED and not scheduler.is_alive():
+        scheduler.start()
+    return scheduler
+
+def notify_schedules_changed():
+    """Reload the running scheduler after schedules are created, edited or deleted"""
+    if _scheduler is not None and _scheduler.is_alive():
+        _scheduler.reload()
@@ -0,0 +1,82 @@
+import os
+import logging
+from datetime import datetime
+from config import Config
+from services.json_store import get_document
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FILE = os.path.join(Config.DATA_DIR, 'settings.json')
+
+def settings_document():
+    return get_document(SETTINGS_FILE, get_default_settings)
+
+def load_settings():
+    """Load settings from JSON file"""
+    try:
+        return settings_document().read()[0]
+            
+    except Exception as e:
+        logger.error(f"Load settings error: {str(e)}")
+        return get_default_settings()
+
+def save_settings(settings):
+    """Save settings to JSON file"""
+    try:
+        settings_document().write(settings)
+            
+    except Exception as e:
+        logger.error(f"Save settings error: {str(e)}")
+
+def update_settings_category(category, values):
+    """Merge values into one settings category, returns the category or None if unknown"""
+    def apply(settings):
+        if category not in settings:
+            return None
+        settings[category].update(values)
+        settings['last_updated'] = datetime.utcnow().isoformat()
+        return settings[category]
+
+    return settings_document().update(apply)
+
+def get_default_settings():
+    """Get default settings"""
+    return {
+        'general': {
+            'app_name': 'BuzzSnip',
+            'app_version': '1.0.0',
+            'max_video_duration': 60,
+            'default_resolution': '1080p',
+            'auto_cleanup_days': 30,
+            'max_concurrent_jobs': 3
+        },
+        'ai_models': {
+            'stable_diffusion_model': 'realistic-vision-v5',
+            'voice_model': 'bark',
+            'lip_sync_model': 'sadtalker',
+            'upscaling_model': 'real-esrgan',
+            'llm_model': 'tinyllama'
+        },
+        'social_media': {
+            'youtube_api_key': '••••••••••••••••',
+            'instagram_username': '•��••••••••••••••',
+            'auto_upload_enabled': True,
+            'max_upload_retries': 3,
+            'upload_timeout': 300
+        },
+        'storage': {
+            'output_directory': '/app/output',
+            'temp_directory': '/app/temp',
+            'models_directory': '/app/models',
+            'max_storage_gb': 100,
+            'auto_cleanup_enabled': True
+        },
+        'last_updated': datetime.utcnow().isoformat()
+    }
+
+def get_setting(category, key, default=None):
+    """Get one setting value, falling back to the defaults"""
+    value = load_settings().get(category, {}).get(key)
+    if value is None:
+        value = get_default_settings().get(category, {}).get(key, default)
+    return value
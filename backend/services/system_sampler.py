@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+import psutil
+from config import Config
+from services.json_store import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+METRIC_FIELDS = ['cpu_usage', 'memory_usage', 'disk_usage', 'gpu_usage']
+
+# Written by the sampling process, read by every other server process
+PUBLISHED_SAMPLES_FILE = os.path.join(Config.DATA_DIR, 'system_metrics.json')
+
+def format_sample(sample):
+    sample = dict(sample)
+    sample['timestamp'] = datetime.utcfromtimestamp(sample.pop('time')).isoformat()
+    return sample
+
+def summarize(samples, window):
+    """Get min/avg/max of each metric over the samples from the last `window` seconds"""
+    cutoff = time.time() - window
+    samples = [s for s in samples if s['time'] >= cutoff]
+
+    if not samples:
+        return None
+
+    summary = {'window': window, 'samples': len(samples)}
+    for field in METRIC_FIELDS:
+        values = [s[field] for s in samples]
+        summary[field] = {
+            'min': min(values),
+            'avg': round(sum(values) / len(values), 2),
+            'max': max(values)
+        }
+    return summary
+
+class SystemSampler(threading.Thread):
+    """Background thread recording CPU, memory, disk and GPU usage into a ring buffer
+
+    With a publish_path the buffer is also written there after every
+    sample, for server processes that do not run the sampler.
+    """
+
+    def __init__(self, interval, history_size, disk_path='/', publish_path=None):
+        super().__init__(name='system-sampler', daemon=True)
+        self.interval = interval
+        self.disk_path = disk_path
+        self.publish_path = publish_path
+        self._samples = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._gputil = None
+
+        # Probe for GPUtil once instead of on every sample
+        try:
+            import GPUtil
+            self._gputil = GPUtil
+        except ImportError:
+            pass
+
+        psutil.cpu_percent(interval=None)  # prime the CPU counter
+
+    def _gpu_usage(self):
+        if self._gputil is None:
+            return 0
+        try:
+            gpus = self._gputil.getGPUs()
+            return gpus[0].load * 100 if gpus else 0
+        except Exception as e:
+            logger.error(f"GPU sample error: {str(e)}")
+            return 0
+
+    def sample(self):
+        """Take one reading and append it to the buffer"""
+        sample = {
+            # Non-blocking: usage since the previous call, i.e. over the last interval
+            'cpu_usage': psutil.cpu_percent(interval=None),
+            'memory_usage': psutil.virtual_memory().percent,
+            'disk_usage': psutil.disk_usage(self.disk_path).percent,
+            'gpu_usage': self._gpu_usage(),
+            'time': time.time()
+        }
+
+        with self._lock:
+            self._samples.append(sample)
+            samples = list(self._samples)
+
+        if self.publish_path:
+            write_json_atomic(self.publish_path, samples, indent=None)
+        return sample
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"System sample error: {str(e)}")
+
+    def stop(self):
+        self._stop_event.set()
+
+    def latest(self):
+        """Get the most recent sample, or None before the first reading"""
+        with self._lock:
+            if not self._samples:
+                return None
+            sample = self._samples[-1]
+        return format_sample(sample)
+
+    def summary(self, window):
+        """Get min/avg/max of each metric over the last `window` seconds"""
+        with self._lock:
+            samples = list(self._samples)
+        return summarize(samples, window)
+
+class PublishedSamples:
+    """Read-only view of the samples published by the sampling process
+
+    The file is parsed again only when its mtime changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._samples = []
+
+    def _read(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        with self._lock:
+            if mtime != self._mtime:
+                try:
+                    with open(self.path, 'r') as f:
+                        self._samples = json.load(f)
+                    self._mtime = mtime
+                except (OSError, ValueError) as e:
+                    logger.error(f"Read published samples error: {str(e)}")
+            return self._samples
+
+    def latest(self):
+        samples = self._read()
+        return format_sample(samples[-1]) if samples else None
+
+    def summary(self, window):
+        return summarize(self._read(), window)
+
+_sampler = None
+_published = PublishedSamples(PUBLISHED_SAMPLES_FILE)
+_sampler_lock = threading.Lock()
+
+def start_system_sampler():
+    """Start sampling in this process and publish the samples for the others"""
+    global _sampler
+
+    with _sampler_lock:
+        if _sampler is None:
+            sampler = SystemSampler(
+                Config.METRICS_SAMPLE_INTERVAL,
+                Config.METRICS_HISTORY_SIZE,
+                publish_path=PUBLISHED_SAMPLES_FILE
+            )
+            sampler.sample()
+            sampler.start()
+            _sampler = sampler
+    return _sampler
+
+def get_system_sampler():
+    """Get the local sampler, or the published samples when another process samples"""
+    return _sampler or _published
@@ -0,0 +1,251 @@
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime
+from config import Config
+from services.platform_upload import upload_to_platform, video_fingerprint, idempotency_key
+from services.upload_store import get_upload_log, save_upload_record, load_upload_record, iter_upload_records
+from services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-platform task states kept in upload_record['results'][platform]['status']
+TASK_STATUSES = ['queued', 'in_progress', 'done', 'failed']
+
+def parse_rate_limits(spec):
+    """Parse "youtube=6,instagram=4" into uploads per minute by platform"""
+    limits = {}
+    for item in spec.split(','):
+        if '=' in item:
+            platform, per_minute = item.split('=', 1)
+            limits[platform.strip()] = float(per_minute)
+    return limits
+
+def record_status(results):
+    """Overall upload status from its per-platform task states"""
+    statuses = [task.get('status') for task in results.values()]
+    if all(status in ['done', 'failed'] for status in statuses):
+        if all(status == 'done' for status in statuses):
+            return 'completed'
+        return 'partial' if 'done' in statuses else 'failed'
+    if all(status == 'queued' for status in statuses):
+        return 'queued'
+    return 'in_progress'
+
+class UploadQueue:
+    """Durable, rate-limited queue of platform uploads
+
+    Upload records are saved with one 'queued' task per platform before
+    anything is queued in memory, so tasks still queued or in progress are
+    recovered on start (in-progress ones resume from their persisted upload
+    session). Each task carries an idempotency key (video fingerprint +
+    platform + title); a submit matching a task that is not failed is
+    reported as a duplicate instead of uploading the video again. Workers take the next
+    task from whichever platform's rate limit allows it soonest.
+
+    Only the started queue uploads. Records submitted in other server
+    processes reach it through the upload log, which it follows every
+    Config.PROCESS_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self, workers, rate_limits):
+        self.workers = workers
+        self.rate_limits = rate_limits
+        self._cond = threading.Condition()
+        self._pending = {}  # platform -> deque of upload ids
+        self._queued = set()  # (upload id, platform)
+        self._next_slot = {}  # platform -> monotonic time of next allowed start
+        self._threads = []
+
+    def submit(self, upload_record):
+        """Save a new upload record and queue its platforms
+
+        Returns the saved record (None when every platform was a duplicate)
+        and a dict of duplicate platform -> existing upload id.
+        """
+        video_hash = video_fingerprint(upload_record['video_url'])
+        duplicates = {}
+        tasks = {}
+
+        upload_log = get_upload_log()
+        with upload_log.exclusive():
+            for platform in dict.fromkeys(upload_record['platforms']):
+                key = idempotency_key(video_hash, platform, upload_record['title'])
+                existing = upload_log.find_key(key)
+                if existing:
+                    duplicates[platform] = existing
+                else:
+                    tasks[platform] = {'status': 'queued', 'idempotency_key': key}
+
+            if not tasks:
+                return None, duplicates
+
+            upload_record.update({
+                'platforms': list(tasks),
+                'video_hash': video_hash,
+                'results': tasks,
+                'status': 'queued'
+            })
+            upload_log.save(upload_record)
+
+        if self._threads:
+            for platform in tasks:
+                self.put(upload_record['id'], platform)
+        return upload_record, duplicates
+
+    def put(self, upload_id, platform):
+        """Queue an already-saved platform task"""
+        with self._cond:
+            if (upload_id, platform) in self._queued:
+                return
+            self._queued.add((upload_id, platform))
+            self._pending.setdefault(platform, deque()).append(upload_id)
+            self._cond.notify()
+
+    def depth(self):
+        with self._cond:
+            return {platform: len(ids) for platform, ids in self._pending.items()}
+
+    def metric_series(self):
+        return [
+            ('gauge', 'upload_queue_depth', (('platform', platform),), count)
+            for platform, count in self.depth().items()
+        ]
+
+    def start(self):
+        """Recover unfinished tasks and start the workers"""
+        if self._threads:
+            return
+
+        upload_log = get_upload_log()
+        upload_log.add_listener(self._on_external_record)
+        recovered = 0
+        for upload_record in iter_upload_records():
+            for platform, task in upload_record.get('results', {}).items():
+                if task.get('status') in ['queued', 'in_progress']:
+                    self.put(upload_record['id'], platform)
+                    recovered += 1
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"upload-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        follower = threading.Thread(target=self._follow, args=(upload_log,), name='upload-log-follower', daemon=True)
+        follower.start()
+        self._threads.append(follower)
+
+        logger.info(f"Upload queue started with {self.workers} workers, {recovered} uploads recovered")
+
+    def _on_external_record(self, entry):
+        """Upload log listener queueing records submitted by other processes"""
+        if entry.get('status') != 'queued':
+            return
+
+        upload_record = load_upload_record(entry['id'])
+        for platform, task in (upload_record or {}).get('results', {}).items():
+            if task.get('status') == 'queued':
+                self.put(upload_record['id'], platform)
+
+    def _follow(self, upload_log):
+        while True:
+            time.sleep(Config.PROCESS_SYNC_INTERVAL)
+            try:
+                upload_log.catch_up()
+            except Exception as e:
+                logger.error(f"Upload log follow error: {str(e)}")
+
+    def _take(self):
+        """Block until some platform's rate limit allows its next task"""
+        with self._cond:
+            while True:
+                ready = [platform for platform, ids in self._pending.items() if ids]
+                if not ready:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                platform = min(ready, key=lambda p: self._next_slot.get(p, 0))
+                wait = self._next_slot.get(platform, 0) - now
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+
+                per_minute = self.rate_limits.get(platform)
+                self._next_slot[platform] = now + (60.0 / per_minute if per_minute else 0)
+                return self._pending[platform].popleft(), platform
+
+    def _work(self):
+        while True:
+            upload_id, platform = self._take()
+            try:
+                self._process(upload_id, platform)
+            except Exception as e:
+                logger.error(f"Upload worker error for {upload_id} ({platform}): {str(e)}")
+            finally:
+                with self._cond:
+                    self._queued.discard((upload_id, platform))
+
+    def _update_task(self, upload_id, platform, task):
+        """Replace one platform's task state and refresh the record status"""
+        with get_upload_log().exclusive():
+            upload_record = load_upload_record(upload_id)
+            if not upload_record:
+                return
+
+            # A failed task drops its idempotency key, so it may be submitted again
+            upload_record['results'][platform] = task
+            upload_record['status'] = record_status(upload_record['results'])
+            upload_record['updated_at'] = datetime.utcnow().isoformat()
+            save_upload_record(upload_record)
+
+    def _process(self, upload_id, platform):
+        upload_record = load_upload_record(upload_id)
+        task = (upload_record or {}).get('results', {}).get(platform)
+        if not task or task.get('status') in ['done', 'failed']:
+            return
+
+        key = task['idempotency_key']
+        self._update_task(upload_id, platform, {
+            'status': 'in_progress',
+            'idempotency_key': key,
+            'started_at': datetime.utcnow().isoformat()
+        })
+
+        try:
+            result = upload_to_platform(platform, upload_record, key)
+        except Exception as e:
+            result = {'success': False, 'platform': platform, 'error': str(e)}
+
+        result.update({
+            'status': 'done' if result.get('success') else 'failed',
+            'idempotency_key': key,
+            'completed_at': datetime.utcnow().isoformat()
+        })
+        self._update_task(upload_id, platform, result)
+
+        if result['status'] == 'done':
+            logger.info(f"Upload {upload_id} to {platform} done")
+        else:
+            logger.error(f"Upload {upload_id} to {platform} failed: {result.get('error')}")
+
+_queue = None
+_queue_lock = threading.Lock()
+
+def get_upload_queue():
+    """Get the shared upload queue (workers not started)"""
+    global _queue
+
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = UploadQueue(Config.UPLOAD_MAX_WORKERS, parse_rate_limits(Config.UPLOAD_RATE_LIMITS))
+                get_metrics().add_collector(_queue.metric_series)
+    return _queue
+
+def start_upload_queue():
+    """Recover unfinished uploads and start the upload workers"""
+    upload_queue = get_upload_queue()
+    upload_queue.start()
+    return upload_queue
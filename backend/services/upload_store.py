@@ -0,0 +1,390 @@
+import os
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager, nullcontext
+
+from config import Config
+from services.process_lock import process_lock
+from services.record_index import encode_cursor
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_LOG_DIR = os.path.join(Config.DATA_DIR, 'upload_log')
+LEGACY_UPLOADS_DIR = os.path.join(Config.DATA_DIR, 'uploads')
+
+# Fields kept in the sidecar index so listings filter without reading records
+SUMMARY_FIELDS = ['uploaded_at', 'status', 'platforms', 'persona_id']
+
+def active_keys(record):
+    """Idempotency keys of the record's platform tasks that have not failed"""
+    return [
+        task['idempotency_key'] for task in (record.get('results') or {}).values()
+        if isinstance(task, dict) and task.get('idempotency_key') and task.get('status') != 'failed'
+    ]
+
+class UploadLog:
+    """Append-only, segment-rotated log of upload records
+
+    Every save appends the whole record as one JSON line to the current
+    segment (segment-NNNNNN.jsonl), which is sealed once it reaches
+    segment_bytes. Each segment has a sidecar .idx file with one line per
+    append (id, offset, length and the fields listings filter on), so on
+    start only the index files are read. The latest version of a record is
+    found with a dict lookup and one seek; listings filter in memory and
+    read each run of records from one segment with a single open file and
+    forward seeks. Superseded versions stay in sealed segments.
+
+    Several server processes can share the log: appends and id allocation
+    hold an flock on <log_dir>/.lock, and each process catches up on index
+    lines appended by the others before it reads, notifying listeners of
+    those records.
+    """
+
+    def __init__(self, log_dir, segment_bytes):
+        self.log_dir = log_dir
+        self.segment_bytes = segment_bytes
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_path = os.path.join(log_dir, '.lock')
+        self._entries = {}  # record id -> latest location and summary
+        self._order = []  # record ids in first-append order
+        self._positions = {}  # record id -> position in _order
+        self._keys = {}  # active idempotency key -> record id
+        self._segments = []
+        self._index_sizes = {}  # segment -> bytes of its index already read
+        self._last_number = 0
+        self._listeners = []
+        os.makedirs(log_dir, exist_ok=True)
+
+        with self._lock, process_lock(self._lock_path):
+            self._load()
+
+    def _segment_path(self, segment):
+        return os.path.join(self.log_dir, f"segment-{segment:06d}.jsonl")
+
+    def _index_path(self, segment):
+        return os.path.join(self.log_dir, f"segment-{segment:06d}.idx")
+
+    def _index_line(self, record_id, offset, length, record):
+        item = {'id': record_id, 'offset': offset, 'length': length}
+        item.update({field: record.get(field) for field in SUMMARY_FIELDS})
+        item['keys'] = active_keys(record)
+        return json.dumps(item) + '\n'
+
+    def _remember(self, segment, item):
+        record_id = item['id']
+        previous = self._entries.get(record_id)
+        if previous is None:
+            self._positions[record_id] = len(self._order)
+            self._order.append(record_id)
+        else:
+            for key in previous.get('keys') or []:
+                if self._keys.get(key) == record_id:
+                    del self._keys[key]
+
+        item['segment'] = segment
+        self._entries[record_id] = item
+        for key in item.get('keys') or []:
+            self._keys[key] = record_id
+
+        # Numeric suffix of generated ids, to keep new ids monotonic
+        suffix = record_id.rsplit('_', 1)[-1]
+        if suffix.isdigit():
+            self._last_number = max(self._last_number, int(suffix))
+
+    def _load(self):
+        self._segments = sorted(
+            int(name[8:14]) for name in os.listdir(self.log_dir)
+            if name.startswith('segment-') and name.endswith('.jsonl')
+        )
+
+        for segment in self._segments:
+            indexed_to = 0
+            try:
+                with open(self._index_path(segment), 'rb+') as f:
+                    good = 0
+                    for line in iter(f.readline, b''):
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            f.truncate(good)  # torn last line
+                            break
+                        self._remember(segment, item)
+                        indexed_to = item['offset'] + item['length']
+                        good += len(line)
+                    self._index_sizes[segment] = good
+            except FileNotFoundError:
+                pass
+
+            if indexed_to < os.path.getsize(self._segment_path(segment)):
+                self._recover_tail(segment, indexed_to)
+
+        if not self._segments:
+            self._segments = [1]
+            self._import_legacy()
+
+    def _recover_tail(self, segment, offset):
+        """Re-index records appended after the last index entry, dropping a torn write"""
+        path = self._segment_path(segment)
+        with open(path, 'rb+') as f, open(self._index_path(segment), 'a') as index:
+            f.seek(offset)
+            for line in iter(f.readline, b''):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    f.truncate(offset)
+                    logger.warning(f"Truncated torn upload log write in {path} at {offset}")
+                    break
+                index_line = self._index_line(record['id'], offset, len(line), record)
+                index.write(index_line)
+                self._index_sizes[segment] = self._index_sizes.get(segment, 0) + len(index_line)
+                self._remember(segment, json.loads(index_line))
+                offset += len(line)
+
+    def _import_legacy(self):
+        """One-time import of data/uploads/*.json records"""
+        if not os.path.isdir(LEGACY_UPLOADS_DIR):
+            return
+
+        records = []
+        for filename in os.listdir(LEGACY_UPLOADS_DIR):
+            if filename.endswith('.json'):
+                try:
+                    with open(os.path.join(LEGACY_UPLOADS_DIR, filename), 'r') as f:
+                        records.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Import upload record {filename} error: {str(e)}")
+
+        for record in sorted(records, key=lambda r: r.get('uploaded_at') or ''):
+            self._append(record)
+        if records:
+            logger.info(f"Imported {len(records)} upload records into {self.log_dir}")
+
+    def _append(self, record):
+        segment = self._segments[-1]
+        path = self._segment_path(segment)
+        offset = os.path.getsize(path) if os.path.exists(path) else 0
+
+        if offset >= self.segment_bytes:
+            segment += 1
+            self._segments.append(segment)
+            path = self._segment_path(segment)
+            offset = 0
+
+        line = (json.dumps(record) + '\n').encode()
+        with open(path, 'ab') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+        index_line = self._index_line(record['id'], offset, len(line), record)
+        with open(self._index_path(segment), 'a') as f:
+            f.write(index_line)
+        self._index_sizes[segment] = self._index_sizes.get(segment, 0) + len(index_line)
+        self._remember(segment, json.loads(index_line))
+
+    def _catch_up(self, exclusive):
+        """Read index lines appended by other processes, returns their items
+
+        Without the process lock a partial last line is a write in progress
+        and is left for the next call; with it, it can only be a crashed
+        writer's torn line and is truncated.
+        """
+        items = []
+        segment = self._segments[-1]
+        while True:
+            path = self._index_path(segment)
+            offset = self._index_sizes.get(segment, 0)
+            if os.path.exists(path) and os.path.getsize(path) > offset:
+                with open(path, 'rb+' if exclusive else 'rb') as f:
+                    f.seek(offset)
+                    for line in iter(f.readline, b''):
+                        try:
+                            item = json.loads(line) if line.endswith(b'\n') else None
+                        except ValueError:
+                            item = None
+                        if item is None:
+                            if exclusive:
+                                f.truncate(offset)
+                            break
+                        self._remember(segment, item)
+                        items.append(item)
+                        offset += len(line)
+                self._index_sizes[segment] = offset
+
+            if not os.path.exists(self._segment_path(segment + 1)):
+                return items
+            segment += 1
+            self._segments.append(segment)
+
+    def _notify(self, items):
+        for item in items:
+            for callback in self._listeners:
+                try:
+                    callback(item)
+                except Exception as e:
+                    logger.error(f"Upload log listener error: {str(e)}")
+
+    def add_listener(self, callback):
+        """Register a callback(entry) invoked for records appended by other processes"""
+        self._listeners.append(callback)
+
+    def catch_up(self):
+        """Pick up records appended by other processes"""
+        with self._lock:
+            # A thread holding exclusive() caught up when it took the lock
+            items = self._catch_up(exclusive=False) if not self._lock_depth else []
+        self._notify(items)
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the log against other threads and processes, caught up with their appends"""
+        items = []
+        with self._lock:
+            outermost = not self._lock_depth
+            with process_lock(self._lock_path) if outermost else nullcontext():
+                self._lock_depth += 1
+                try:
+                    if outermost:
+                        items = self._catch_up(exclusive=True)
+                    yield
+                finally:
+                    self._lock_depth -= 1
+        self._notify(items)
+
+    def find_key(self, key):
+        """Id of the record holding an idempotency key on a task that has not failed"""
+        with self._lock:
+            return self._keys.get(key)
+
+    def new_id(self):
+        """Monotonic, unique upload id (microsecond clock, bumped on ties)"""
+        last_id_file = os.path.join(self.log_dir, 'last_id')
+        with self.exclusive():
+            # Highest id handed out by any process, saved or not
+            try:
+                with open(last_id_file, 'r') as f:
+                    issued = int(f.read())
+            except (OSError, ValueError):
+                issued = 0
+
+            self._last_number = max(self._last_number + 1, issued + 1, int(time.time() * 1000000))
+            with open(last_id_file, 'w') as f:
+                f.write(str(self._last_number))
+            return f"upload_{self._last_number}"
+
+    def save(self, record):
+        with self.exclusive():
+            self._append(record)
+
+    def load(self, record_id):
+        """Latest version of a record, or None"""
+        self.catch_up()
+        with self._lock:
+            entry = self._entries.get(record_id)
+        if not entry:
+            return None
+
+        with open(self._segment_path(entry['segment']), 'rb') as f:
+            f.seek(entry['offset'])
+            return json.loads(f.read(entry['length']))
+
+    def _matches(self, entry, filters):
+        platforms = entry.get('platforms') or []
+        if isinstance(platforms, str):
+            platforms = [platforms]
+        uploaded_at = entry.get('uploaded_at') or ''
+
+        if filters.get('persona') and entry.get('persona_id') != filters['persona']:
+            return False
+        if filters.get('status') and entry.get('status') != filters['status']:
+            return False
+        if filters.get('platform') and filters['platform'] not in platforms:
+            return False
+        if filters.get('since') and uploaded_at < filters['since']:
+            return False
+        if filters.get('until') and uploaded_at > filters['until']:
+            return False
+        return True
+
+    def _select(self, filters, order, after):
+        """Matching latest entries in order, strictly after the cursor's record"""
+        self.catch_up()
+        with self._lock:
+            ids = list(self._order)
+            entries = dict(self._entries)
+            cursor_position = self._positions.get(after[1]) if after else None
+
+        if cursor_position is None:
+            positions = range(len(ids) - 1, -1, -1) if order == 'desc' else range(len(ids))
+        elif order == 'desc':
+            positions = range(cursor_position - 1, -1, -1)
+        else:
+            positions = range(cursor_position + 1, len(ids))
+
+        return [entries[ids[i]] for i in positions if self._matches(entries[ids[i]], filters)]
+
+    def _read_runs(self, selected):
+        """Read entries in listing order, one open file and forward seeks per segment run"""
+        run = []
+        for entry in selected + [None]:
+            if run and (entry is None or entry['segment'] != run[0]['segment']):
+                records = {}
+                with open(self._segment_path(run[0]['segment']), 'rb') as f:
+                    for item in sorted(run, key=lambda e: e['offset']):
+                        f.seek(item['offset'])
+                        records[item['id']] = json.loads(f.read(item['length']))
+                for item in run:
+                    yield records[item['id']]
+                run = []
+            if entry is not None:
+                run.append(entry)
+
+    def page(self, filters, order='desc', after=None, limit=50):
+        """Get one page of records and the cursor for the next page"""
+        selected = self._select(filters, order, after)
+        items = list(self._read_runs(selected[:limit]))
+
+        next_cursor = None
+        if len(selected) > limit:
+            last = selected[limit - 1]
+            next_cursor = encode_cursor((last.get('uploaded_at') or '', last['id']))
+        return items, next_cursor
+
+    def iter_records(self, filters, order='desc', after=None):
+        """Stream matching records"""
+        return self._read_runs(self._select(filters, order, after))
+
+_log = None
+_log_lock = threading.Lock()
+
+def get_upload_log():
+    """Get the shared upload log, importing legacy records on first use"""
+    global _log
+
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = UploadLog(UPLOAD_LOG_DIR, Config.UPLOAD_LOG_SEGMENT_BYTES)
+    return _log
+
+def new_upload_id():
+    return get_upload_log().new_id()
+
+def save_upload_record(upload_record):
+    """Append the current version of an upload record to the log"""
+    try:
+        get_upload_log().save(upload_record)
+
+    except Exception as e:
+        logger.error(f"Save upload record error: {str(e)}")
+
+def load_upload_record(upload_id):
+    """Load the latest version of an upload record, or None"""
+    return get_upload_log().load(upload_id)
+
+def iter_upload_records():
+    """Stream every upload record, newest first"""
+    return get_upload_log().iter_records({})
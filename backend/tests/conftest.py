@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Point every data directory at a scratch tree before config is imported
+_root = tempfile.mkdtemp(prefix='buzzsnip-tests-')
+for _name in ['DATA_DIR', 'UPLOADS_DIR', 'GENERATED_DIR', 'LOGS_DIR']:
+    os.environ[_name] = os.path.join(_root, _name[:-len('_DIR')].lower())
+    os.makedirs(os.environ[_name], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Leave logging to pytest instead of the queued file/stdout writer
+from services import log_pipeline
+log_pipeline._pid = os.getpid()
+
+@pytest.fixture
+def client():
+    from app import app
+    return app.test_client()
+
+@pytest.fixture
+def auth_headers(client):
+    from config import Config
+    response = client.post('/api/auth/login', json={'email': Config.ADMIN_EMAIL, 'password': Config.ADMIN_PASSWORD})
+    return {'Authorization': f"Bearer {response.get_json()['token']}"}
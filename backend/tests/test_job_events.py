@@ -0,0 +1,29 @@
+import threading
+from routes import content
+
+def test_streams_over_the_cap_get_503(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(content, '_stream_slots', threading.BoundedSemaphore(1))
+    monkeypatch.setattr(content, 'SSE_KEEPALIVE', 0.05)
+
+    first = client.get('/api/jobs/events', headers=auth_headers, buffered=False)
+    assert first.status_code == 200
+
+    second = client.get('/api/jobs/events', headers=auth_headers)
+    assert second.status_code == 503
+    assert second.headers['Retry-After'] == str(content.SSE_RETRY_AFTER)
+
+    # Closing a stream frees its slot
+    first.close()
+    third = client.get('/api/jobs/events', headers=auth_headers, buffered=False)
+    assert third.status_code == 200
+    third.close()
+
+def test_streams_close_after_their_lifetime(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(content.Config, 'SSE_MAX_LIFETIME', 0.2)
+
+    response = client.get('/api/jobs/events', headers=auth_headers, buffered=False)
+    # The stream ends on its own instead of blocking forever
+    body = b''.join(response.response)
+    response.close()
+    assert response.status_code == 200
+    assert body in [b'', b': keep-alive\n\n']
@@ -0,0 +1,66 @@
+import sqlite3
+import pytest
+from datetime import datetime, timedelta
+from services import job_store
+from services.job_feed import JobChangeFeed
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = job_store.SqliteJobStore(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(job_store, '_store', store)
+    return store
+
+@pytest.fixture
+def replayed(monkeypatch):
+    saves = []
+    monkeypatch.setattr(job_store, '_save_listeners', [saves.append])
+    return saves
+
+def job(job_id, status='queued', seconds_ago=0):
+    updated_at = (datetime.utcnow() - timedelta(seconds=seconds_ago)).isoformat()
+    return {'job_id': job_id, 'type': 'audio', 'status': status, 'created_at': updated_at, 'updated_at': updated_at}
+
+def test_save_committed_long_after_its_timestamp_is_replayed(store, replayed):
+    feed = JobChangeFeed(interval=1)
+    # Another process stamped the job, then waited on the database lock
+    store.save(job('late', seconds_ago=60))
+
+    assert feed.poll() == 1
+    assert [saved['job_id'] for saved in replayed] == ['late']
+
+def test_every_save_is_replayed_once(store, replayed):
+    feed = JobChangeFeed(interval=1)
+    store.save(job('a'))
+    store.save(job('b'))
+    assert feed.poll() == 2
+
+    store.save(job('a', status='processing'))
+    assert feed.poll() == 1
+    assert feed.poll() == 0
+    assert [(saved['job_id'], saved['status']) for saved in replayed] == [
+        ('a', 'queued'), ('b', 'queued'), ('a', 'processing')
+    ]
+
+def test_local_saves_are_not_replayed(store, replayed):
+    feed = JobChangeFeed(interval=1)
+    job_store.save_job(job('mine'))
+    replayed.clear()
+
+    assert feed.poll() == 0
+    assert replayed == []
+
+def test_database_without_seq_is_upgraded(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE jobs (job_id TEXT PRIMARY KEY, type TEXT, status TEXT, persona_id TEXT,
+                    created_at TEXT, updated_at TEXT, data TEXT NOT NULL)""")
+    conn.execute("INSERT INTO jobs (job_id, data) VALUES ('old', '{\"job_id\": \"old\"}')")
+    conn.commit()
+    conn.close()
+
+    store = job_store.SqliteJobStore(path)
+    position = store.change_position()
+    store.save(job('new'))
+    jobs, _ = store.changes_since(position)
+    assert [saved['job_id'] for saved in jobs] == ['new']
+    assert store.load('old') == {'job_id': 'old'}
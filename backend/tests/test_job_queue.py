@@ -0,0 +1,204 @@
+import os
+import time
+import pytest
+from config import Config
+from services import job_queue, job_store, artifact_cache, pipeline
+from services.generation import build_job
+from services.artifact_cache import current_models
+
+@pytest.fixture
+def queue(monkeypatch):
+    """A fresh, unstarted job queue standing in for the shared one"""
+    fresh = job_queue.JobQueue(workers=1, batch_window=0)
+    monkeypatch.setattr(job_queue, '_queue', fresh)
+    return fresh
+
+def test_completed_job_becomes_a_cache_hit(queue, monkeypatch):
+    monkeypatch.setattr(artifact_cache, '_cache', None)
+    audio_path = os.path.join(Config.GENERATED_DIR, 'cached-voice.wav')
+    with open(audio_path, 'wb') as f:
+        f.write(b'voice')
+    result = {'audio_url': '/generated/cached-voice.wav', 'audio_path': audio_path}
+    monkeypatch.setattr(job_queue, 'run_job', lambda job_data, on_change=None: result)
+
+    request = {'persona_id': 'p', 'script': 'Cached', 'voice_type': 'bark'}
+    job_data = build_job('audio', request, models=current_models())
+    job_store.save_job(job_data)
+
+    artifact_cache.start_artifact_cache()
+    queue._process(job_data['job_id'])
+
+    assert job_store.load_job(job_data['job_id'])['status'] == 'completed'
+    assert artifact_cache.get_artifact_cache().lookup('audio', request, current_models()) == result
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body or {}
+        self.text = str(self.body)
+
+    def json(self):
+        return self.body
+
+class FakeAIClient:
+    """Answers each endpoint with a queued status, recording the calls"""
+
+    def __init__(self, answers):
+        self.answers = answers
+        self.calls = []
+
+    def post(self, endpoint, json=None, headers=None):
+        self.calls.append(endpoint)
+        status = self.answers[endpoint].pop(0) if isinstance(self.answers[endpoint], list) else self.answers[endpoint]
+        name = endpoint.rsplit('/', 1)[-1]
+        return FakeResponse(status, {f"{name}_url": f"/generated/{name}.out"})
+
+@pytest.fixture
+def ai_client(monkeypatch):
+    def install(answers):
+        client = FakeAIClient(answers)
+        monkeypatch.setattr(pipeline, 'get_ai_client', lambda: client)
+        return client
+    return install
+
+def queued_audio_job():
+    job_data = build_job('audio', {'persona_id': 'p', 'script': 'Hello', 'voice_type': 'gtts'})
+    job_store.save_job(job_data)
+    return job_data['job_id']
+
+def test_rejected_request_is_not_retried(queue, ai_client):
+    queue.max_retries = 2
+    client = ai_client({'/generate/audio': 422})
+    job_id = queued_audio_job()
+
+    assert queue._process(job_id) is None
+    job_data = job_store.load_job(job_id)
+    assert job_data['status'] == 'failed'
+    assert 'retries' not in job_data
+    assert client.calls == ['/generate/audio']
+
+def test_server_error_is_retried(queue, ai_client):
+    queue.max_retries = 2
+    ai_client({'/generate/audio': 503})
+    job_id = queued_audio_job()
+
+    retry = queue._process(job_id)
+    assert retry['job_id'] == job_id
+    job_data = job_store.load_job(job_id)
+    assert job_data['status'] == 'queued'
+    assert job_data['retries'] == 1
+    assert job_data['retry_at']
+
+def queued_pipeline_job():
+    job_data = build_job('pipeline', {
+        'persona_id': 'p',
+        'audio': {'script': 'Hello', 'voice_type': 'gtts'},
+        'face': {},
+        'video': {}
+    })
+    job_store.save_job(job_data)
+    return job_data['job_id']
+
+def test_failed_stage_job_resumes_without_rerunning_completed_stages(queue, ai_client, client, auth_headers):
+    calls = ai_client({'/generate/audio': 200, '/generate/face': 200, '/generate/video': [500, 200]}).calls
+    job_id = queued_pipeline_job()
+
+    queue._process(job_id)
+    stages = job_store.load_job(job_id)['stages']
+    assert {name: stage['status'] for name, stage in stages.items()} == {
+        'audio': 'completed', 'face': 'completed', 'video': 'failed'
+    }
+
+    response = client.post(f"/api/jobs/{job_id}/resume", headers=auth_headers)
+    assert response.status_code == 202
+    assert response.get_json()['stages'] == ['video']
+
+    queue._process(job_id)
+    assert job_store.load_job(job_id)['status'] == 'completed'
+    assert sorted(calls) == ['/generate/audio', '/generate/face', '/generate/video', '/generate/video']
+
+def test_automatic_retry_resumes_from_completed_stages(queue, ai_client):
+    queue.max_retries = 1
+    calls = ai_client({'/generate/audio': 200, '/generate/face': 200, '/generate/video': [503, 200]}).calls
+    job_id = queued_pipeline_job()
+
+    assert queue._process(job_id) is not None
+    queue._process(job_id)
+    assert job_store.load_job(job_id)['status'] == 'completed'
+    assert sorted(calls) == ['/generate/audio', '/generate/face', '/generate/video', '/generate/video']
+
+def test_single_call_job_cannot_be_resumed(queue, ai_client, client, auth_headers):
+    ai_client({'/generate/audio': 422})
+    job_id = queued_audio_job()
+    queue._process(job_id)
+
+    response = client.post(f"/api/jobs/{job_id}/resume", headers=auth_headers)
+    assert response.status_code == 409
+
+@pytest.fixture
+def fresh_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_store, '_store', job_store.SqliteJobStore(str(tmp_path / 'jobs.db')))
+    monkeypatch.setattr(job_store, '_save_listeners', [])
+
+def test_queued_and_interrupted_jobs_are_recovered_on_start(fresh_store):
+    recovered = []
+    for status in ['queued', 'processing', 'completed', 'failed']:
+        job_data = build_job('audio', {'script': status, 'voice_type': 'gtts'})
+        job_data['status'] = status
+        job_store.save_job(job_data)
+        if status in ['queued', 'processing']:
+            recovered.append(job_data['job_id'])
+
+    idle = job_queue.JobQueue(workers=0, batch_window=0)
+    idle.start()
+    assert sorted(idle._waiting) == sorted(recovered)
+
+    # Later saves of queued jobs are picked up, from this process or replayed
+    job_id = queued_audio_job()
+    assert job_id in idle._waiting
+
+def test_manual_jobs_are_served_before_scheduled_ones():
+    pool = job_queue.JobQueue(workers=0, batch_window=0)
+    scheduled = build_job('audio', {'voice_type': 'gtts'}, source='scheduled')
+    manual = build_job('audio', {'voice_type': 'gtts'})
+    pool.put(scheduled)
+    pool.put(manual)
+    pool.put(manual)  # already pending
+
+    assert pool._take() == manual['job_id']
+    assert pool._take() == scheduled['job_id']
+    assert pool.depth() == 0
+
+class ResidentModels:
+    def __init__(self, *keys):
+        self.keys = set(keys)
+
+    def resident_models(self):
+        return self.keys
+
+def face_job():
+    return build_job('face', {}, models={'stable_diffusion_model': 'realistic-vision-v5'})
+
+def test_job_on_resident_models_goes_ahead_within_the_batch_window(monkeypatch):
+    monkeypatch.setattr(job_queue, 'get_model_residency', lambda: ResidentModels('bark'))
+    pool = job_queue.JobQueue(workers=0, batch_window=60)
+    needs_load = face_job()
+    resident = build_job('audio', {'voice_type': 'bark'})
+    cloud = build_job('audio', {'voice_type': 'gtts'})
+    for job_data in [needs_load, cloud, resident]:
+        pool.put(job_data)
+
+    # Jobs on no local models are not batched, so the gtts job waits its turn
+    assert pool._take() == resident['job_id']
+    assert pool._take() == needs_load['job_id']
+    assert pool._take() == cloud['job_id']
+
+def test_oldest_job_runs_once_its_batch_window_passed(monkeypatch):
+    monkeypatch.setattr(job_queue, 'get_model_residency', lambda: ResidentModels('bark'))
+    pool = job_queue.JobQueue(workers=0, batch_window=0.01)
+    needs_load = face_job()
+    pool.put(needs_load)
+    pool.put(build_job('audio', {'voice_type': 'bark'}))
+    time.sleep(0.02)
+
+    assert pool._take() == needs_load['job_id']
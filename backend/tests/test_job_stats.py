@@ -0,0 +1,60 @@
+import threading
+from services import job_store
+from services.job_stats import JobStats
+
+class SlowStore:
+    """Job store whose key scan runs a callback halfway through"""
+
+    def __init__(self, rows, during_scan=None):
+        self.rows = rows
+        self.during_scan = during_scan
+        self.scans = 0
+
+    def iter_job_keys(self):
+        self.scans += 1
+        for i, row in enumerate(self.rows):
+            if i == 1 and self.during_scan:
+                self.during_scan()
+            yield row
+
+def job(job_id, status):
+    return {'job_id': job_id, 'status': status, 'persona_id': 'p', 'type': 'audio'}
+
+def test_save_during_rebuild_is_kept(monkeypatch):
+    stats = JobStats(max_age=300)
+    rows = [('a', 'queued', 'p', 'audio'), ('b', 'queued', 'p', 'audio')]
+    # 'a' was already read when it completes
+    store = SlowStore(rows, during_scan=lambda: stats.record(job('a', 'completed')))
+    monkeypatch.setattr(job_store, 'get_job_store', lambda: store)
+
+    stats.rebuild()
+
+    assert stats.snapshot()['by_status'] == {'completed': 1, 'queued': 1}
+
+def test_one_rebuild_at_a_time_serves_previous_counts(monkeypatch):
+    stats = JobStats(max_age=300)
+    monkeypatch.setattr(job_store, 'get_job_store', lambda: SlowStore([('a', 'queued', 'p', 'audio')]))
+    stats.rebuild()
+
+    scanning = threading.Event()
+    release = threading.Event()
+
+    def block():
+        scanning.set()
+        release.wait(5)
+
+    store = SlowStore([('a', 'completed', 'p', 'audio'), ('b', 'queued', 'p', 'audio')], during_scan=block)
+    monkeypatch.setattr(job_store, 'get_job_store', lambda: store)
+    stats._built_at -= 1000  # stale
+
+    first = threading.Thread(target=stats.snapshot)
+    first.start()
+    assert scanning.wait(5)
+
+    # A second caller does not scan again and gets the counts from before
+    assert stats.snapshot()['by_status'] == {'queued': 1}
+    assert store.scans == 1
+
+    release.set()
+    first.join(5)
+    assert stats.snapshot()['by_status'] == {'completed': 1, 'queued': 1}
@@ -0,0 +1,65 @@
+import json
+import sys
+import pytest
+from config import Config
+from services import job_store
+import migrate_jobs
+
+@pytest.fixture
+def sqlite_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_STORE_BACKEND', 'sqlite')
+    monkeypatch.setattr(Config, 'JOB_STORE_PATH', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(Config, 'DATA_DIR', str(tmp_path))
+    return tmp_path
+
+def write_jobs(jobs_dir, *job_ids):
+    jobs_dir.mkdir(exist_ok=True)
+    for job_id in job_ids:
+        (jobs_dir / f"{job_id}.json").write_text(json.dumps({
+            'job_id': job_id, 'type': 'audio', 'status': 'completed',
+            'created_at': '2024-01-01T00:00:00', 'updated_at': '2024-01-01T00:00:00'
+        }))
+
+def test_interrupted_import_is_retried(sqlite_config, monkeypatch):
+    write_jobs(sqlite_config / 'jobs', 'a', 'b')
+
+    def interrupted(jobs_dir, store, batch_size=500):
+        store.save(json.loads((sqlite_config / 'jobs' / 'a.json').read_text()))
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as m:
+        m.setattr(job_store, 'migrate_json_jobs', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            job_store.create_job_store()
+
+    store = job_store.create_job_store()
+    assert store.get_meta(job_store.LEGACY_IMPORT_KEY) == 'completed'
+    assert store.load('b')['status'] == 'completed'
+
+def test_completed_import_is_not_repeated(sqlite_config):
+    write_jobs(sqlite_config / 'jobs', 'a')
+    store = job_store.create_job_store()
+    store.save(dict(store.load('a'), status='archived'))
+
+    assert job_store.create_job_store().load('a')['status'] == 'archived'
+
+def test_database_predating_the_import_mark_is_left_alone(sqlite_config):
+    store = job_store.SqliteJobStore(Config.JOB_STORE_PATH)
+    store.save({'job_id': 'existing', 'status': 'queued'})
+    write_jobs(sqlite_config / 'jobs', 'a')
+
+    store = job_store.create_job_store()
+    assert store.load('a') is None
+    assert store.get_meta(job_store.LEGACY_IMPORT_KEY) == 'completed'
+
+def test_script_imports_only_the_given_directory(sqlite_config, monkeypatch):
+    write_jobs(sqlite_config / 'jobs', 'default')
+    write_jobs(sqlite_config / 'other', 'custom')
+    monkeypatch.setattr(sys, 'argv', ['migrate_jobs.py', str(sqlite_config / 'other')])
+
+    migrate_jobs.main()
+
+    store = job_store.SqliteJobStore(Config.JOB_STORE_PATH)
+    assert store.load('custom') is not None
+    assert store.load('default') is None
+    assert store.get_meta(job_store.LEGACY_IMPORT_KEY) is None
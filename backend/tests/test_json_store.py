@@ -0,0 +1,64 @@
+import os
+import threading
+import multiprocessing
+import pytest
+from services.json_store import JsonDocument, VersionConflictError
+
+def test_write_with_a_stale_version_is_rejected(tmp_path):
+    document = JsonDocument(str(tmp_path / 'doc.json'), dict)
+    _, missing = document.read()
+    document.write({'a': 1}, expected_version=missing)
+
+    data, version = document.read()
+    document.write({'a': 2})
+    with pytest.raises(VersionConflictError):
+        document.write({'a': 3}, expected_version=version)
+    assert document.read()[0] == {'a': 2}
+
+def test_update_retries_after_a_concurrent_write(tmp_path):
+    path = str(tmp_path / 'doc.json')
+    document = JsonDocument(path, dict)
+    document.write({'mine': 0, 'theirs': 0})
+    other = JsonDocument(path, dict)
+    attempts = []
+
+    def mutate(data):
+        attempts.append(dict(data))
+        if len(attempts) == 1:
+            # Another writer lands between this read and write
+            other.write(dict(data, theirs=1))
+        data['mine'] += 1
+
+    document.update(mutate)
+    assert len(attempts) == 2
+    assert document.read()[0] == {'mine': 1, 'theirs': 1}
+
+def test_unchanged_update_does_not_write(tmp_path):
+    document = JsonDocument(str(tmp_path / 'doc.json'), dict)
+    document.write({'a': 1})
+    version = document.version()
+
+    assert document.update(lambda data: data.get('a')) == 1
+    assert document.version() == version
+    assert sorted(os.listdir(tmp_path)) == ['doc.json', 'doc.json.lock']
+
+def increment(document, times):
+    for _ in range(times):
+        document.update(lambda data: data.update(count=data.get('count', 0) + 1))
+
+def increment_in_process(path, times):
+    increment(JsonDocument(path, dict), times)
+
+def test_updates_from_threads_and_processes_are_not_lost(tmp_path):
+    path = str(tmp_path / 'doc.json')
+    document = JsonDocument(path, dict)
+
+    threads = [threading.Thread(target=increment, args=(document, 20)) for _ in range(4)]
+    processes = [multiprocessing.get_context('fork').Process(target=increment_in_process, args=(path, 20))
+                 for _ in range(2)]
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join(30)
+
+    assert document.read()[0]['count'] == 120
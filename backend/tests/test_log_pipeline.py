@@ -0,0 +1,71 @@
+import os
+import time
+import queue
+import logging
+from services.log_pipeline import RotatingBatchFileHandler, BatchingQueueListener
+
+def make_record(message, level=logging.INFO):
+    return logging.LogRecord('test', level, __file__, 1, message, None, None)
+
+def read(path):
+    with open(path) as f:
+        return f.read().splitlines()
+
+def rotated_files(tmp_path):
+    return sorted(name for name in os.listdir(tmp_path) if name.startswith('backend.log.') and not name.endswith('.lock'))
+
+def test_records_are_written_in_batches(tmp_path):
+    path = str(tmp_path / 'backend.log')
+    handler = RotatingBatchFileHandler(path, 0, 0, 0, flush_records=3)
+
+    handler.emit(make_record('one'))
+    handler.emit(make_record('two'))
+    assert read(path) == []
+
+    handler.emit(make_record('three'))
+    assert read(path) == ['one', 'two', 'three']
+
+    # Errors are not held back
+    handler.emit(make_record('failed', logging.ERROR))
+    assert read(path)[-1] == 'failed'
+    handler.close()
+
+def test_file_rotates_by_size_and_keeps_backup_count(tmp_path):
+    path = str(tmp_path / 'backend.log')
+    handler = RotatingBatchFileHandler(path, 50, 0, 2, flush_records=1)
+
+    for i in range(10):
+        handler.emit(make_record(f"record {i:02d} " + 'x' * 40))
+    handler.close()
+
+    assert len(rotated_files(tmp_path)) == 2
+    assert read(path) == ["record 09 " + 'x' * 40]
+
+def test_file_rotated_by_another_process_is_reopened(tmp_path):
+    path = str(tmp_path / 'backend.log')
+    mine = RotatingBatchFileHandler(path, 0, 0, 0, flush_records=1)
+    mine.emit(make_record('before'))
+
+    os.replace(path, path + '.20240101-000000')
+    mine._checked = 0  # skip the once-a-second check delay
+    mine.emit(make_record('after'))
+    mine.close()
+
+    assert read(path) == ['after']
+    assert read(path + '.20240101-000000') == ['before']
+
+def test_listener_flushes_on_its_interval(tmp_path):
+    path = str(tmp_path / 'backend.log')
+    handler = RotatingBatchFileHandler(path, 0, 0, 0, flush_records=1000)
+    log_queue = queue.SimpleQueue()
+    listener = BatchingQueueListener(log_queue, handler, flush_interval=0.05)
+    listener.start()
+    try:
+        log_queue.put(make_record('quiet'))
+        deadline = time.monotonic() + 5
+        while read(path) != ['quiet'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert read(path) == ['quiet']
+    finally:
+        listener.stop()
+        handler.close()
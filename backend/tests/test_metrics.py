@@ -0,0 +1,16 @@
+from config import Config
+
+def test_metrics_require_authentication(client, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_TOKEN', '')
+    assert client.get('/api/metrics').status_code == 401
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer '}).status_code == 401
+
+def test_metrics_accept_an_admin_token(client, auth_headers):
+    response = client.get('/api/metrics', headers=auth_headers)
+    assert response.status_code == 200
+    assert 'buzzsnip_' in response.get_data(as_text=True)
+
+def test_metrics_accept_the_scrape_token(client, monkeypatch):
+    monkeypatch.setattr(Config, 'METRICS_TOKEN', 'scrape-secret')
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+    assert client.get('/api/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
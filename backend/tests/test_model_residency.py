@@ -0,0 +1,143 @@
+import time
+import threading
+import pytest
+from config import Config
+from services.json_store import get_document
+from services.model_residency import ModelResidency, FakeModelRuntime, ModelBudgetError, ModelBusyError
+
+CATALOG = {
+    key: {'name': key.upper(), 'size_mb': 100, 'memory_mb': 100}
+    for key in ['a', 'b', 'c', 'd']
+}
+CATALOG['big'] = {'name': 'BIG', 'size_mb': 500, 'memory_mb': 500}
+
+class GatedRuntime(FakeModelRuntime):
+    """Records loads and unloads; loads of gated keys block until released"""
+
+    def __init__(self):
+        super().__init__(0)
+        self.loaded = []
+        self.unloaded = []
+        self.gates = {}
+
+    def load(self, key, spec):
+        if key in self.gates:
+            self.gates[key].wait(5)
+        self.loaded.append(key)
+
+    def unload(self, key, spec):
+        self.unloaded.append(key)
+
+@pytest.fixture
+def residency(tmp_path):
+    def make(budget_mb=300, pinned=()):
+        return ModelResidency(
+            get_document(str(tmp_path / 'residency.json'), dict),
+            str(tmp_path / 'residency.lock'),
+            GatedRuntime(),
+            budget_mb,
+            pinned,
+            catalog=CATALOG
+        )
+    return make
+
+def used_in_order(residency, *keys):
+    for key in keys:
+        with residency.using([key]):
+            time.sleep(0.001)  # distinct last_used
+
+def test_least_recently_used_model_is_evicted_first(residency):
+    models = residency()
+    used_in_order(models, 'a', 'b', 'c', 'a')
+
+    with models.using(['d']):
+        assert models.resident_models() == {'a', 'c', 'd'}
+    assert models.runtime.unloaded == ['b']
+    assert models.describe('b')['evictions'] == 1
+
+def test_pinned_and_in_use_models_are_never_evicted(residency):
+    models = residency(pinned=['a'])
+    models.load('a')
+    used_in_order(models, 'b', 'c')
+
+    with models.using(['b']):
+        # c is the only model neither pinned nor in use
+        with models.using(['d']):
+            assert models.resident_models() == {'a', 'b', 'd'}
+            assert models.runtime.unloaded == ['c']
+
+            # Nothing left to evict
+            with pytest.raises(ModelBudgetError, match='No room for c'):
+                models.load('c')
+        with pytest.raises(ModelBusyError):
+            models.unload('b')
+    with pytest.raises(ModelBusyError):
+        models.unload('a')
+
+def test_pin_budget_is_checked(residency):
+    models = residency(budget_mb=250)
+    models.pin('a')
+    models.pin('b')
+    with pytest.raises(ModelBudgetError, match='would pin more'):
+        models.pin('c')
+    assert not models.describe('c')['pinned']
+    assert models.describe('c')['status'] == 'unloaded'
+
+    models.unpin('b')
+    models.pin('c')
+    assert models.resident_models() == {'a', 'c'}
+
+def test_models_that_cannot_fit_raise_budget_errors(residency):
+    models = residency(pinned=['a'])
+    models.load('a')
+
+    with pytest.raises(ModelBudgetError, match='more than the 300 MB budget'):
+        models.load('big')
+    with pytest.raises(ModelBudgetError, match='cannot fit next to the pinned models'):
+        with models.using(['b', 'c', 'd']):
+            pass
+    assert models.resident_models() == {'a'}
+
+def test_loads_run_outside_the_lock(residency, monkeypatch):
+    # Waiters must be woken by the load finishing, not by polling
+    monkeypatch.setattr(Config, 'PROCESS_SYNC_INTERVAL', 30)
+    models = residency()
+    models.load('a')
+    gate = models.runtime.gates['b'] = threading.Event()
+
+    loader = threading.Thread(target=models.load, args=('b',))
+    loader.start()
+    while models.describe('b')['status'] != 'loading':
+        time.sleep(0.01)
+
+    # Loaded models stay usable while b loads
+    with models.using(['a']):
+        pass
+
+    waiter_done = threading.Event()
+
+    def wait_for_b():
+        with models.using(['b']):
+            waiter_done.set()
+
+    waiter = threading.Thread(target=wait_for_b)
+    waiter.start()
+    assert not waiter_done.wait(0.1)
+
+    started = time.monotonic()
+    gate.set()
+    assert waiter_done.wait(5)
+    assert time.monotonic() - started < 1
+    loader.join()
+    waiter.join()
+    assert models.runtime.loaded == ['a', 'b']
+
+def test_fake_runtime_only_sleeps_when_configured():
+    spec = {'memory_mb': 4096}
+    started = time.monotonic()
+    FakeModelRuntime(0).load('big', spec)
+    assert time.monotonic() - started < 0.05
+
+    started = time.monotonic()
+    FakeModelRuntime(0.05).load('big', spec)
+    assert time.monotonic() - started >= 0.2
@@ -0,0 +1,100 @@
+import threading
+import pytest
+from config import Config
+from services import job_queue, job_store, pipeline
+from services.generation import build_automated_job, AUTOMATED_PIPELINE
+
+class Response:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+        self.text = str(body)
+
+    def json(self):
+        return self.body
+
+class OverlapAIClient:
+    """Records when each endpoint starts and ends
+
+    An endpoint listed in hold_until does not answer until the endpoints
+    named there have started, so two stages that must overlap deadlock
+    (and fail after a timeout) if they are run one after the other.
+    """
+
+    def __init__(self, hold_until=None):
+        self.hold_until = hold_until or {}
+        self.events = []
+        self.started = {}
+        self._lock = threading.Lock()
+
+    def _started(self, name):
+        with self._lock:
+            return self.started.setdefault(name, threading.Event())
+
+    def post(self, endpoint, json=None, headers=None):
+        name = endpoint.rsplit('/', 1)[-1]
+        self.events.append(('start', name))
+        self._started(name).set()
+        for other in self.hold_until.get(name, []):
+            if not self._started(other).wait(5):
+                raise AssertionError(f"{other} never started while {name} was running")
+        self.events.append(('end', name))
+        return Response({f"{name}_url": f"/generated/{name}.out", 'video_url': f"/generated/{name}.mp4", 'script': 'Hello'})
+
+    def position(self, event, name):
+        return self.events.index((event, name))
+
+@pytest.fixture
+def ai_client(monkeypatch):
+    def install(hold_until=None):
+        client = OverlapAIClient(hold_until)
+        monkeypatch.setattr(pipeline, 'get_ai_client', lambda: client)
+        return client
+    return install
+
+def run_queued(job_id):
+    job_queue.JobQueue(workers=0, batch_window=0)._process(job_id)
+    return job_store.load_job(job_id)
+
+def test_pipeline_runs_audio_and_face_together_before_video(ai_client, client, auth_headers):
+    calls = ai_client({'audio': ['face'], 'face': ['audio']})
+
+    response = client.post('/api/pipelines', headers=auth_headers, json={
+        'persona_id': 'p',
+        'audio': {'script': 'Hello', 'voice_type': 'gtts'},
+        'face': {'prompt': 'smiling'},
+        'video': {}
+    })
+    assert response.status_code == 202
+    assert response.get_json()['stages'] == ['audio', 'face', 'video']
+
+    job_data = run_queued(response.get_json()['job_id'])
+    assert job_data['status'] == 'completed'
+    assert job_data['result']['video_url'] == '/generated/video.mp4'
+    assert job_data['stages']['video']['needs'] == ['audio', 'face']
+
+    video_started = calls.position('start', 'video')
+    assert video_started > calls.position('end', 'audio')
+    assert video_started > calls.position('end', 'face')
+
+def test_pipeline_requires_an_audio_script(client, auth_headers):
+    response = client.post('/api/pipelines', headers=auth_headers, json={'persona_id': 'p', 'audio': {'voice_type': 'gtts'}})
+    assert response.status_code == 400
+
+def test_automated_stages_overlap_thumbnail_with_upscale(ai_client, monkeypatch):
+    monkeypatch.setattr(Config, 'AUTOMATED_PIPELINE', 'stages')
+    calls = ai_client({'script': ['face'], 'upscale': ['thumbnail'], 'thumbnail': ['upscale']})
+
+    job_data = build_automated_job({'persona_id': 'p', 'theme': 'tips', 'duration': 30})
+    job_store.save_job(job_data)
+    job_data = run_queued(job_data['job_id'])
+
+    assert job_data['status'] == 'completed'
+    assert job_data['result']['thumbnail_url'] == '/generated/thumbnail.out'
+
+    # Each stage starts only once everything it needs has finished
+    endpoints = {stage.name: stage.endpoint.rsplit('/', 1)[-1] for stage in AUTOMATED_PIPELINE.stages}
+    for name, stage in job_data['stages'].items():
+        for need in stage['needs']:
+            assert calls.position('start', endpoints[name]) > calls.position('end', endpoints[need])
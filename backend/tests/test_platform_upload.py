@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+from http.server import ThreadingHTTPServer
+import pytest
+from config import Config
+from mock_platform import MockPlatformState, make_handler
+from services.platform_upload import (
+    local_video_file, video_fingerprint, HttpResumableUploader, ResumableUploadEngine, UploadError
+)
+
+def write_file(path, data=b'video'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+@pytest.fixture
+def platform():
+    """mock_platform.py served on a free port"""
+    state = MockPlatformState(fail_rate=0.0, partial=False)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}/upload"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+def test_local_video_file_serves_generated_and_uploaded_files():
+    generated = write_file(os.path.join(Config.GENERATED_DIR, 'clip.mp4'))
+    uploaded = write_file(os.path.join(Config.UPLOADS_DIR, 'upload.mp4'))
+
+    assert local_video_file(generated) == os.path.realpath(generated)
+    assert local_video_file(uploaded) == os.path.realpath(uploaded)
+    assert local_video_file('/generated/clip.mp4') == os.path.realpath(generated)
+
+def test_local_video_file_rejects_other_server_files(tmp_path):
+    outside = write_file(str(tmp_path / 'secret.mp4'))
+    link = os.path.join(Config.GENERATED_DIR, 'link.mp4')
+    os.makedirs(Config.GENERATED_DIR, exist_ok=True)
+    os.symlink(outside, link)
+
+    assert local_video_file(outside) is None
+    assert local_video_file(link) is None
+    # conftest puts data/ next to generated/
+    write_file(os.path.join(Config.DATA_DIR, 'secret.mp4'))
+    assert local_video_file(os.path.join(Config.GENERATED_DIR, '..', 'data', 'secret.mp4')) is None
+
+def test_upload_of_a_file_outside_the_media_dirs_is_rejected(client, auth_headers, tmp_path):
+    outside = write_file(str(tmp_path / 'secret.mp4'))
+    response = client.post('/api/upload', headers=auth_headers, json={
+        'video_url': outside, 'platforms': ['youtube'], 'title': 'Secret'
+    })
+    assert response.status_code == 400
+
+def test_fingerprint_changes_when_the_video_is_rewritten():
+    path = write_file(os.path.join(Config.GENERATED_DIR, 'rewritten.mp4'))
+    first = video_fingerprint(path)
+    assert video_fingerprint('/generated/rewritten.mp4') == first
+
+    write_file(path, b'new video')
+    assert video_fingerprint(path) != first
+
+def test_repeat_submit_is_reported_under_duplicates(client, auth_headers):
+    write_file(os.path.join(Config.GENERATED_DIR, 'repeat.mp4'))
+    body = {'video_url': '/generated/repeat.mp4', 'platforms': ['youtube', 'instagram'], 'title': 'Repeat'}
+
+    first = client.post('/api/upload', headers=auth_headers, json=body)
+    assert first.status_code == 202
+    upload_id = first.get_json()['upload_id']
+
+    second = client.post('/api/upload', headers=auth_headers, json=body)
+    assert second.status_code == 200
+    assert second.get_json()['duplicates'] == {'youtube': upload_id, 'instagram': upload_id}
+
+class SlowUploader(HttpResumableUploader):
+    def upload_chunk(self, session, data, offset, size):
+        time.sleep(0.05)
+        return super().upload_chunk(session, data, offset, size)
+
+def test_upload_stops_at_its_deadline_and_resumes(platform, tmp_path):
+    video = os.urandom(1000)
+    path = write_file(str(tmp_path / 'video.mp4'), video)
+    engine = ResumableUploadEngine(str(tmp_path / 'sessions'), chunk_size=100, max_retries=0)
+    uploader = SlowUploader('youtube', platform.url, timeout=5)
+
+    with pytest.raises(UploadError, match='timed out'):
+        engine.upload(uploader, path, {}, 'deadline', deadline=time.monotonic() + 0.12)
+    session = next(iter(platform.sessions.values()))
+    assert 0 < len(session['data']) < len(video)
+
+    result = engine.upload(uploader, path, {}, 'deadline')
+    assert result['success']
+    assert len(platform.sessions) == 1
+    assert bytes(session['data']) == video
+
+class CrashingUploader(HttpResumableUploader):
+    """Dies like a killed process after a number of chunks"""
+
+    def __init__(self, url, crash_after):
+        super().__init__('youtube', url, timeout=5)
+        self.crash_after = crash_after
+        self.offsets = []
+
+    def upload_chunk(self, session, data, offset, size):
+        if len(self.offsets) == self.crash_after:
+            raise KeyboardInterrupt
+        self.offsets.append(offset)
+        return super().upload_chunk(session, data, offset, size)
+
+def test_interrupted_upload_resumes_from_the_persisted_offset(platform, tmp_path):
+    video = os.urandom(1000)
+    path = write_file(str(tmp_path / 'video.mp4'), video)
+    sessions_dir = str(tmp_path / 'sessions')
+
+    with pytest.raises(KeyboardInterrupt):
+        ResumableUploadEngine(sessions_dir, 100, 3).upload(CrashingUploader(platform.url, 4), path, {}, 'resume')
+
+    uploader = CrashingUploader(platform.url, None)
+    result = ResumableUploadEngine(sessions_dir, 100, 3).upload(uploader, path, {}, 'resume')
+    assert result['success']
+    assert uploader.offsets[0] == 400
+    assert len(platform.sessions) == 1
+    assert bytes(next(iter(platform.sessions.values()))['data']) == video
+    assert os.listdir(sessions_dir) == []
+
+def test_backoff_stops_at_max_retries(platform, tmp_path):
+    platform.fail_rate = 1.0
+    path = write_file(str(tmp_path / 'video.mp4'), os.urandom(300))
+    uploader = CrashingUploader(platform.url, None)
+    engine = ResumableUploadEngine(str(tmp_path / 'sessions'), 100, max_retries=2, backoff=0.01)
+
+    with pytest.raises(UploadError, match='after 2 retries'):
+        engine.upload(uploader, path, {}, 'retries')
+    # The first attempt plus two retries, all at byte zero
+    assert uploader.offsets == [0, 0, 0]
@@ -0,0 +1,21 @@
+from services.process_lock import process_lock, try_hold_process_lock
+
+def test_held_lock_is_not_granted_until_released(tmp_path):
+    path = str(tmp_path / 'locks' / 'role.lock')
+    held = try_hold_process_lock(path)
+    assert held is not None
+    # flock excludes other open file descriptions, even in the same process
+    assert try_hold_process_lock(path) is None
+
+    held.close()
+    again = try_hold_process_lock(path)
+    assert again is not None
+    again.close()
+
+def test_process_lock_blocks_non_blocking_claims_while_held(tmp_path):
+    path = str(tmp_path / 'doc.lock')
+    with process_lock(path):
+        assert try_hold_process_lock(path) is None
+    released = try_hold_process_lock(path)
+    assert released is not None
+    released.close()
@@ -0,0 +1,56 @@
+import os
+import json
+from config import Config
+from services.record_index import RecordIndex, decode_cursor
+
+def write_record(records_dir, record_id, created_at, **fields):
+    os.makedirs(records_dir, exist_ok=True)
+    with open(os.path.join(records_dir, f"{record_id}.json"), 'w') as f:
+        json.dump(dict(id=record_id, created_at=created_at, **fields), f)
+
+def ids(records):
+    return [record['id'] for record in records]
+
+def test_cursor_is_stable_across_inserts(tmp_path):
+    records_dir = str(tmp_path / 'posts')
+    for day in range(1, 6):
+        write_record(records_dir, f"p{day}", f"2024-01-0{day}")
+    index = RecordIndex(records_dir, 'created_at', max_age=0)
+
+    first, cursor = index.page({}, 'desc', None, 2)
+    assert ids(first) == ['p5', 'p4']
+
+    # A newer record lands before the cursor, an older one after it
+    write_record(records_dir, 'p6', '2024-01-06')
+    write_record(records_dir, 'p0', '2024-01-00')
+    index.upsert('p6')
+
+    second, cursor = index.page({}, 'desc', decode_cursor(cursor), 2)
+    third, cursor = index.page({}, 'desc', decode_cursor(cursor), 2)
+    assert ids(second) == ['p3', 'p2']
+    assert ids(third) == ['p1', 'p0']
+    assert cursor is None
+
+def test_filters_and_ascending_order(tmp_path):
+    records_dir = str(tmp_path / 'posts')
+    write_record(records_dir, 'a', '2024-01-01', persona_id='x', platforms=['youtube'])
+    write_record(records_dir, 'b', '2024-01-02', persona_id='y', platforms=['youtube'])
+    write_record(records_dir, 'c', '2024-01-03', persona_id='x', platforms='instagram')
+    index = RecordIndex(records_dir, 'created_at', max_age=0)
+
+    assert ids(index.iter_records({'persona': 'x'}, 'asc')) == ['a', 'c']
+    assert ids(index.iter_records({'platform': 'instagram'})) == ['c']
+    assert ids(index.iter_records({'since': '2024-01-02'}, 'asc')) == ['b', 'c']
+
+def test_posts_stream_as_ndjson(client, auth_headers):
+    posts_dir = os.path.join(Config.DATA_DIR, 'posts')
+    for day in range(1, 4):
+        write_record(posts_dir, f"ndjson{day}", f"2024-02-0{day}", persona_id='ndjson_persona')
+
+    response = client.get('/api/posts?format=ndjson&persona=ndjson_persona&order=asc', headers=auth_headers)
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == ['ndjson1', 'ndjson2', 'ndjson3']
+
+def test_malformed_cursor_is_rejected(client, auth_headers):
+    assert client.get('/api/posts?after=not-a-cursor', headers=auth_headers).status_code == 400
@@ -0,0 +1,67 @@
+import threading
+import pytest
+from datetime import datetime, timedelta
+from config import Config
+from services import scheduler
+from services.schedule_store import save_schedules, load_schedules, get_default_schedules
+
+def schedule(schedule_id, status='active', next_run=None):
+    return dict(get_default_schedules()[0], id=schedule_id, status=status,
+                next_run=(next_run or datetime.utcnow()).isoformat())
+
+@pytest.fixture
+def engine(monkeypatch):
+    save_schedules([])
+    fired = []
+    fired_event = threading.Event()
+
+    engine = scheduler.SchedulerEngine()
+    engine.fired = fired
+    engine.fired_event = fired_event
+
+    def run_now(due):
+        fired.append(due['id'])
+        fired_event.set()
+    monkeypatch.setattr(engine, 'run_now', run_now)
+    yield engine
+    engine.stop()
+    engine.join(5)
+
+def test_schedule_saved_by_another_process_wakes_the_scheduler(engine, monkeypatch):
+    monkeypatch.setattr(Config, 'PROCESS_SYNC_INTERVAL', 0.05)
+    engine.start()
+
+    # Written without notify_schedules_changed(), as another worker would
+    save_schedules([schedule('elsewhere')])
+
+    assert engine.fired_event.wait(5)
+    assert engine.fired == ['elsewhere']
+
+def test_reload_wakes_a_scheduler_with_nothing_due(engine, monkeypatch):
+    # The watcher is too slow to matter here, only reload() can wake it
+    monkeypatch.setattr(Config, 'PROCESS_SYNC_INTERVAL', 30)
+    save_schedules([schedule('later', next_run=datetime.utcnow() + timedelta(days=1))])
+    engine.start()
+    assert not engine.fired_event.wait(0.1)
+
+    save_schedules([schedule('now')])
+    engine.reload()
+
+    assert engine.fired_event.wait(1)
+    assert engine.fired == ['now']
+
+def test_reactivated_schedule_skips_the_run_it_missed(client, auth_headers):
+    missed = datetime.utcnow() - timedelta(hours=1)
+    save_schedules([schedule('paused', status='paused', next_run=missed)])
+
+    response = client.patch('/api/schedules/paused/status', json={'status': 'active'}, headers=auth_headers)
+    assert response.status_code == 200
+    next_run = datetime.fromisoformat(load_schedules()[0]['next_run'])
+    assert next_run > datetime.utcnow()
+
+def test_active_schedule_keeps_its_next_run(client, auth_headers):
+    due = datetime.utcnow() + timedelta(hours=3)
+    save_schedules([schedule('running', next_run=due)])
+
+    client.put('/api/schedules/running', json={'status': 'active', 'theme': 'new'}, headers=auth_headers)
+    assert load_schedules()[0]['next_run'] == due.isoformat()
@@ -0,0 +1,64 @@
+import os
+import pytest
+from services import upload_store
+from services.upload_store import UploadLog
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_store, 'LEGACY_UPLOADS_DIR', str(tmp_path / 'no-legacy-uploads'))
+    return str(tmp_path / 'upload_log')
+
+def record(log, status='queued', **fields):
+    return dict({'id': log.new_id(), 'status': status, 'uploaded_at': '2024-01-01T00:00:00',
+                 'platforms': ['youtube'], 'persona_id': 'p'}, **fields)
+
+def test_segments_rotate_and_reload_from_their_indexes(log_dir):
+    log = UploadLog(log_dir, segment_bytes=300)
+    saved = [record(log, uploaded_at=f"2024-01-0{i}") for i in range(1, 7)]
+    for upload in saved:
+        log.save(upload)
+    log.save(dict(saved[0], status='completed'))
+
+    assert len([name for name in os.listdir(log_dir) if name.endswith('.idx')]) > 1
+
+    reopened = UploadLog(log_dir, segment_bytes=300)
+    assert reopened.load(saved[0]['id'])['status'] == 'completed'
+    assert [upload['id'] for upload in reopened.iter_records({}, 'asc')] == [upload['id'] for upload in saved]
+    assert [upload['id'] for upload in reopened.iter_records({'status': 'completed'})] == [saved[0]['id']]
+
+def test_torn_write_is_dropped_on_open(log_dir):
+    log = UploadLog(log_dir, segment_bytes=1 << 20)
+    kept = record(log)
+    log.save(kept)
+    with open(os.path.join(log_dir, 'segment-000001.jsonl'), 'ab') as f:
+        f.write(b'{"id": "upload_torn", "sta')
+
+    reopened = UploadLog(log_dir, segment_bytes=1 << 20)
+    assert reopened.load(kept['id']) == kept
+    reopened.save(record(reopened))
+    assert len(list(UploadLog(log_dir, segment_bytes=1 << 20).iter_records({}))) == 2
+
+def test_ids_stay_unique_and_ordered_across_processes(log_dir):
+    first = UploadLog(log_dir, segment_bytes=1 << 20)
+    second = UploadLog(log_dir, segment_bytes=1 << 20)
+
+    ids = [log.new_id() for _ in range(50) for log in (first, second)]
+    numbers = [int(upload_id.rsplit('_', 1)[1]) for upload_id in ids]
+    assert numbers == sorted(set(numbers))
+
+def test_appends_from_another_process_are_caught_up(log_dir):
+    mine = UploadLog(log_dir, segment_bytes=1 << 20)
+    other = UploadLog(log_dir, segment_bytes=1 << 20)
+    seen = []
+    mine.add_listener(seen.append)
+
+    upload = record(other, results={'youtube': {'idempotency_key': 'key-1', 'status': 'queued'}})
+    other.save(upload)
+
+    assert mine.load(upload['id']) == upload
+    assert [entry['id'] for entry in seen] == [upload['id']]
+    assert mine.find_key('key-1') == upload['id']
+
+    other.save(dict(upload, results={'youtube': {'idempotency_key': 'key-1', 'status': 'failed'}}))
+    mine.catch_up()
+    assert mine.find_key('key-1') is None
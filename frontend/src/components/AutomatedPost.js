@@ -65,21 +65,21 @@ const AutomatedPost = () => {
     setAlert({ show: false, type: '', message: '' });
 
     try {
-      // Simulate progress updates
-      const progressInterval = setInterval(() => {
-        setProgress(prev => {
-          if (prev >= 90) {
-            clearInterval(progressInterval);
-            return 90;
-          }
-          return prev + 10;
-        });
-      }, 2000);
-
       const response = await axios.post('http://localhost:5000/api/generate', formData);
       
-      clearInterval(progressInterval);
-      setProgress(100);
+      // Follow server-pushed progress for the queued job
+      if (response.data.job_id) {
+        const events = new EventSource(`http://localhost:5000/api/jobs/${response.data.job_id}/events`);
+        events.addEventListener('job', (message) => {
+          const job = JSON.parse(message.data);
+          setProgress(job.progress || 0);
+          if (job.status === 'completed' || job.status === 'failed') {
+            events.close();
+            setTimeout(() => setProgress(0), 2000);
+          }
+        });
+        events.onerror = () => events.close();
+      }
       
       setAlert({
         show: true,
@@ -94,7 +94,6 @@ const AutomatedPost = () => {
       });
     } finally {
       setLoading(false);
-      setTimeout(() => setProgress(0), 2000);
     }
   };
 
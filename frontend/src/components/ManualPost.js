@@ -14,6 +14,26 @@ import {
 } from 'react-bootstrap';
 import axios from 'axios';
 
+// Generation endpoints queue a job and return its id; follow its progress events until it finishes
+const waitForJob = (jobId, onProgress) => new Promise((resolve, reject) => {
+  const events = new EventSource(`http://localhost:5000/api/jobs/${jobId}/events`);
+  events.addEventListener('job', (message) => {
+    const job = JSON.parse(message.data);
+    if (onProgress) onProgress(job.progress || 0);
+    if (job.status === 'completed') {
+      events.close();
+      resolve(job.result || {});
+    } else if (job.status === 'failed') {
+      events.close();
+      reject(new Error(job.error || 'Job failed'));
+    }
+  });
+  events.onerror = () => {
+    events.close();
+    reject(new Error('Lost connection to job progress stream'));
+  };
+});
+
 const ManualPost = () => {
   const [activeStep, setActiveStep] = useState('script');
   const [formData, setFormData] = useState({
@@ -94,8 +114,9 @@ const ManualPost = () => {
         speed: formData.voice_speed,
         pitch: formData.voice_pitch
       });
+      const result = await waitForJob(response.data.job_id);
       
-      setGeneratedAssets(prev => ({ ...prev, audio: response.data.audio_url }));
+      setGeneratedAssets(prev => ({ ...prev, audio: result.audio_url }));
       setAlert({ show: true, type: 'success', message: 'Audio generated successfully!' });
     } catch (error) {
       setAlert({ show: true, type: 'danger', message: `Audio generation failed: ${error.message}` });
@@ -111,8 +132,9 @@ const ManualPost = () => {
         persona_id: formData.persona_id,
         custom_prompt: formData.face_prompt
       });
+      const result = await waitForJob(response.data.job_id);
       
-      setGeneratedAssets(prev => ({ ...prev, face: response.data.face_url }));
+      setGeneratedAssets(prev => ({ ...prev, face: result.face_url }));
       setAlert({ show: true, type: 'success', message: 'Face generated successfully!' });
     } catch (error) {
       setAlert({ show: true, type: 'danger', message: `Face generation failed: ${error.message}` });
@@ -131,10 +153,6 @@ const ManualPost = () => {
     setProgress(0);
     
     try {
-      const progressInterval = setInterval(() => {
-        setProgress(prev => prev < 90 ? prev + 10 : 90);
-      }, 3000);
-
       const response = await axios.post('http://localhost:5000/api/generate-video', {
         audio_url: generatedAssets.audio,
         face_url: generatedAssets.face,
@@ -143,10 +161,10 @@ const ManualPost = () => {
         resolution: formData.resolution,
         overlay_text: formData.overlay_text
       });
+      const result = await waitForJob(response.data.job_id, setProgress);
       
-      clearInterval(progressInterval);
       setProgress(100);
-      setGeneratedAssets(prev => ({ ...prev, video: response.data.video_url }));
+      setGeneratedAssets(prev => ({ ...prev, video: result.video_url }));
       setAlert({ show: true, type: 'success', message: 'Video generated successfully!' });
     } catch (error) {
       setAlert({ show: true, type: 'danger', message: `Video generation failed: ${error.message}` });
@@ -184,7 +202,7 @@ const ManualPost = () => {
 
     setLoading(true);
     try {
-      await axios.post('http://localhost:5000/api/upload', {
+      const response = await axios.post('http://localhost:5000/api/upload', {
         video_url: generatedAssets.video,
         platforms: formData.platforms,
         title: formData.title,
@@ -193,7 +211,7 @@ const ManualPost = () => {
         thumbnail_style: formData.thumbnail_style
       });
       
-      setAlert({ show: true, type: 'success', message: 'Video uploaded successfully to selected platforms!' });
+      setAlert({ show: true, type: 'success', message: response.data.message || 'Video queued for upload to selected platforms!' });
     } catch (error) {
       setAlert({ show: true, type: 'danger', message: `Upload failed: ${error.message}` });
     } finally {